@@ -0,0 +1,65 @@
+"""Compares CPU cost vs. bytes saved of the available compression codecs.
+
+Packets are built from the package sample data, with the given number of NMEA lines each.
+
+Example:
+    python examples/benchmark_compression.py --lines 1 10 50
+"""
+import time
+import argparse
+
+from socket_listener import compression
+from socket_listener.assets import get_sample_data_path
+
+
+def packets(lines, lines_per_packet):
+    for i in range(0, len(lines) - lines_per_packet + 1, lines_per_packet):
+        yield b"\n".join(lines[i:i + lines_per_packet])
+
+
+def benchmark(codec, data):
+    start = time.perf_counter()
+    compressed = [codec.compress(p) for p in data]
+    compress_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for c in compressed:
+        codec.decompress(c)
+    decompress_time = time.perf_counter() - start
+
+    return sum(len(c) for c in compressed), compress_time, decompress_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sample", type=str, default="nmea-with-tagblock.txt")
+    parser.add_argument("--lines", type=int, nargs="+", default=[1, 10, 50])
+    args = parser.parse_args()
+
+    lines = get_sample_data_path(args.sample).read_bytes().splitlines()
+
+    header = "{:>6} {:>10} {:>8} {:>8} {:>14} {:>14}".format(
+        "lines", "codec", "packets", "ratio", "compress µs/p", "decompress µs/p")
+    print(header)
+
+    for lines_per_packet in args.lines:
+        data = list(packets(lines, lines_per_packet))
+        raw_size = sum(len(p) for p in data)
+
+        for name in compression.available_codecs():
+            codec = compression.create_codec(name)
+            codec.compress(data[0])  # warm up, e.g. dictionary training.
+
+            size, compress_time, decompress_time = benchmark(codec, data)
+            print("{:>6} {:>10} {:>8} {:>8.2f} {:>14.1f} {:>14.1f}".format(
+                lines_per_packet,
+                name,
+                len(data),
+                raw_size / size,
+                compress_time / len(data) * 1e6,
+                decompress_time / len(data) * 1e6,
+            ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Measures receiver throughput end-to-end, publishing to the in-process Pub/Sub emulator.
+
+Example:
+    python examples/benchmark_receiver.py --packets 20000 --latency 0.05 --jitter 0.02
+"""
+import time
+import socket
+import argparse
+
+from socket_listener import receivers
+from socket_listener.assets import get_sample_data_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--packets", type=int, default=10000, help="Number of packets to send.")
+    parser.add_argument("--rate", type=float, default=0, help="Packets/s to send (0: max).")
+    parser.add_argument("--lines", type=int, default=10, help="NMEA lines per packet.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mean publish latency.")
+    parser.add_argument("--jitter", type=float, default=0, help="Publish latency jitter.")
+    parser.add_argument("--error-rate", type=float, default=0, help="Publish error rate.")
+    parser.add_argument("--data-format", type=str, default="raw", help="Pub/Sub data format.")
+    args = parser.parse_args()
+
+    lines = get_sample_data_path("nmea.txt").read_text().splitlines()
+    packet = "\n".join(lines[:args.lines]).encode("utf-8")
+
+    receiver, thread = receivers.run(
+        host="127.0.0.1",
+        port=0,
+        daemon_thread=True,
+        pubsub_emulated=True,
+        pubsub_project="benchmark",
+        pubsub_topic="benchmark",
+        pubsub_data_format=args.data_format,
+        pubsub_emulated_latency=args.latency,
+        pubsub_emulated_jitter=args.jitter,
+        pubsub_emulated_error_rate=args.error_rate,
+    )
+
+    address = receiver.server.server_address
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    interval = 1 / args.rate if args.rate else 0
+    start = time.perf_counter()
+    for i in range(args.packets):
+        sock.sendto(packet, address)
+        if interval:
+            time.sleep(max(start + (i + 1) * interval - time.perf_counter(), 0))
+
+    sent = time.perf_counter() - start
+    report = receiver.drain(timeout=60)
+    elapsed = time.perf_counter() - start
+    thread.join()
+
+    publisher = receiver.server.sinks[0]._publisher
+    print(f"Sent {args.packets} packets in {sent:.2f}s ({args.packets / sent:.0f} packets/s).")
+    if args.data_format == "raw":
+        received = publisher.published + publisher.failed
+        print(f"Received {received} packets ({args.packets - received} lost).")
+
+    print(f"Published {publisher.published} messages, {publisher.failed} failed.")
+    print(f"Processed in {elapsed:.2f}s ({publisher.published / elapsed:.0f} messages/s).")
+    print(f"Drain: {report}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Measures startup time of the CLI, e.g., to track container cold starts.
+
+Each command runs in a fresh interpreter several times and the median wall time is reported.
+The slowest imports, as measured by 'python -X importtime', are also shown.
+
+Example:
+    python examples/benchmark_startup.py --runs 10
+"""
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+COMMANDS = {
+    "import cli": [sys.executable, "-c", "import socket_listener.cli"],
+    "--help": [sys.executable, "-m", "socket_listener.cli", "--help"],
+    "receiver --help": [sys.executable, "-m", "socket_listener.cli", "receiver", "--help"],
+    "transmitter --help": [sys.executable, "-m", "socket_listener.cli", "transmitter", "--help"],
+}
+
+
+def measure(command, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+
+    return statistics.median(times)
+
+
+def slowest_imports(module, top):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        check=True, capture_output=True, text=True,
+    )
+
+    imports = []
+    for line in result.stderr.splitlines()[1:]:
+        _, cumulative, name = line.split("|")
+        imports.append((int(cumulative), name.rstrip()))
+
+    return sorted(imports, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    print("{:>20} {:>12}".format("command", "median ms"))
+    for name, command in COMMANDS.items():
+        print("{:>20} {:>12.1f}".format(name, measure(command, args.runs) * 1e3))
+
+    print()
+    print("{:>12}  {}".format("cumulative µs", "import"))
+    for cumulative, name in slowest_imports("socket_listener.cli", args.top):
+        print("{:>12}  {}".format(cumulative, name))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,451 @@
+"""Offline analysis of NMEA files, e.g. daily captures of several GB.
+
+Files are streamed line by line and sharded across a pool of processes:
+plain files by contiguous ranges of bytes and gzip files as a whole.
+Each shard is summarized with bounded memory and the summaries are merged:
+    - Duplicates: estimated with a HyperLogLog sketch of sentences (without tagblocks),
+      so sentences relayed by several stations count as duplicates.
+    - Multipart completeness: parts of a group must arrive in order,
+      up to max_open_groups interleaved groups. Groups split across shards are joined on merge.
+    - Prefix and talker mix: counts of start characters, talkers and sentence types.
+    - Message rates: from the 'c:' (UNIX time) field of tagblocks, per minute.
+"""
+import math
+import json
+import time
+import hashlib
+import logging
+import multiprocessing
+from pathlib import Path
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Iterable, Optional
+
+from socket_listener.transmitters import open_file, read_byte_range, split_byte_ranges
+
+logger = logging.getLogger(__name__)
+
+# Size in MB of the shards in which plain files are split.
+DEFAULT_SHARD_SIZE = 64
+
+# Maximum number of multipart groups waiting for their next part, per shard.
+DEFAULT_MAX_OPEN_GROUPS = 1000
+
+# Number of lines at the start of a shard in which orphan parts are joined with the previous shard.
+HEAD_LINES = 1000
+
+# Maximum number of distinct keys of each counter. The rest are counted as OTHER.
+MAX_KEYS = 1000
+OTHER = "other"
+
+Shard = tuple[Path, Optional[tuple[int, int]]]
+
+
+class HyperLogLog:
+    """Sketch that estimates the number of distinct values with fixed memory.
+
+    Uses 2^precision one-byte registers. The relative error is about 1.04 / sqrt(2^precision),
+    i.e. 0.8% with the default precision. Values are hashed with blake2b,
+    so sketches of different processes can be merged.
+
+    Args:
+        precision:
+            Number of bits of the hash used to select a register.
+    """
+    def __init__(self, precision: int = 14) -> None:
+        if not 4 <= precision <= 18:
+            raise ValueError(f"Invalid precision: {precision}. Must be in [4, 18].")
+
+        self._precision = precision
+        self._rank_bits = 64 - precision
+        self._rank_mask = (1 << self._rank_bits) - 1
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value: bytes) -> None:
+        x = int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), "big")
+        index = x >> self._rank_bits
+        rank = self._rank_bits - (x & self._rank_mask).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if len(other.registers) != len(self.registers):
+            raise ValueError("Can't merge sketches with different precision.")
+
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self) -> int:
+        """Returns the estimated number of distinct values."""
+        m = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities.
+            estimate = m * math.log(m / zeros)
+
+        return round(estimate)
+
+
+class Stats:
+    """Summary of a stream of NMEA lines, with bounded memory.
+
+    Multipart groups open at the end of the stream (tail) and orphan parts
+    at its start (head) are kept apart, so they can be joined when merging consecutive shards.
+
+    Args:
+        max_open_groups:
+            Maximum number of multipart groups waiting for their next part.
+            When exceeded, the oldest group is counted as incomplete.
+    """
+    def __init__(self, max_open_groups: int = DEFAULT_MAX_OPEN_GROUPS) -> None:
+        self.lines = 0
+        self.bytes = 0
+        self.sentences = 0
+        self.invalid = 0
+        self.tagblocks = 0
+        self.sketch = HyperLogLog()
+        self.prefixes = Counter()
+        self.talkers = Counter()
+        self.sentence_types = Counter()
+        self.message_types = Counter()
+        self.complete = 0
+        self.incomplete = 0
+        self.minutes = Counter()
+        self.head = {}
+        self.tail = {}
+
+        self._max_open_groups = max_open_groups
+        self._open = {}
+
+    def update(self, lines: Iterable[bytes]) -> "Stats":
+        """Adds lines to the summary. Call finish() after the last line."""
+        for line in lines:
+            self.bytes += len(line)
+            line = line.strip()
+            if line:
+                self._add(line)
+
+        return self
+
+    def finish(self) -> "Stats":
+        """Moves multipart groups still open to the tail (or head) of the stream."""
+        for key, group in self._open.items():
+            self._close(key, group, open_=True)
+
+        self._open = {}
+        return self
+
+    def merge(self, other: "Stats", consecutive: bool = False) -> "Stats":
+        """Merges the summary of another stream, which follows this one.
+
+        Args:
+            other:
+                The finished summary to merge.
+
+            consecutive:
+                If True, the other stream continues this one (e.g. the next range of bytes
+                of the same file), so multipart groups split between them are joined.
+        """
+        self.lines += other.lines
+        self.bytes += other.bytes
+        self.sentences += other.sentences
+        self.invalid += other.invalid
+        self.tagblocks += other.tagblocks
+        self.sketch.merge(other.sketch)
+        for name in ("prefixes", "talkers", "sentence_types", "message_types", "minutes"):
+            getattr(self, name).update(getattr(other, name))
+
+        self.complete += other.complete
+        self.incomplete += other.incomplete
+
+        for key, (first, last, total) in other.head.items():
+            previous = self.tail.pop(key, None) if consecutive else None
+            if previous is not None and previous[0] == first - 1 and last == total:
+                self.complete += 1
+            else:
+                self.incomplete += 1 + (previous is not None)
+
+        self.incomplete += len(self.tail)
+        self.tail = dict(other.tail)
+        return self
+
+    def report(self) -> dict:
+        """Returns the summary as a JSON serializable dictionary.
+
+        Orphan parts at the start and groups still open at the end of the stream
+        are reported as incomplete.
+        """
+        distinct = min(self.sketch.count(), self.sentences)
+        groups = self.complete + self.incomplete + len(self.head) + len(self.tail)
+        return dict(
+            lines=self.lines,
+            bytes=self.bytes,
+            sentences=self.sentences,
+            invalid=self.invalid,
+            tagblocks=self.tagblocks,
+            duplicates=dict(
+                distinct_estimate=distinct,
+                duplicates_estimate=self.sentences - distinct,
+                ratio=round((self.sentences - distinct) / max(self.sentences, 1), 4),
+            ),
+            multipart=dict(
+                complete=self.complete,
+                incomplete=groups - self.complete,
+                completeness=round(self.complete / groups, 4) if groups else None,
+            ),
+            prefixes=dict(self.prefixes.most_common()),
+            talkers=dict(self.talkers.most_common()),
+            sentence_types=dict(self.sentence_types.most_common()),
+            message_types=dict(sorted(self.message_types.items())),
+            rates=self._rates(),
+        )
+
+    def _add(self, line: bytes) -> None:
+        self.lines += 1
+        if line[:1] == b"\\":
+            end = line.find(b"\\", 1)
+            tagblock, line = line[1:end], line[end + 1:]
+            self.tagblocks += 1
+            self._add_timestamp(tagblock)
+
+        prefix = line[:1]
+        if prefix not in (b"!", b"$"):
+            self.invalid += 1
+            return
+
+        self.sentences += 1
+        self.sketch.add(line)
+
+        fields = line.split(b",", 6)
+        address = fields[0][1:].decode("ascii", "replace")
+        _count(self.prefixes, prefix.decode())
+        _count(self.talkers, address[:2])
+        _count(self.sentence_types, address)
+
+        if prefix != b"!" or len(fields) < 7:
+            return
+
+        try:
+            total, part = int(fields[1]), int(fields[2])
+        except ValueError:
+            return
+
+        if part == 1 and fields[5]:
+            value = fields[5][0] - 48
+            _count(self.message_types, value - 8 if value > 40 else value)
+
+        if total > 1:
+            self._add_part((address, total, fields[3], fields[4]), part, total)
+
+    def _add_part(self, key: tuple, part: int, total: int) -> None:
+        group = self._open.get(key)
+        if group is not None and (part == 1 or group[1] != part - 1):
+            # A new group started, or parts were lost.
+            self._close(key, self._open.pop(key))
+            group = None
+
+        if group is None:
+            head = part > 1 and self.lines <= HEAD_LINES and key not in self.head
+            group = self._open[key] = [part, part - 1, total, head]
+            if len(self._open) > self._max_open_groups:
+                oldest = next(iter(self._open))
+                self._close(oldest, self._open.pop(oldest))
+
+        group[1] = part
+        if part == total:
+            self._close(key, self._open.pop(key))
+
+    def _close(self, key: tuple, group: list, open_: bool = False) -> None:
+        first, last, total, head = group
+        if head:
+            self.head[key] = (first, last, total)
+        elif first == 1 and last == total:
+            self.complete += 1
+        elif open_ and first == 1:
+            self.tail[key] = (last, total)
+        else:
+            self.incomplete += 1
+
+    def _add_timestamp(self, tagblock: bytes) -> None:
+        for field in tagblock.split(b"*", 1)[0].split(b","):
+            if field.startswith(b"c:"):
+                try:
+                    timestamp = int(field[2:])
+                except ValueError:
+                    return
+
+                if timestamp > 1e11:
+                    timestamp //= 1000  # Milliseconds.
+
+                self.minutes[timestamp // 60] += 1
+                return
+
+    def _rates(self) -> Optional[dict]:
+        if not self.minutes:
+            return None
+
+        first, last = min(self.minutes), max(self.minutes)
+        timestamped = sum(self.minutes.values())
+        minute, peak = self.minutes.most_common(1)[0]
+        return dict(
+            timestamped=timestamped,
+            first_minute=_isoformat(first),
+            last_minute=_isoformat(last),
+            messages_per_second=round(timestamped / ((last - first + 1) * 60), 3),
+            peak_messages_per_minute=peak,
+            peak_minute=_isoformat(minute),
+        )
+
+
+def _count(counter: Counter, key) -> None:
+    if key in counter or len(counter) < MAX_KEYS:
+        counter[key] += 1
+    else:
+        counter[OTHER] += 1
+
+
+def _isoformat(minute: int) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:00Z", time.gmtime(minute * 60))
+
+
+def list_shards(path: Path, shard_size: int) -> list[Shard]:
+    """Splits the files of a path into shards of (roughly) shard_size bytes.
+
+    Returns:
+        A list of (path, range of bytes). The range is None for gzip files,
+        which can't be split and are a single shard.
+    """
+    path = Path(path)
+    paths = [p for p in sorted(path.iterdir()) if not p.is_dir()] if path.is_dir() else [path]
+
+    shards = []
+    for p in paths:
+        if p.suffix == ".gz":
+            shards.append((p, None))
+        else:
+            n = max(1, math.ceil(p.stat().st_size / shard_size))
+            shards.extend((p, r) for r in split_byte_ranges(p, n))
+
+    return shards
+
+
+def analyze_shard(shard: Shard, max_open_groups: int = DEFAULT_MAX_OPEN_GROUPS) -> Stats:
+    """Summarizes the lines of a shard."""
+    path, byte_range = shard
+    stats = Stats(max_open_groups=max_open_groups)
+    if byte_range is None:
+        with open_file(path, "rb") as f:
+            stats.update(f)
+    else:
+        stats.update(read_byte_range(path, *byte_range))
+
+    return stats.finish()
+
+
+def analyze(
+    path: Path,
+    processes: int = 1,
+    shard_size: int = DEFAULT_SHARD_SIZE * 2 ** 20,
+    max_open_groups: int = DEFAULT_MAX_OPEN_GROUPS,
+) -> Stats:
+    """Summarizes the files of a path, sharded across processes.
+
+    Args:
+        path:
+            Path to a file or folder with NMEA files, optionally gzip compressed.
+
+        processes:
+            Number of processes to use. If 1, shards are summarized in this process.
+
+        shard_size:
+            Size in bytes of the shards in which plain files are split.
+
+        max_open_groups:
+            Maximum number of multipart groups waiting for their next part, per shard.
+
+    Returns:
+        The merged summary of all shards.
+    """
+    if processes < 1:
+        raise ValueError(f"Invalid number of processes: {processes}. Must be >= 1.")
+
+    shards = list_shards(path, shard_size)
+    logger.info(f"Analyzing {len(shards)} shards using {processes} processes...")
+
+    worker = partial(analyze_shard, max_open_groups=max_open_groups)
+    stats = Stats(max_open_groups=max_open_groups)
+    if processes == 1:
+        return _merge(stats, shards, map(worker, shards))
+
+    # Spawn, because forking a process with running threads is not safe.
+    # Results are yielded in order of shards, so they are merged as they arrive.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context) as executor:
+        return _merge(stats, shards, executor.map(worker, shards))
+
+
+def _merge(stats: Stats, shards: list[Shard], results: Iterable[Stats]) -> Stats:
+    previous = None
+    for (path, _), result in zip(shards, results):
+        stats.merge(result, consecutive=path == previous)
+        previous = path
+
+    return stats
+
+
+def run(
+    path: str,
+    processes: int = None,
+    shard_size: float = DEFAULT_SHARD_SIZE,
+    max_open_groups: int = DEFAULT_MAX_OPEN_GROUPS,
+    output: str = None,
+    **kwargs,
+) -> dict:
+    """Analyzes NMEA files and prints a JSON report.
+
+    Args:
+        path:
+            Path to a file or folder with NMEA files, optionally gzip compressed.
+
+        processes:
+            Number of processes to use. Defaults to the number of CPUs.
+
+        shard_size:
+            Size in MB of the shards in which plain files are split.
+
+        max_open_groups:
+            Maximum number of multipart groups waiting for their next part, per shard.
+
+        output:
+            If set, the report is also written to this JSON file.
+
+        **kwargs:
+            Unused. Global options of the CLI.
+
+    Returns:
+        The report.
+    """
+    processes = processes or multiprocessing.cpu_count()
+    start = time.perf_counter()
+    stats = analyze(
+        Path(path),
+        processes=processes,
+        shard_size=int(shard_size * 2 ** 20),
+        max_open_groups=max_open_groups,
+    )
+
+    elapsed = time.perf_counter() - start
+    logger.info(
+        f"Analyzed {stats.lines} lines ({stats.bytes / 2 ** 20:.1f} MB) "
+        f"in {elapsed:.2f} seconds using {processes} processes.")
+
+    report = stats.report()
+    content = json.dumps(report, indent=2)
+    print(content)
+
+    if output is not None:
+        Path(output).write_text(content + "\n")
+        logger.info(f"Report written to {output}.")
+
+    return report
@@ -0,0 +1,224 @@
+"""Adaptive backpressure between the socket reception and the sinks.
+
+The AIMDController limits how many packets are being published concurrently.
+The limit grows additively while sinks keep up, and is cut multiplicatively
+when publish latency goes above a target or publishing fails,
+in the same way TCP congestion control adapts its window (AIMD).
+
+When sinks are overloaded, the controller also asks them to batch more aggressively
+(bigger batches, longer linger), and relaxes batching again once they recover.
+
+Packets are admitted by the server thread, before a handler thread is created for them.
+When the limit is reached, the shedding policy decides what happens:
+    - 'block': stop reading the socket until a slot frees up
+      (or max_wait expires, in which case the packet is dropped).
+    - 'drop': drop the packet immediately.
+"""
+import time
+import logging
+import threading
+from typing import Sequence
+
+from socket_listener.metrics import MetricsRegistry, registry as default_registry
+from socket_listener.sinks.base import Sink
+
+logger = logging.getLogger(__name__)
+
+
+class Policy:
+    BLOCK = "block"
+    DROP = "drop"
+
+    ALL = frozenset([BLOCK, DROP])
+
+
+class AIMDController:
+    """Adaptive concurrency limit for packet publication.
+
+    Call acquire() before publishing a packet. If it returns True,
+    call release() with the observed publish latency once the packet was published.
+
+    Args:
+        sinks:
+            Sinks to tune the batching of.
+
+        target_latency:
+            Publish latency in seconds above which sinks are considered overloaded.
+
+        min_limit:
+            Minimum number of packets published concurrently.
+
+        max_limit:
+            Maximum number of packets published concurrently.
+
+        decrease_factor:
+            Factor applied to the limit when sinks are overloaded.
+
+        policy:
+            What to do with a packet when the limit is reached. Either 'block' or 'drop'.
+
+        max_wait:
+            With 'block' policy, maximum seconds to wait for a slot before dropping the packet.
+            If None, waits indefinitely.
+
+        window:
+            Seconds between adjustments. Observations are aggregated within each window.
+
+        min_batch_size, max_batch_size:
+            Range of the number of messages per batch requested to sinks.
+
+        min_linger, max_linger:
+            Range of the seconds sinks wait for a batch to fill up.
+
+        metrics:
+            Registry where the controller state is exposed.
+    """
+    def __init__(
+        self,
+        sinks: Sequence[Sink] = (),
+        target_latency: float = 0.5,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        decrease_factor: float = 0.5,
+        policy: str = Policy.BLOCK,
+        max_wait: float = 1.0,
+        window: float = 1.0,
+        min_batch_size: int = 100,
+        max_batch_size: int = 1000,
+        min_linger: float = 0.01,
+        max_linger: float = 0.1,
+        metrics: MetricsRegistry = None,
+    ) -> None:
+        if policy not in Policy.ALL:
+            raise ValueError(f"Invalid policy: {policy}. Must be one of: {Policy.ALL}")
+
+        self._sinks = sinks
+        self._target_latency = target_latency
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._decrease_factor = decrease_factor
+        self._policy = policy
+        self._max_wait = max_wait
+        self._window = window
+        self._min_batch_size = min_batch_size
+        self._max_batch_size = max_batch_size
+        self._min_linger = min_linger
+        self._max_linger = max_linger
+
+        self._condition = threading.Condition()
+        self._limit = float(max_limit)
+        self._in_flight = 0
+        self._waiting = 0
+        self._latency = 0.0
+        self._batch_size = min_batch_size
+        self._linger = min_linger
+
+        self._window_start = time.monotonic()
+        self._window_overloaded = False
+
+        metrics = metrics or default_registry
+        self._shed = metrics.counter("backpressure_shed_total")
+        metrics.gauge("backpressure_limit", lambda: int(self._limit))
+        metrics.gauge("backpressure_in_flight", lambda: self._in_flight)
+        metrics.gauge("backpressure_waiting", lambda: self._waiting)
+        metrics.gauge("backpressure_latency_seconds", lambda: round(self._latency, 6))
+        metrics.gauge("backpressure_batch_size", lambda: self._batch_size)
+        metrics.gauge("backpressure_linger_seconds", lambda: self._linger)
+
+    @property
+    def limit(self) -> int:
+        """Returns the current concurrency limit."""
+        return int(self._limit)
+
+    @property
+    def batch_size(self) -> int:
+        """Returns the batch size currently requested to sinks."""
+        return self._batch_size
+
+    @property
+    def linger(self) -> float:
+        """Returns the linger time currently requested to sinks."""
+        return self._linger
+
+    def acquire(self) -> bool:
+        """Admits a packet for publication, according to the policy.
+
+        Returns:
+            True if the packet was admitted, False if it must be dropped.
+        """
+        with self._condition:
+            if self._policy == Policy.BLOCK and not self._has_slot():
+                self._waiting += 1
+                try:
+                    self._condition.wait_for(self._has_slot, timeout=self._max_wait)
+                finally:
+                    self._waiting -= 1
+
+            if not self._has_slot():
+                self._shed.inc()
+                return False
+
+            self._in_flight += 1
+            return True
+
+    def release(self, latency: float, ok: bool = True) -> None:
+        """Registers the publication of an admitted packet.
+
+        Args:
+            latency:
+                Seconds it took to publish the packet.
+
+            ok:
+                Whether the packet was published successfully.
+        """
+        with self._condition:
+            self._in_flight -= 1
+
+            # Exponentially weighted moving average, to smooth out outliers.
+            self._latency = 0.8 * self._latency + 0.2 * latency
+            if not ok:
+                self._window_overloaded = True
+
+            now = time.monotonic()
+            if now - self._window_start >= self._window:
+                self._adjust()
+                self._window_start = now
+                self._window_overloaded = False
+
+            self._condition.notify()
+
+    def set_sinks(self, sinks: Sequence[Sink]) -> None:
+        """Replaces the sinks to tune, e.g. on reload, and applies the current batching."""
+        with self._condition:
+            self._sinks = sinks
+            batching = dict(batch_size=self._batch_size, linger=self._linger)
+
+        for sink in sinks:
+            sink.tune(**batching)
+
+    def _has_slot(self) -> bool:
+        return self._in_flight < int(self._limit)
+
+    def _adjust(self) -> None:
+        overloaded = self._window_overloaded or self._latency > self._target_latency
+        batching = (self._batch_size, self._linger)
+
+        if overloaded:
+            self._limit = max(self._limit * self._decrease_factor, self._min_limit)
+            self._batch_size = min(self._batch_size * 2, self._max_batch_size)
+            self._linger = min(self._linger * 2, self._max_linger)
+        else:
+            self._limit = min(self._limit + 1, self._max_limit)
+            self._batch_size = max(self._batch_size - self._min_batch_size, self._min_batch_size)
+            self._linger = max(self._linger - self._min_linger, self._min_linger)
+
+        self._condition.notify_all()
+
+        if (self._batch_size, self._linger) != batching:
+            logger.info(
+                f"Sinks {'overloaded' if overloaded else 'recovered'}. "
+                f"Concurrency limit: {self.limit}, "
+                f"batch size: {self._batch_size}, linger: {self._linger}s.")
+
+            for sink in self._sinks:
+                sink.tune(batch_size=self._batch_size, linger=self._linger)
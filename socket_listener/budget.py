@@ -0,0 +1,184 @@
+"""Process-wide budget of the memory held by packets in flight.
+
+During a sink slowdown, handler threads, their packets, decoded messages and the internal
+batches of sinks pile up until the process runs out of memory.
+A MemoryBudget bounds the bytes held by packets between their reception and the moment
+their handler finishes publishing them, i.e., when sinks acknowledged them.
+Sinks that buffer packets (e.g., local sinks) bound their own buffers.
+
+Each packet is accounted as its size times amplification (its raw data, decoded string
+and messages), plus a fixed overhead. Packets are admitted by the server thread,
+before a handler thread is created for them. When the budget is exceeded, the policy decides:
+    - 'block': stop reading the socket until enough memory is released
+      (or max_wait expires, in which case the packet is dropped).
+    - 'drop': drop the packet immediately.
+    - 'spill': write the datagram to capture files in spill_dir, to replay it later
+      with `socket-listener transmitter --capture --path <spill_dir>`.
+
+A packet is always admitted when nothing is in flight, so larger packets can't get stuck.
+"""
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Union
+
+from socket_listener.capture import CaptureWriter
+from socket_listener.metrics import MetricsRegistry, registry as default_registry
+
+logger = logging.getLogger(__name__)
+
+
+class Policy:
+    BLOCK = "block"
+    DROP = "drop"
+    SPILL = "spill"
+
+    ALL = frozenset([BLOCK, DROP, SPILL])
+
+
+class MemoryBudget:
+    """Limits the bytes held by packets in flight.
+
+    Call acquire() when a datagram is received. If it returns True,
+    call release() with the same data once the packet was published.
+
+    Args:
+        max_bytes:
+            Max bytes held by packets in flight.
+
+        policy:
+            What to do with a packet when the budget is exceeded: 'block', 'drop' or 'spill'.
+
+        max_wait:
+            With 'block' policy, max seconds to wait for memory before dropping the packet.
+            If None, waits indefinitely.
+
+        spill_dir:
+            With 'spill' policy, directory of the capture files.
+
+        amplification:
+            Factor applied to the size of each packet.
+
+        overhead:
+            Bytes added to the accounted size of each packet.
+
+        metrics:
+            Registry where usage, dropped and spilled packets are exposed.
+    """
+    def __init__(
+        self,
+        max_bytes: int,
+        policy: str = Policy.BLOCK,
+        max_wait: float = 1.0,
+        spill_dir: Union[str, Path] = None,
+        amplification: float = 3,
+        overhead: int = 1024,
+        metrics: MetricsRegistry = None,
+    ) -> None:
+        if policy not in Policy.ALL:
+            raise ValueError(f"Invalid policy: {policy}. Must be one of: {sorted(Policy.ALL)}.")
+
+        if policy == Policy.SPILL and spill_dir is None:
+            raise ValueError("A spill directory is required with 'spill' policy.")
+
+        if max_bytes <= 0:
+            raise ValueError(f"Invalid max_bytes: {max_bytes}. Must be > 0.")
+
+        self._max_bytes = max_bytes
+        self._policy = policy
+        self._max_wait = max_wait
+        self._amplification = amplification
+        self._overhead = overhead
+        self._spill = None
+        if policy == Policy.SPILL:
+            self._spill = CaptureWriter(spill_dir, prefix="spill")
+
+        self._condition = threading.Condition()
+        self._used = 0
+        self._spill_failed = False
+
+        metrics = metrics or default_registry
+        self._blocked = metrics.counter("memory_budget_blocked_total")
+        self._dropped = metrics.counter("memory_budget_dropped_total")
+        self._spilled = metrics.counter("memory_budget_spilled_total")
+        metrics.gauge("memory_budget_used_bytes", lambda: self._used)
+        metrics.gauge("memory_budget_limit_bytes", lambda: self._max_bytes)
+
+    @property
+    def used(self) -> int:
+        """Returns the bytes accounted to packets in flight."""
+        return self._used
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    @property
+    def policy(self) -> str:
+        return self._policy
+
+    def cost(self, data: bytes) -> int:
+        """Returns the bytes accounted to a packet with the given data."""
+        return int(len(data) * self._amplification) + self._overhead
+
+    def acquire(self, data: bytes, host: str = None, port: int = 0) -> bool:
+        """Accounts a received datagram, according to the policy.
+
+        Args:
+            data:
+                The datagram.
+
+            host:
+                Source IP, written to spill files.
+
+            port:
+                Source port, written to spill files.
+
+        Returns:
+            True if the packet was admitted, False if it was dropped or spilled.
+        """
+        cost = self.cost(data)
+        with self._condition:
+            if self._policy == Policy.BLOCK and not self._fits(cost):
+                self._blocked.inc()
+                self._condition.wait_for(lambda: self._fits(cost), timeout=self._max_wait)
+
+            if self._fits(cost):
+                self._used += cost
+                return True
+
+        if self._spill is not None:
+            return self._spill_datagram(data, host, port)
+
+        self._dropped.inc()
+        return False
+
+    def release(self, data: bytes) -> None:
+        """Releases the bytes accounted to an admitted datagram."""
+        with self._condition:
+            self._used -= self.cost(data)
+            self._condition.notify_all()
+
+    def close(self) -> None:
+        """Closes the spill files, if any."""
+        if self._spill is not None:
+            self._spill.close()
+
+    def _fits(self, cost: int) -> bool:
+        return self._used == 0 or self._used + cost <= self._max_bytes
+
+    def _spill_datagram(self, data: bytes, host: str, port: int) -> bool:
+        try:
+            self._spill.write(data, time_ns=time.time_ns(), host=host, port=port)
+        except (OSError, ValueError) as e:
+            if not self._spill_failed:
+                self._spill_failed = True
+                logger.warning(f"Failed to spill packet to {self._spill.directory}: {e!r}.")
+
+            self._dropped.inc()
+            return False
+
+        self._spill_failed = False
+        self._spilled.inc()
+        return False
@@ -0,0 +1,325 @@
+"""Binary capture format for incoming datagrams.
+
+A capture is a directory of append-only segment files.
+Each segment starts with an 8-byte magic string, followed by records:
+
+```text
+ offset  size  field
+ 0       8     reception time, as nanoseconds since epoch (unsigned, big-endian)
+ 8       4     datagram length (N)
+ 12      16    source address (IPv6, or IPv4-mapped IPv6; all zeros if unknown)
+ 28      2     source port
+ 30      N     datagram
+```
+
+Every index_interval records, an entry (record number, offset, time) is appended
+to a sidecar index file ('<segment>.idx'), so readers can seek by time without a full scan.
+Segments are rotated when they reach a size limit and can be compressed with gzip once closed.
+Offsets in the index always refer to the uncompressed segment.
+
+Uncompressed segments are read through mmap,
+so records can be sent without copying their data.
+"""
+import os
+import gzip
+import mmap
+import shutil
+import struct
+import logging
+import threading
+import ipaddress
+
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Iterator, Union
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SLCAP001"
+SEGMENT_SUFFIX = ".slcap"
+INDEX_SUFFIX = ".idx"
+
+RECORD_HEADER = struct.Struct(">QI16sH")
+INDEX_ENTRY = struct.Struct(">QQQ")
+
+_NO_ADDRESS = bytes(16)
+
+
+class CaptureError(ValueError):
+    pass
+
+
+@dataclass
+class Record:
+    """A captured datagram.
+
+    Attributes:
+        time_ns:
+            Reception time, as nanoseconds since epoch.
+
+        host:
+            Source IP, or None if unknown.
+
+        port:
+            Source port.
+
+        data:
+            The datagram. For uncompressed segments, a memoryview into the mapped file,
+            which is only valid while the reader is open.
+    """
+    time_ns: int
+    host: str
+    port: int
+    data: Union[bytes, memoryview]
+
+
+def encode_address(host: str) -> bytes:
+    """Packs an IPv4 or IPv6 address into 16 bytes."""
+    if host is None:
+        return _NO_ADDRESS
+
+    address = ipaddress.ip_address(host)
+    if address.version == 4:
+        address = ipaddress.IPv6Address(f"::ffff:{address}")
+
+    return address.packed
+
+
+def decode_address(packed: bytes) -> str:
+    """Unpacks an address packed with encode_address."""
+    if packed == _NO_ADDRESS:
+        return None
+
+    address = ipaddress.IPv6Address(packed)
+    if address.ipv4_mapped is not None:
+        return str(address.ipv4_mapped)
+
+    return str(address)
+
+
+class CaptureWriter:
+    """Appends datagrams to segment-rotated capture files. Thread-safe.
+
+    Args:
+        directory:
+            Directory where segments are written. Created if it does not exist.
+
+        segment_size:
+            Size in bytes after which the current segment is closed and a new one is started.
+
+        compress:
+            If True, closed segments are compressed with gzip.
+
+        index_interval:
+            Number of records between entries of the sidecar index.
+
+        prefix:
+            Prefix of the segment file names.
+    """
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        segment_size: int = 256 * 1024 * 1024,
+        compress: bool = False,
+        index_interval: int = 1000,
+        prefix: str = "capture",
+    ) -> None:
+        self._directory = Path(directory)
+        self._segment_size = segment_size
+        self._compress = compress
+        self._index_interval = index_interval
+        self._prefix = prefix
+
+        self._lock = threading.Lock()
+        self._segment_number = 0
+        self._file = None
+        self._index = None
+        self._path = None
+        self._records = 0
+        self._offset = 0
+
+        self._directory.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def directory(self) -> Path:
+        return self._directory
+
+    def write(self, data: bytes, time_ns: int, host: str = None, port: int = 0) -> None:
+        """Appends a datagram to the current segment."""
+        header = RECORD_HEADER.pack(time_ns, len(data), encode_address(host), port or 0)
+
+        with self._lock:
+            if self._file is None:
+                self._open_segment()
+
+            if self._records % self._index_interval == 0:
+                self._index.write(INDEX_ENTRY.pack(self._records, self._offset, time_ns))
+
+            self._file.write(header)
+            self._file.write(data)
+            self._records += 1
+            self._offset += len(header) + len(data)
+
+            if self._offset >= self._segment_size:
+                self._close_segment()
+
+    def flush(self) -> None:
+        """Flushes buffered records to the operating system."""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                self._index.flush()
+
+    def close(self) -> None:
+        """Closes the current segment."""
+        with self._lock:
+            self._close_segment()
+
+    def _open_segment(self) -> None:
+        name = f"{self._prefix}-{os.getpid()}-{self._segment_number:06d}{SEGMENT_SUFFIX}"
+        self._segment_number += 1
+
+        self._path = self._directory / name
+        self._file = open(self._path, "wb")
+        self._index = open(self._path.with_name(name + INDEX_SUFFIX), "wb")
+        self._file.write(MAGIC)
+        self._records = 0
+        self._offset = len(MAGIC)
+
+        logger.info(f"Writing capture segment: {self._path}")
+
+    def _close_segment(self) -> None:
+        if self._file is None:
+            return
+
+        self._file.close()
+        self._index.close()
+        self._file = None
+
+        if self._compress:
+            compressed = self._path.with_name(self._path.name + ".gz")
+            with open(self._path, "rb") as src, gzip.open(compressed, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+
+            self._path.unlink()
+
+
+class CaptureReader:
+    """Reads records from a capture segment, compressed or not.
+
+    Use it as a context manager:
+
+    ```python
+    with CaptureReader(path) as reader:
+        for record in reader:
+            ...
+    ```
+
+    Args:
+        path:
+            Path to a segment file ('.slcap' or '.slcap.gz').
+    """
+    def __init__(self, path: Union[str, Path]) -> None:
+        self._path = Path(path)
+        self._buffer = None
+        self._file = None
+
+    def __enter__(self) -> 'CaptureReader':
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[Record]:
+        return self.records()
+
+    def open(self) -> None:
+        if self._path.suffix == ".gz":
+            with gzip.open(self._path, "rb") as f:
+                self._buffer = f.read()
+        else:
+            self._file = open(self._path, "rb")
+            self._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._buffer[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise CaptureError(f"Not a capture file: {self._path}.")
+
+    def close(self) -> None:
+        if isinstance(self._buffer, mmap.mmap):
+            try:
+                self._buffer.close()
+            except BufferError:
+                # Records still reference the map. It is released when they are collected.
+                pass
+
+        if self._file is not None:
+            self._file.close()
+
+        self._buffer = None
+        self._file = None
+
+    def index(self) -> list[tuple[int, int, int]]:
+        """Returns the index entries (record number, offset, time_ns) of the segment."""
+        index_path = _index_path(self._path)
+        if not index_path.exists():
+            return []
+
+        return list(INDEX_ENTRY.iter_unpack(index_path.read_bytes()))
+
+    def records(self, start_time_ns: int = None) -> Iterator[Record]:
+        """Yields the records of the segment.
+
+        Args:
+            start_time_ns:
+                If passed, records received before this time are skipped,
+                using the index to avoid reading the whole segment.
+        """
+        view = memoryview(self._buffer)
+        offset = len(MAGIC)
+
+        if start_time_ns is not None:
+            for _, entry_offset, entry_time in self.index():
+                if entry_time > start_time_ns:
+                    break
+
+                offset = entry_offset
+
+        size = len(view)
+        while offset + RECORD_HEADER.size <= size:
+            time_ns, length, address, port = RECORD_HEADER.unpack_from(view, offset)
+            offset += RECORD_HEADER.size
+
+            if offset + length > size:
+                logger.warning(f"Truncated record found at the end of {self._path}.")
+                return
+
+            if start_time_ns is None or time_ns >= start_time_ns:
+                yield Record(time_ns, decode_address(address), port, view[offset:offset + length])
+
+            offset += length
+
+
+def list_segments(path: Union[str, Path]) -> list[Path]:
+    """Returns the segment files of a capture directory (sorted), or the path itself if a file."""
+    path = Path(path)
+    if not path.is_dir():
+        return [path]
+
+    return sorted(
+        p for p in path.iterdir()
+        if p.name.endswith(SEGMENT_SUFFIX) or p.name.endswith(SEGMENT_SUFFIX + ".gz")
+    )
+
+
+def is_capture(path: Union[str, Path]) -> bool:
+    """Returns whether the file starts with the capture magic string."""
+    opener = gzip.open if Path(path).suffix == ".gz" else open
+    with opener(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def _index_path(path: Path) -> Path:
+    name = path.name[:-len(".gz")] if path.suffix == ".gz" else path.name
+    return path.with_name(name + INDEX_SUFFIX)
@@ -2,12 +2,11 @@
 import sys
 import logging
 import argparse
+import importlib
 
 from gfw.common.logging import LoggerConfig
 from gfw.common.cli import CLI, Option, ParametrizedCommand
 
-from socket_listener import receivers
-from socket_listener import transmitters
 from socket_listener.version import __version__
 from socket_listener.assets import get_sample_data_path
 
@@ -32,30 +31,109 @@ HELP_WORKDIR = "Directory to use for saving outputs, logs, and other artifacts."
 HELP_RECEIVER = "Receives data continuosly from network sockets."
 HELP_CONFIG_FILE = "Path to config file. If passed, rest of CLI args are ignored."
 HELP_MAX_PACKET_SIZE = "The maximum amount of data to be received at once."
+HELP_ADAPTIVE_PACKET_SIZE = "Grow --max-packet-size when datagrams are truncated."
+HELP_MAX_PACKET_SIZE_LIMIT = "With --adaptive-packet-size, max value of --max-packet-size."
 HELP_DELIMITER = "Delimiter to use when splitting incoming packets into messages."
 HELP_PROVIDER_NAME = "Provider name to use in the metadata of ingested messages."
 HELP_MONITOR_DELAY = "Number of seconds between each log entry of ThreadMonitor."
+HELP_METRICS_DELAY = "Number of seconds between each log entry of metrics. Disabled if not set."
+HELP_BACKPRESSURE = "Enable adaptive backpressure between reception and sinks."
+HELP_BP_TARGET_LATENCY = "Publish latency in seconds above which sinks are considered overloaded."
+HELP_BP_MAX_CONCURRENCY = "Maximum number of packets published concurrently."
+HELP_BP_POLICY = "What to do with packets when sinks are overloaded: block or drop."
+HELP_BP_MAX_WAIT = "With block policy, max seconds to wait before dropping a packet."
+HELP_MEMORY_BUDGET = "Max MB held by packets in flight. Not limited if not set."
+HELP_MEMORY_BUDGET_POLICY = "What to do with packets over the memory budget: block, drop or spill."
+HELP_MEMORY_BUDGET_MAX_WAIT = "With block policy, max seconds to wait for memory before dropping."
+HELP_SPILL_DIR = "With spill policy, directory for spilled packets [default: <workdir>/spill]."
+HELP_ERROR_BUDGET = "Number of sink errors tolerated within --error-window before shutting down."
+HELP_ERROR_WINDOW = "Length in seconds of the sliding window in which sink errors are counted."
+HELP_HEALTH_PORT = "Port to serve health checks (/healthz, /readyz) and /metrics. Off if not set."
+HELP_HEALTH_MAX_IDLE = "Max seconds without receiving packets to be live. Not checked if not set."
+HELP_HEALTH_MAX_PUBLISH_DELAY = "Max seconds with received packets not published to be live."
+HELP_PROFILE_DURATION = "Seconds to profile the receiver on SIGUSR1 or POST /profile."
+HELP_TAP = "Comma-separated outputs of a sampled packet tap: file:PATH, memory[:N], udp:HOST:PORT."
+HELP_TAP_EVERY = "Sample 1 in every N packets to the tap [default: 1000]."
+HELP_TAP_RATE = "Sample at most N packets per second per provider to the tap."
+HELP_ASYNC_LOGGING = "Write logs from a background thread and rate limit warnings and errors."
+HELP_LOG_RATE_LIMIT = "With --async-logging, max warnings and errors per line of code per window."
+HELP_LOG_RATE_WINDOW = "With --async-logging, length in seconds of the log rate limit windows."
+HELP_RELOAD_CONFIG = "Reload the --config-file on SIGHUP or when it changes, without restarting."
+HELP_RELOAD_INTERVAL = "With --reload-config, seconds between checks of the config file."
+HELP_DRAIN_TIMEOUT = "Max seconds to wait for in-flight packets when draining on SIGTERM."
 
 HELP_PUBSUB = "Enable publication to Google PubSub service."
 HELP_PUB_PROJ = "GCP project id."
-HELP_PUB_TOPIC = "Google Pub/Sub topic id."
+HELP_PUB_TOPIC = "Google Pub/Sub topic id. Comma-separated to shard across multiple topics."
 HELP_FORMAT = "Data format to use for Google Pub/Sub messages."
+HELP_METADATA_ENCODING = "Encoding of packet metadata in Pub/Sub messages: attributes or compact."
+HELP_COMPRESSION = "Codec to compress raw Pub/Sub payloads: zlib, gzip, zstd, zstd-dict or lz4."
+HELP_PUB_CLIENTS = "Number of Pub/Sub publisher clients to shard publishing across."
+HELP_PUB_SHARDING = "How packets are assigned to Pub/Sub shards: round_robin, source or provider."
+HELP_PUB_ORDERING_KEY = "Packet attribute used as Pub/Sub ordering key: source or provider."
+HELP_PUB_EMULATED = "Publish to an in-process Pub/Sub emulator [useful for load testing]."
+HELP_PUB_EMULATED_LATENCY = "Mean publish latency in seconds of the Pub/Sub emulator."
+HELP_PUB_EMULATED_JITTER = "Max deviation in seconds of the Pub/Sub emulator publish latency."
+HELP_PUB_EMULATED_ERROR_RATE = "Fraction of messages that fail in the Pub/Sub emulator."
+HELP_VALIDATE_CHECKSUMS = "Drop messages with invalid NMEA checksums."
+HELP_INVALID_PUB_TOPIC = "With checksum validation, publish invalid messages to this topic."
+HELP_ROUTES = "Path to YAML file with routes to publish messages to different sinks."
+HELP_CAPTURE_DIR = "Record incoming packets into capture files in this directory."
+HELP_CAPTURE_SEGMENT_SIZE = "Size in MB after which a new capture segment is started."
+HELP_CAPTURE_COMPRESS = "Compress closed capture segments with gzip."
+HELP_UNIX_SOCKET = "Write packets to the Unix domain socket at this path."
+HELP_UNIX_SOCKET_TYPE = "Type of the Unix domain socket: stream or datagram."
+HELP_PIPE = "Write packets to the named pipe at this path, or stdout if '-'."
+HELP_UDP_FORWARD = "Comma-separated host:port addresses to forward each datagram to."
+HELP_PUBLISHER_PROCESSES = "Run sinks in N publisher processes fed by shared memory. Off if 0."
+HELP_PUBLISHER_RING_SIZE = "Size in MB of the ring buffer of each publisher process."
+HELP_PUBLISHER_MAX_WAIT = "Max seconds to wait for a full ring buffer before dropping a packet."
 
 HELP_TRANSMITTER = "Sends lines from a file through network sockets [useful for testing]."
 HELP_PATH = "Path to the file or folder containing the data to send."
 HELP_DELAY = "Delay in seconds between sent messages."
 HELP_CHUNK_SIZE = "Amount of messages to be sent in a single packet."
-HELP_SPLITTER = "Function to use for splitting the input files into chunks."
+HELP_SPLITTER = "How to split the input into datagrams: fixed, nmea, bytes or nmea-bytes."
+HELP_DATAGRAM_SIZE = "With bytes and nmea-bytes splitters, max bytes per datagram [default: 1472]."
 HELP_FIRST_N = "Only send the first n messages of the file and then stop.."
+HELP_CAPTURE = "Replay capture files recorded by the receiver, instead of text files."
+HELP_SPEED = "Replay speed factor relative to original timing. If 0, send as fast as possible."
+HELP_SYNTHETIC = "Send synthetic AIS messages generated in memory, instead of the path."
+HELP_RATE = "Target messages per second, instead of delay. With synthetic, max if not set."
+HELP_SYNTHETIC_FLEET_SIZE = "Number of distinct vessels of the synthetic traffic."
+HELP_SYNTHETIC_MULTIPART_RATIO = "Fraction of synthetic messages that are multipart."
+HELP_SYNTHETIC_TAGBLOCKS = "Prefix synthetic sentences with tagblocks."
+HELP_PROCESSES = "Number of processes to shard the transmission across."
+
+HELP_ANALYZE = "Analyzes NMEA files: duplicates, multipart completeness, talkers and rates."
+HELP_ANALYZE_PATH = "Path to the file or folder with the NMEA files to analyze (.gz supported)."
+HELP_ANALYZE_PROCESSES = "Number of processes to shard the analysis across. Defaults to CPUs."
+HELP_SHARD_SIZE = "Size in MB of the shards in which plain files are split."
+HELP_MAX_OPEN_GROUPS = "Max number of interleaved multipart groups tracked per shard."
+HELP_OUTPUT = "Path to a JSON file where to write the report."
 
 DEFAULT_PROTOCOL = "UDP"
 DEFAULT_PATH = str(get_sample_data_path("nmea.txt"))
 DEFAULT_PUB_PROJ = "world-fishing-827"
 DEFAULT_PUB_TOPIC = "nmea-stream-dev"
 DEFAULT_FORMAT = "raw"
+DEFAULT_METADATA_ENCODING = "attributes"
 
 DEFAULT_WORKDIR = "workdir"
 
+# Modules that implement each subcommand.
+# They are imported only when the subcommand runs, so --help and startup are fast.
+COMMANDS = {
+    "receiver": "socket_listener.receivers",
+    "transmitter": "socket_listener.transmitters",
+    "analyze": "socket_listener.analysis",
+}
+
+
+def load_command(name: str):
+    """Returns the module that implements the given subcommand."""
+    return importlib.import_module(COMMANDS[name])
+
 
 def formatter():
     """Returns a formatter for argparse help."""
@@ -66,21 +144,188 @@ def formatter():
     return formatter
 
 
-def cli(args):
+def config_file_path(args) -> str:
+    """Returns the path of the config file passed in the command-line arguments, if any."""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("-c", "--config-file", type=str, default=None)
+    ns, _ = parser.parse_known_args(args)
+    return ns.config_file
+
+
+def run_receiver(config, drain_on_sigterm: bool = False, config_file: str = None):
+    """Runs the receiver command.
+
+    Args:
+        config:
+            Namespace with the resolved configuration of the command.
+
+        drain_on_sigterm:
+            If True, the receiver is drained when the process receives SIGTERM,
+            profiled when it receives SIGUSR1, and its packet tap is toggled with SIGUSR2.
+            With --reload-config, the config file is also reloaded on SIGHUP.
+
+        config_file:
+            Path of the config file, watched for changes with --reload-config.
+    """
+    options = vars(config)
+    reload_config = options.pop("reload_config", False)
+    reload_interval = options.pop("reload_interval", 2)
+
+    receivers = load_command("receiver")
+    result = receivers.run(**options)
+    if result is None:
+        return result
+
+    receiver, _ = result
+    if drain_on_sigterm:
+        receivers.install_drain_handler(receiver)
+        receivers.install_profile_handler(receiver)
+        receivers.install_tap_handler(receiver)
+
+    if reload_config:
+        if config_file is None:
+            logger.warning("--reload-config needs a --config-file. Ignored.")
+            return result
+
+        from socket_listener.reloading import ConfigReloader, install_reload_handler
+
+        reloader = ConfigReloader(receiver, config_file, options, delay=reload_interval)
+        reloader.start()
+        if drain_on_sigterm:
+            install_reload_handler(reloader)
+
+    return result
+
+
+def run_transmitter(config):
+    """Runs the transmitter command.
+
+    Args:
+        config:
+            Namespace with the resolved configuration of the command.
+    """
+    return load_command("transmitter").run(**vars(config))
+
+
+def run_analyzer(config):
+    """Runs the analyze command.
+
+    Args:
+        config:
+            Configuration for the analysis.
+    """
+    return load_command("analyze").run(**vars(config))
+
+
+def cli(args, drain_on_sigterm: bool = False):
     receiver_cmd = ParametrizedCommand(
         name="receiver",
         description=HELP_RECEIVER,
         options=[
             Option("--max-packet-size", type=int, default=4096, help=HELP_MAX_PACKET_SIZE),
+            Option(
+                "--adaptive-packet-size", type=bool, default=False,
+                help=HELP_ADAPTIVE_PACKET_SIZE
+            ),
+            Option(
+                "--max-packet-size-limit", type=int, default=65535,
+                help=HELP_MAX_PACKET_SIZE_LIMIT
+            ),
             Option("--delimiter", type=str, default=None, help=HELP_DELIMITER),
             Option("--thread-monitor-delay", type=float, help=HELP_MONITOR_DELAY),
             Option("--provider-name", type=str, help=HELP_PROVIDER_NAME),
+            Option("--drain-timeout", type=float, default=20, help=HELP_DRAIN_TIMEOUT),
+            Option("--error-budget", type=int, default=0, help=HELP_ERROR_BUDGET),
+            Option("--error-window", type=float, default=60, help=HELP_ERROR_WINDOW),
+            Option("--health-port", type=int, help=HELP_HEALTH_PORT),
+            Option("--health-max-idle", type=float, help=HELP_HEALTH_MAX_IDLE),
+            Option(
+                "--health-max-publish-delay", type=float, default=60,
+                help=HELP_HEALTH_MAX_PUBLISH_DELAY
+            ),
+            Option("--workdir", type=str, default=DEFAULT_WORKDIR, help=HELP_WORKDIR),
+            Option("--profile-duration", type=float, default=30, help=HELP_PROFILE_DURATION),
+            Option("--tap", type=str, help=HELP_TAP),
+            Option("--tap-every", type=int, help=HELP_TAP_EVERY),
+            Option("--tap-rate", type=float, help=HELP_TAP_RATE),
+            Option("--async-logging", type=bool, default=False, help=HELP_ASYNC_LOGGING),
+            Option("--log-rate-limit", type=int, default=10, help=HELP_LOG_RATE_LIMIT),
+            Option("--log-rate-window", type=float, default=60, help=HELP_LOG_RATE_WINDOW),
+            Option("--reload-config", type=bool, default=False, help=HELP_RELOAD_CONFIG),
+            Option("--reload-interval", type=float, default=2, help=HELP_RELOAD_INTERVAL),
+            Option("--metrics-monitor-delay", type=float, help=HELP_METRICS_DELAY),
+            Option("--backpressure", type=bool, default=False, help=HELP_BACKPRESSURE),
+            Option(
+                "--backpressure-target-latency", type=float, default=0.5,
+                help=HELP_BP_TARGET_LATENCY
+            ),
+            Option(
+                "--backpressure-max-concurrency", type=int, default=200,
+                help=HELP_BP_MAX_CONCURRENCY
+            ),
+            Option("--backpressure-policy", type=str, default="block", help=HELP_BP_POLICY),
+            Option("--backpressure-max-wait", type=float, default=1.0, help=HELP_BP_MAX_WAIT),
+            Option("--memory-budget", type=int, help=HELP_MEMORY_BUDGET),
+            Option(
+                "--memory-budget-policy", type=str, default="block",
+                help=HELP_MEMORY_BUDGET_POLICY
+            ),
+            Option(
+                "--memory-budget-max-wait", type=float, default=1.0,
+                help=HELP_MEMORY_BUDGET_MAX_WAIT
+            ),
+            Option("--spill-dir", type=str, help=HELP_SPILL_DIR),
             Option("--pubsub", type=bool, default=False, help=HELP_PUBSUB),
             Option("--pubsub-project", type=str, default=DEFAULT_PUB_PROJ,  help=HELP_PUB_PROJ),
             Option("--pubsub-topic", type=str, default=DEFAULT_PUB_TOPIC, help=HELP_PUB_TOPIC),
-            Option("--pubsub-data-format", type=str, default=DEFAULT_FORMAT, help=HELP_FORMAT)
+            Option("--pubsub-data-format", type=str, default=DEFAULT_FORMAT, help=HELP_FORMAT),
+            Option(
+                "--pubsub-metadata-encoding", type=str, default=DEFAULT_METADATA_ENCODING,
+                help=HELP_METADATA_ENCODING
+            ),
+            Option("--pubsub-compression", type=str, help=HELP_COMPRESSION),
+            Option("--pubsub-clients", type=int, default=1, help=HELP_PUB_CLIENTS),
+            Option(
+                "--pubsub-sharding", type=str, default="round_robin", help=HELP_PUB_SHARDING
+            ),
+            Option("--pubsub-ordering-key", type=str, help=HELP_PUB_ORDERING_KEY),
+            Option("--pubsub-emulated", type=bool, default=False, help=HELP_PUB_EMULATED),
+            Option(
+                "--pubsub-emulated-latency", type=float, default=0.05,
+                help=HELP_PUB_EMULATED_LATENCY
+            ),
+            Option(
+                "--pubsub-emulated-jitter", type=float, default=0, help=HELP_PUB_EMULATED_JITTER
+            ),
+            Option(
+                "--pubsub-emulated-error-rate", type=float, default=0,
+                help=HELP_PUB_EMULATED_ERROR_RATE
+            ),
+            Option("--validate-checksums", type=bool, default=False, help=HELP_VALIDATE_CHECKSUMS),
+            Option("--invalid-pubsub-topic", type=str, help=HELP_INVALID_PUB_TOPIC),
+            Option("--routes", type=str, help=HELP_ROUTES),
+            Option("--capture-dir", type=str, help=HELP_CAPTURE_DIR),
+            Option(
+                "--capture-segment-size", type=int, default=256, help=HELP_CAPTURE_SEGMENT_SIZE
+            ),
+            Option("--capture-compress", type=bool, default=False, help=HELP_CAPTURE_COMPRESS),
+            Option("--unix-socket", type=str, help=HELP_UNIX_SOCKET),
+            Option("--unix-socket-type", type=str, default="stream", help=HELP_UNIX_SOCKET_TYPE),
+            Option("--pipe", type=str, help=HELP_PIPE),
+            Option("--udp-forward", type=str, help=HELP_UDP_FORWARD),
+            Option(
+                "--publisher-processes", type=int, default=0, help=HELP_PUBLISHER_PROCESSES
+            ),
+            Option(
+                "--publisher-ring-size", type=int, default=64, help=HELP_PUBLISHER_RING_SIZE
+            ),
+            Option(
+                "--publisher-max-wait", type=float, default=1.0, help=HELP_PUBLISHER_MAX_WAIT
+            ),
         ],
-        run=lambda config: receivers.run(**vars(config)),
+        run=lambda config: run_receiver(
+            config, drain_on_sigterm=drain_on_sigterm, config_file=config_file_path(args)
+        ),
     )
 
     transmitter_cmd = ParametrizedCommand(
@@ -89,11 +334,40 @@ def cli(args):
         options=[
             Option("--chunk-size", type=int, default=50, help=HELP_CHUNK_SIZE),
             Option("--splitter", type=str, default="fixed", help=HELP_SPLITTER),
+            Option("--datagram-size", type=int, default=1472, help=HELP_DATAGRAM_SIZE),
             Option("--first-n", type=int, help=HELP_FIRST_N),
             Option("--delay", type=float, default=1, help=HELP_DELAY),
+            Option("--capture", type=bool, default=False, help=HELP_CAPTURE),
+            Option("--speed", type=float, default=1, help=HELP_SPEED),
+            Option("--synthetic", type=bool, default=False, help=HELP_SYNTHETIC),
+            Option("--rate", type=float, help=HELP_RATE),
+            Option("--processes", type=int, default=1, help=HELP_PROCESSES),
+            Option(
+                "--synthetic-fleet-size", type=int, default=1000, help=HELP_SYNTHETIC_FLEET_SIZE
+            ),
+            Option(
+                "--synthetic-multipart-ratio", type=float, default=0.1,
+                help=HELP_SYNTHETIC_MULTIPART_RATIO
+            ),
+            Option(
+                "--synthetic-tagblocks", type=bool, default=False, help=HELP_SYNTHETIC_TAGBLOCKS
+            ),
             Option("-p", "--path", type=str, default=DEFAULT_PATH, help=HELP_PATH),
         ],
-        run=lambda config: transmitters.run(**vars(config)),
+        run=run_transmitter,
+    )
+
+    analyze_cmd = ParametrizedCommand(
+        name="analyze",
+        description=HELP_ANALYZE,
+        options=[
+            Option("-p", "--path", type=str, default=DEFAULT_PATH, help=HELP_ANALYZE_PATH),
+            Option("--processes", type=int, help=HELP_ANALYZE_PROCESSES),
+            Option("--shard-size", type=float, default=64, help=HELP_SHARD_SIZE),
+            Option("--max-open-groups", type=int, default=1000, help=HELP_MAX_OPEN_GROUPS),
+            Option("--output", type=str, help=HELP_OUTPUT),
+        ],
+        run=run_analyzer,
     )
 
     socket_listener_cli = CLI(
@@ -105,6 +379,7 @@ def cli(args):
             "socket-listener -h",
             "socket-listener receiver --pubsub",
             "socket-listener transmitter --path myfile.txt",
+            "socket-listener analyze --path captures/",
         ],
         options=[
             Option("--protocol", type=str, default=DEFAULT_PROTOCOL, help=HELP_PROTOCOL),
@@ -112,7 +387,7 @@ def cli(args):
             Option("--port", type=int, default=10110, help=HELP_PORT),
             Option("--daemon-thread", type=bool, default=False, help=HELP_DAEMON_THREAD),
         ],
-        subcommands=[receiver_cmd, transmitter_cmd],
+        subcommands=[receiver_cmd, transmitter_cmd, analyze_cmd],
         logger_config=LoggerConfig(
             warning_level=[
                 "google.cloud.pubsub_v1.publisher",
@@ -126,7 +401,7 @@ def cli(args):
 
 
 def main():
-    cli(sys.argv[1:])
+    cli(sys.argv[1:], drain_on_sigterm=True)
 
 
 if __name__ == "__main__":
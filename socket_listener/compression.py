@@ -0,0 +1,221 @@
+"""Compression codecs for sink payloads.
+
+The zlib and gzip codecs are always available.
+The zstd and lz4 codecs require the optional zstandard and lz4 packages:
+
+```shell
+pip install socket-listener[compression]
+```
+
+The zstd codec can use a dictionary trained on the NMEA sample data shipped with the package,
+which significantly improves the compression ratio of small payloads.
+Training is deterministic, so consumers can rebuild the same dictionary to decompress.
+"""
+import gzip
+import zlib
+import threading
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Iterable
+
+from socket_listener.assets import get_sample_data_path
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+try:
+    import lz4.frame
+except ImportError:  # pragma: no cover
+    lz4 = None
+
+
+DICTIONARY_SAMPLES = ("nmea.txt", "nmea-with-tagblock.txt")
+DICTIONARY_SIZE = 16 * 1024
+
+
+class Codec(ABC):
+    """Base class for compression codecs.
+
+    The name of the codec is used as content-encoding attribute of compressed messages.
+    """
+    name = None
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        """Compresses data."""
+
+    @abstractmethod
+    def decompress(self, data: bytes) -> bytes:
+        """Decompresses data."""
+
+
+class ZlibCodec(Codec):
+    """Zlib (deflate) codec.
+
+    Args:
+        level:
+            Compression level, from 0 to 9.
+    """
+    name = "zlib"
+
+    def __init__(self, level: int = 6) -> None:
+        self._level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, self._level)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zlib.decompress(data)
+
+
+class GzipCodec(Codec):
+    """Gzip codec.
+
+    Args:
+        level:
+            Compression level, from 0 to 9.
+    """
+    name = "gzip"
+
+    def __init__(self, level: int = 6) -> None:
+        self._level = level
+
+    def compress(self, data: bytes) -> bytes:
+        # mtime=0 makes the output deterministic.
+        return gzip.compress(data, compresslevel=self._level, mtime=0)
+
+    def decompress(self, data: bytes) -> bytes:
+        return gzip.decompress(data)
+
+
+class ZstdCodec(Codec):
+    """Zstandard codec. Requires the zstandard package.
+
+    Args:
+        level:
+            Compression level, from 1 to 22.
+
+        dict_data:
+            A zstandard.ZstdCompressionDict to use, if any.
+    """
+    name = "zstd"
+
+    def __init__(self, level: int = 3, dict_data=None) -> None:
+        _check_installed(zstandard, "zstandard", self.name)
+
+        self._level = level
+        self._dict_data = dict_data
+
+        # Compressor objects are not thread-safe, so each handler thread gets its own.
+        self._local = threading.local()
+
+    def compress(self, data: bytes) -> bytes:
+        compressor = getattr(self._local, "compressor", None)
+        if compressor is None:
+            compressor = zstandard.ZstdCompressor(level=self._level, dict_data=self._dict_data)
+            self._local.compressor = compressor
+
+        return compressor.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zstandard.ZstdDecompressor(dict_data=self._dict_data).decompress(data)
+
+
+class ZstdDictCodec(ZstdCodec):
+    """Zstandard codec with a dictionary trained on the package NMEA sample data.
+
+    Args:
+        level:
+            Compression level, from 1 to 22.
+    """
+    name = "zstd-dict"
+
+    def __init__(self, level: int = 3) -> None:
+        _check_installed(zstandard, "zstandard", self.name)
+        super().__init__(level=level, dict_data=train_zstd_dictionary())
+
+
+class LZ4Codec(Codec):
+    """LZ4 frame codec. Requires the lz4 package.
+
+    Args:
+        level:
+            Compression level, from 0 to 16.
+    """
+    name = "lz4"
+
+    def __init__(self, level: int = 0) -> None:
+        _check_installed(lz4, "lz4", self.name)
+        self._level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return lz4.frame.compress(data, compression_level=self._level)
+
+    def decompress(self, data: bytes) -> bytes:
+        return lz4.frame.decompress(data)
+
+
+CODECS = {
+    "zlib": ZlibCodec,
+    "gzip": GzipCodec,
+    "zstd": ZstdCodec,
+    "zstd-dict": ZstdDictCodec,
+    "lz4": LZ4Codec,
+}
+
+
+def create_codec(name: str, **kwargs) -> Codec:
+    """Instantiates a codec by name.
+
+    Args:
+        name:
+            One of the keys of CODECS. Also the content-encoding attribute of the messages.
+
+        **kwargs:
+            Keyword arguments for the codec constructor.
+
+    Raises:
+        ValueError: if the codec is unknown or its optional dependency is not installed.
+    """
+    if name not in CODECS:
+        raise ValueError(f"Invalid compression: {name}. Must be one of: {sorted(CODECS)}")
+
+    return CODECS[name](**kwargs)
+
+
+def available_codecs() -> list[str]:
+    """Returns names of the codecs whose dependencies are installed."""
+    optional = {"zstd": zstandard, "zstd-dict": zstandard, "lz4": lz4}
+    return [name for name in CODECS if optional.get(name, True) is not None]
+
+
+@lru_cache(maxsize=1)
+def train_zstd_dictionary(
+    samples: Iterable[str] = DICTIONARY_SAMPLES, size: int = DICTIONARY_SIZE
+):
+    """Trains a zstd dictionary with the lines of the package sample data files.
+
+    Args:
+        samples:
+            Names of files inside the package sample data folder.
+
+        size:
+            Size in bytes of the dictionary.
+
+    Returns:
+        A zstandard.ZstdCompressionDict.
+    """
+    _check_installed(zstandard, "zstandard", "zstd")
+
+    lines = []
+    for sample in samples:
+        lines.extend(get_sample_data_path(sample).read_bytes().splitlines())
+
+    return zstandard.train_dictionary(size, lines)
+
+
+def _check_installed(module, package: str, codec: str) -> None:
+    if module is None:
+        raise ValueError(f"Compression '{codec}' requires the '{package}' package.")
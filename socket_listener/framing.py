@@ -0,0 +1,195 @@
+"""Compact binary framing of packet metadata.
+
+By default, sinks send packet metadata as string attributes along with each message.
+The compact framing instead prepends a small binary header to the message data:
+
+```text
+ offset  size  field
+ 0       1     magic (0xA1)
+ 1       1     version (1)
+ 2       1     protocol code (0: unknown, 1: UDP, 2: TCP)
+ 3       1     source host kind (0: none, 1: IPv4, 2: IPv6, 3: text)
+ 4       8     reception time, as nanoseconds since epoch (unsigned, big-endian)
+ 12      1     source name length (N)
+ 13      N     source name (UTF-8)
+ 13+N    H     source host: 0, 4 or 16 bytes for IPv4/IPv6, or 1 byte length + text
+ ...           message data
+```
+
+Headers are cached per (protocol, source host, source name),
+so the time field is the only part computed for every message.
+Use decode() to recover the metadata and data on the consumer side.
+"""
+import struct
+import ipaddress
+
+from functools import lru_cache
+from datetime import datetime, timedelta, timezone
+
+from socket_listener.packet import Packet
+
+MAGIC = 0xA1
+VERSION = 1
+
+PROTOCOLS = (None, "UDP", "TCP")
+
+HOST_NONE = 0
+HOST_IPV4 = 1
+HOST_IPV6 = 2
+HOST_TEXT = 3
+
+_PREFIX = struct.Struct(">BBBBQ")
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+class FramingError(ValueError):
+    pass
+
+
+def to_epoch_ns(time: datetime) -> int:
+    """Converts a timezone-aware datetime to nanoseconds since epoch without precision loss."""
+    return (time - _EPOCH) // _MICROSECOND * 1000
+
+
+def from_epoch_ns(ns: int) -> datetime:
+    """Converts nanoseconds since epoch to a timezone-aware datetime (microsecond precision)."""
+    return _EPOCH + timedelta(microseconds=ns // 1000)
+
+
+def encode(packet: Packet, data: bytes = None) -> bytes:
+    """Frames data with the compact metadata header of the packet.
+
+    Args:
+        packet:
+            The packet whose metadata is encoded.
+
+        data:
+            The data to frame. Defaults to the whole packet data.
+
+    Returns:
+        The header followed by the data.
+    """
+    if data is None:
+        data = packet.data
+
+    head, tail = _encode_static(packet.protocol, packet.source_host, packet.source_name)
+    return b"".join((head, struct.pack(">Q", to_epoch_ns(packet.time)), tail, data))
+
+
+def decode(payload: bytes) -> tuple[dict, bytes]:
+    """Decodes a compact framed payload.
+
+    Args:
+        payload:
+            A payload produced by encode().
+
+    Returns:
+        A tuple (metadata, data), where metadata has the same form as Packet.metadata.
+
+    Raises:
+        FramingError: if the payload is not a valid compact frame.
+    """
+    try:
+        magic, version, protocol, host_kind, ns = _PREFIX.unpack_from(payload)
+    except struct.error:
+        raise FramingError("Payload too short to contain a compact header.")
+
+    if magic != MAGIC or version != VERSION:
+        raise FramingError(f"Unknown framing (magic={magic:#x}, version={version}).")
+
+    view = memoryview(payload)
+    offset = _PREFIX.size
+
+    source_name, offset = _decode_text(view, offset)
+
+    source_host = None
+    if host_kind == HOST_IPV4:
+        source_host = str(ipaddress.IPv4Address(_read(view, offset, 4)))
+        offset += 4
+    elif host_kind == HOST_IPV6:
+        source_host = str(ipaddress.IPv6Address(_read(view, offset, 16)))
+        offset += 16
+    elif host_kind == HOST_TEXT:
+        source_host, offset = _decode_text(view, offset)
+    elif host_kind != HOST_NONE:
+        raise FramingError(f"Unknown source host kind: {host_kind}.")
+
+    try:
+        protocol = PROTOCOLS[protocol]
+    except IndexError:
+        raise FramingError(f"Unknown protocol code: {protocol}.")
+
+    metadata = dict(
+        protocol=protocol,
+        source_host=source_host,
+        source_name=source_name,
+        time=from_epoch_ns(ns).isoformat(),
+    )
+
+    return metadata, bytes(view[offset:])
+
+
+def check_text(text: str) -> None:
+    """Raises FramingError if the text (e.g., a source name) is too long to be encoded."""
+    _encode_text(text)
+
+
+def is_compact(payload: bytes) -> bool:
+    """Returns whether the payload seems to be framed with a compact header."""
+    return len(payload) >= _PREFIX.size and payload[0] == MAGIC and payload[1] == VERSION
+
+
+@lru_cache(maxsize=1024)
+def _encode_static(protocol: str, source_host: str, source_name: str) -> tuple[bytes, bytes]:
+    # Returns the parts of the header before and after the time field.
+    try:
+        protocol_code = PROTOCOLS.index(protocol)
+    except ValueError:
+        raise FramingError(f"Protocol '{protocol}' cannot be encoded. Must be one of {PROTOCOLS}.")
+
+    host_kind, host = _encode_host(source_host)
+    name = _encode_text(source_name or "")
+
+    head = bytes((MAGIC, VERSION, protocol_code, host_kind))
+    return head, name + host
+
+
+def _encode_host(source_host: str) -> tuple[int, bytes]:
+    if source_host is None:
+        return HOST_NONE, b""
+
+    try:
+        address = ipaddress.ip_address(source_host)
+    except ValueError:
+        return HOST_TEXT, _encode_text(source_host)
+
+    kind = HOST_IPV4 if address.version == 4 else HOST_IPV6
+    return kind, address.packed
+
+
+def _encode_text(text: str) -> bytes:
+    encoded = text.encode("utf-8")
+    if len(encoded) > 255:
+        raise FramingError(f"Text too long to be encoded: {text}.")
+
+    return bytes((len(encoded),)) + encoded
+
+
+def _read(view: memoryview, offset: int, size: int) -> bytes:
+    if offset + size > len(view):
+        raise FramingError(f"Payload truncated: {size} byte(s) expected at offset {offset}.")
+
+    return bytes(view[offset:offset + size])
+
+
+def _decode_text(view: memoryview, offset: int) -> tuple[str, int]:
+    # Returns the length-prefixed text at offset, and the offset after it.
+    (length,) = _read(view, offset, 1)
+    try:
+        text = _read(view, offset + 1, length).decode("utf-8")
+    except UnicodeDecodeError as e:
+        raise FramingError(f"Invalid text at offset {offset + 1}: {e}.")
+
+    return text, offset + 1 + length
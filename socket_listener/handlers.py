@@ -1,4 +1,5 @@
 """Module that encapsulates requests handlers."""
+import time
 import logging
 import threading
 import socketserver
@@ -18,30 +19,64 @@ class DataPublisherMixIn:
         Args:
             data: the data to publish.
         """
-        host, _ = self.client_address
+        # Taken once, so the packet is processed with a single configuration, even on reload.
+        config = self.server.acquire_config()
+        try:
+            self._publish(data, config)
+        finally:
+            config.in_flight.release()
+
+    def _publish(self, data: bytes, config):
+        host, port, *_ = self.client_address
 
         packet = Packet(
             data,
             protocol=self.protocol,
             source_host=host,
-            source_name=self.server.provider_name,
-            delimiter=self.server.delimiter
+            source_port=port,
+            source_name=config.provider_name,
+            delimiter=config.delimiter
         )
 
-        logger.debug(
-            "Received {} message(s) from '{}' in {}."
-            .format(packet.size, packet.source_name, threading.current_thread().name))
+        if logger.isEnabledFor(logging.DEBUG):
+            # Counting messages splits the packet, so it is only done when debugging.
+            logger.debug(
+                "Received %d message(s) from '%s' in %s.",
+                packet.size, packet.source_name, threading.current_thread().name)
+
+        tap = self.server.tap
+        if tap is not None and tap.enabled:
+            tap.offer(packet)
 
-        # TODO: Add a parameter to enable packet logging.
-        #       We don't always want to do this.
-        # if logging.getLogger().level == logging.DEBUG:
-        #    packet.debug()
+        if self.server.supervisor is not None and self.server.supervisor.failed:
+            # Sinks are failing and the server is shutting down, don't keep publishing.
+            return
 
+        start = time.monotonic()
+        ok = True
         try:
-            for sink in self.server.sinks:
-                sink.publish(packet)
+            if config.validator is not None:
+                packet = config.validator.filter(packet)
+
+            if packet is None:
+                deliveries = []
+            elif config.router is not None:
+                deliveries = config.router.route(packet)
+            else:
+                deliveries = [(sink, packet) for sink in config.sinks]
+
+            for sink, routed_packet in deliveries:
+                sink.publish(routed_packet)
+
+            # Also when the packet was filtered out, so health checks don't see it as pending.
+            self.server.stats.published()
         except SinkError as e:
-            self.server.exceptions[type(e)] = e
+            ok = False
+            if self.server.supervisor is not None:
+                self.server.supervisor.report(e)
+        finally:
+            if self.server.controller is not None:
+                self.server.controller.release(time.monotonic() - start, ok=ok)
 
 
 class UDPRequestHandler(socketserver.BaseRequestHandler, DataPublisherMixIn):
@@ -0,0 +1,318 @@
+"""Liveness and readiness of a receiver, served over HTTP for k8s probes.
+
+The hot path only records the monotonic time of the last received and published packets,
+with plain attribute assignments (atomic in CPython), so no locks are taken per packet.
+Health is computed from those timestamps when a probe arrives:
+    - Ready: the socket is being served and sinks are not failing.
+    - Live: sinks are not failing, packets were received recently (if max_idle is set),
+      publishing is not stalled and the in-flight limit is not saturated for too long.
+
+Endpoints:
+    - /healthz: liveness.
+    - /readyz: readiness.
+    - /metrics: metrics snapshot in Prometheus text format.
+    - POST /profile?duration=<seconds>: triggers the profiler, if any.
+    - GET /tap: configuration of the packet tap, if any, and packets kept in memory.
+    - POST /tap?enabled=<bool>&every=<N>&rate=<N>: reconfigures the packet tap, if any.
+"""
+import re
+import json
+import time
+import logging
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+from urllib.parse import parse_qs, urlsplit
+
+from socket_listener.inflight import InFlight
+from socket_listener.metrics import MetricsRegistry, registry as default_registry
+from socket_listener.profiling import Profiler
+from socket_listener.supervisor import Supervisor
+from socket_listener.tap import PacketTap
+
+logger = logging.getLogger(__name__)
+
+_LABEL_REGEX = re.compile(r"(\w+)=([^,}]*)")
+
+
+class IngestStats:
+    """Times of the last received and published packets, updated without locks.
+
+    Args:
+        clock:
+            Function returning monotonic time in seconds.
+    """
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self.started = clock()
+        self.last_received = None
+        self.last_published = None
+
+    def received(self) -> None:
+        self.last_received = self._clock()
+
+    def published(self) -> None:
+        self.last_published = self._clock()
+
+
+class HealthCheck:
+    """Computes liveness and readiness of a receiver.
+
+    Args:
+        stats:
+            IngestStats updated by the receiver.
+
+        serving:
+            Function returning whether the socket is being served.
+
+        supervisor:
+            Supervisor of sink errors.
+
+        in_flight:
+            Packets being processed by request handlers.
+
+        max_in_flight:
+            Function returning the in-flight limit, e.g. that of the backpressure controller.
+            If None, saturation is not checked.
+
+        max_idle:
+            Max seconds without receiving packets to be considered live. If None, not checked.
+
+        max_publish_delay:
+            Max seconds that checks may observe received packets without any later publication,
+            or the in-flight limit saturated, to be considered live.
+
+        clock:
+            Function returning monotonic time in seconds.
+    """
+    def __init__(
+        self,
+        stats: IngestStats,
+        serving: Callable[[], bool],
+        supervisor: Supervisor,
+        in_flight: InFlight,
+        max_in_flight: Callable[[], int] = None,
+        max_idle: float = None,
+        max_publish_delay: float = 60,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._stats = stats
+        self._serving = serving
+        self._supervisor = supervisor
+        self._in_flight = in_flight
+        self._max_in_flight = max_in_flight
+        self._max_idle = max_idle
+        self._max_publish_delay = max_publish_delay
+        self._clock = clock
+        self._pending_since = None
+        self._pending_published = None
+        self._saturated_since = None
+
+    def readiness(self) -> tuple[bool, dict]:
+        """Returns a tuple (ready, details)."""
+        details = dict(serving=self._serving(), sinks=self._supervisor.health)
+        return details["serving"] and not self._supervisor.failed, details
+
+    def liveness(self) -> tuple[bool, dict]:
+        """Returns a tuple (live, details)."""
+        now = self._clock()
+        stats = self._stats
+
+        last_received = stats.last_received
+        last_published = stats.last_published
+        idle = now - (stats.started if last_received is None else last_received)
+
+        stalled = self._stalled(last_received, last_published, now)
+        saturated = self._saturated(now)
+        details = dict(
+            sinks=self._supervisor.health,
+            idle_seconds=round(idle, 3),
+            in_flight=self._in_flight.count,
+            stalled=stalled,
+            saturated=saturated,
+        )
+
+        live = (
+            not self._supervisor.failed
+            and (self._max_idle is None or idle <= self._max_idle)
+            and not stalled
+            and not saturated
+        )
+
+        return live, details
+
+    def _stalled(self, last_received: float, last_published: float, now: float) -> bool:
+        # Stalled if, for max_publish_delay, checks saw packets received after the last
+        # publication and no new publication happened.
+        pending = last_received is not None and (
+            last_published is None or last_received > last_published
+        )
+
+        if not pending:
+            self._pending_since = None
+            return False
+
+        if self._pending_since is None or last_published != self._pending_published:
+            self._pending_since = now
+            self._pending_published = last_published
+
+        return now - self._pending_since > self._max_publish_delay
+
+    def _saturated(self, now: float) -> bool:
+        # Saturated if checks saw the in-flight limit reached for max_publish_delay.
+        if self._max_in_flight is None or self._in_flight.count < self._max_in_flight():
+            self._saturated_since = None
+            return False
+
+        if self._saturated_since is None:
+            self._saturated_since = now
+
+        return now - self._saturated_since > self._max_publish_delay
+
+
+class HealthServer:
+    """HTTP server for health probes and metrics, running in a daemon thread.
+
+    Args:
+        health:
+            The HealthCheck to report.
+
+        host:
+            The IP address to use.
+
+        port:
+            The port to use. If 0, a free port is chosen.
+
+        metrics:
+            Registry to serve in /metrics. Defaults to the module-level registry.
+
+        profiler:
+            Profiler to trigger with POST /profile. If None, profiling is not available.
+
+        tap:
+            PacketTap to inspect with GET /tap and reconfigure with POST /tap.
+            If None, the tap is not available.
+    """
+    def __init__(
+        self,
+        health: HealthCheck,
+        host: str = "0.0.0.0",
+        port: int = 8080,
+        metrics: MetricsRegistry = None,
+        profiler: Profiler = None,
+        tap: PacketTap = None,
+    ) -> None:
+        self._health = health
+        self._metrics = metrics or default_registry
+        self._profiler = profiler
+        self._tap = tap
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def start(self) -> None:
+        logger.info(f"Serving health checks on port {self.port}...")
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="health", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._server.shutdown()
+
+        self._server.server_close()
+
+    def _handler_class(self):
+        health = self._health
+        metrics = self._metrics
+        profiler = self._profiler
+        tap = self._tap
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/healthz":
+                    self._send_check(*health.liveness())
+                elif self.path == "/readyz":
+                    self._send_check(*health.readiness())
+                elif self.path == "/metrics":
+                    self._send(HTTPStatus.OK, prometheus(metrics.snapshot()), "text/plain")
+                elif self.path == "/tap" and tap is not None:
+                    self._send_json(HTTPStatus.OK, dict(tap.state, packets=tap.recent()))
+                else:
+                    self._send(HTTPStatus.NOT_FOUND, "Not found.\n", "text/plain")
+
+            def do_POST(self):
+                url = urlsplit(self.path)
+                if url.path == "/tap" and tap is not None:
+                    self._configure_tap(parse_qs(url.query))
+                    return
+
+                if url.path != "/profile" or profiler is None:
+                    self._send(HTTPStatus.NOT_FOUND, "Not found.\n", "text/plain")
+                    return
+
+                duration = parse_qs(url.query).get("duration")
+                try:
+                    duration = float(duration[0]) if duration else None
+                except ValueError:
+                    self._send(HTTPStatus.BAD_REQUEST, "Invalid duration.\n", "text/plain")
+                    return
+
+                started = profiler.trigger(duration)
+                status = HTTPStatus.ACCEPTED if started else HTTPStatus.CONFLICT
+                body = json.dumps(dict(started=started)) + "\n"
+                self._send(status, body, "application/json")
+
+            def _configure_tap(self, query):
+                enabled = query.get("enabled")
+                every = query.get("every")
+                rate = query.get("rate")
+                try:
+                    tap.configure(
+                        enabled=enabled[0].lower() in ("1", "true", "yes") if enabled else None,
+                        every=int(every[0]) if every else None,
+                        rate=float(rate[0]) if rate else None,
+                    )
+                except ValueError as e:
+                    self._send(HTTPStatus.BAD_REQUEST, f"{e}\n", "text/plain")
+                    return
+
+                self._send_json(HTTPStatus.OK, tap.state)
+
+            def _send_json(self, status, data):
+                self._send(status, json.dumps(data) + "\n", "application/json")
+
+            def _send_check(self, ok, details):
+                status = HTTPStatus.OK if ok else HTTPStatus.SERVICE_UNAVAILABLE
+                body = json.dumps(dict(ok=ok, **details)) + "\n"
+                self._send(status, body, "application/json")
+
+            def _send(self, status, body, content_type):
+                data = body.encode()
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                # Probes arrive every few seconds, don't flood the logs.
+                logger.debug(format % args)
+
+        return Handler
+
+
+def prometheus(snapshot: dict) -> str:
+    """Formats a metrics snapshot, e.g. {'name{a=b}': 1}, in Prometheus text format."""
+    lines = []
+    for key, value in snapshot.items():
+        name = _LABEL_REGEX.sub(r'\1="\2"', key)
+        lines.append(f"{name} {value}")
+
+    return "\n".join(lines) + "\n"
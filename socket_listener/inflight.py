@@ -0,0 +1,55 @@
+"""Module with utilities to keep track of packets being processed."""
+import threading
+
+
+class InFlight:
+    """Thread-safe counter of packets that are being processed by request handlers.
+
+    Call acquire() when a packet is accepted and release() when its processing ends,
+    or use an instance as a context manager around the processing of each packet:
+
+    ```python
+    with in_flight:
+        publish(packet)
+    ```
+    """
+    def __init__(self) -> None:
+        self._count = 0
+        self._condition = threading.Condition()
+
+    def __enter__(self) -> 'InFlight':
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+    @property
+    def count(self) -> int:
+        """Returns the number of packets currently in flight."""
+        return self._count
+
+    def acquire(self) -> None:
+        """Registers a new packet in flight."""
+        with self._condition:
+            self._count += 1
+
+    def release(self) -> None:
+        """Registers that a packet in flight was processed."""
+        with self._condition:
+            self._count -= 1
+            if self._count == 0:
+                self._condition.notify_all()
+
+    def wait(self, timeout: float = None) -> bool:
+        """Blocks until there are no packets in flight or the timeout expires.
+
+        Args:
+            timeout:
+                Maximum number of seconds to wait. If None, waits indefinitely.
+
+        Returns:
+            True if there are no packets in flight, False if the timeout expired.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._count == 0, timeout=timeout)
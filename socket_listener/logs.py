@@ -0,0 +1,277 @@
+"""Asynchronous, rate-limited logging, so logging never slows down request handlers.
+
+With the default handlers, every log record is formatted and written to stdout synchronously
+in the thread that logs it. During an outage, every failed publish logs an error,
+and request handlers spend their time writing the same line over and over.
+
+install_async_logging() moves the handlers of a logger (the root logger by default)
+behind a queue:
+    - Request handlers only append records to a bounded queue. If it is full,
+      records are dropped and counted in log_dropped_total, instead of blocking.
+    - Records are formatted lazily, by a background writer thread that owns the handlers.
+    - Records of each call site (file and line) are rate limited: after burst records
+      within window seconds, the rest are dropped and counted in log_suppressed_total.
+      The next record of the call site that gets through tells how many were suppressed.
+"""
+import sys
+import time
+import queue
+import atexit
+import logging
+import threading
+import logging.handlers
+from typing import Callable
+
+from .metrics import MetricsRegistry, registry as default_registry
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitFilter(logging.Filter):
+    """Lets through at most burst records per call site within each window of seconds.
+
+    Args:
+        burst:
+            Max records of a call site within a window.
+
+        window:
+            Length of the windows in seconds.
+
+        level:
+            Records below this level are not rate limited.
+
+        metrics:
+            Registry where suppressed records are counted.
+
+        clock:
+            Function returning monotonic time in seconds.
+    """
+    def __init__(
+        self,
+        burst: int = 10,
+        window: float = 60,
+        level: int = logging.WARNING,
+        metrics: MetricsRegistry = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        super().__init__()
+        if burst < 1:
+            raise ValueError(f"Invalid burst: {burst}. Must be >= 1.")
+
+        self._burst = burst
+        self._window = window
+        self._level = level
+        self._clock = clock
+        self._suppressed = (metrics or default_registry).counter("log_suppressed_total")
+        # {(pathname, lineno): [window start, records in window, suppressed in window]}.
+        self._sites = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self._level:
+            return True
+
+        key = (record.pathname, record.lineno)
+        now = self._clock()
+        with self._lock:
+            site = self._sites.get(key)
+            suppressed = 0
+            if site is None or now - site[0] >= self._window:
+                suppressed = site[2] if site is not None else 0
+                site = self._sites[key] = [now, 0, 0]
+
+            site[1] += 1
+            if site[1] > self._burst:
+                site[2] += 1
+                self._suppressed.inc()
+                return False
+
+        if suppressed:
+            record.msg = (
+                f"{record.msg} [{suppressed} similar message(s) suppressed "
+                f"in the previous {self._window:g} seconds]")
+
+        return True
+
+    def pending(self) -> list[tuple[str, int, int]]:
+        """Returns and resets the records suppressed and not reported yet, per call site.
+
+        Returns:
+            A list of tuples (pathname, lineno, suppressed).
+        """
+        with self._lock:
+            pending = [(*key, site[2]) for key, site in self._sites.items() if site[2]]
+            for site in self._sites.values():
+                site[2] = 0
+
+        return pending
+
+
+class AsyncQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that neither formats records nor blocks.
+
+    The standard QueueHandler formats records in the calling thread, so they can be pickled.
+    Here the queue is consumed by a thread of the same process,
+    so records are enqueued as they are and formatted by the writer thread.
+    Records are only dropped and counted if the queue is full.
+
+    Args:
+        records:
+            Bounded queue consumed by a QueueListener.
+
+        metrics:
+            Registry where dropped records are counted.
+    """
+    def __init__(self, records: queue.Queue, metrics: MetricsRegistry = None) -> None:
+        super().__init__(records)
+        self._dropped = (metrics or default_registry).counter("log_dropped_total")
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self._dropped.inc()
+
+
+class AsyncLogging:
+    """Handlers of a logger moved behind a queue and a writer thread.
+
+    Use install_async_logging() to create it.
+
+    Args:
+        logger:
+            Logger whose handlers are moved.
+
+        max_queue:
+            Max records waiting to be written.
+
+        rate_limit:
+            Max records per call site within rate_limit_window. If 0, not rate limited.
+
+        rate_limit_window:
+            Length in seconds of the rate limit windows.
+
+        metrics:
+            Registry where dropped and suppressed records are counted.
+    """
+    def __init__(
+        self,
+        logger: logging.Logger,
+        max_queue: int = 10000,
+        rate_limit: int = 10,
+        rate_limit_window: float = 60,
+        metrics: MetricsRegistry = None,
+    ) -> None:
+        self._logger = logger
+        self._handlers = list(logger.handlers)
+        self._handler = AsyncQueueHandler(queue.Queue(max_queue), metrics=metrics)
+        self._filter = None
+        if rate_limit > 0:
+            self._filter = RateLimitFilter(rate_limit, rate_limit_window, metrics=metrics)
+            self._handler.addFilter(self._filter)
+
+        self._listener = logging.handlers.QueueListener(
+            self._handler.queue, *self._handlers, respect_handler_level=True
+        )
+        # As in QueueHandler of Python >= 3.12, so the handlers behind the queue can be found.
+        self._handler.listener = self._listener
+        self._stopped = False
+
+    @property
+    def handler(self) -> AsyncQueueHandler:
+        return self._handler
+
+    def start(self) -> None:
+        for handler in self._handlers:
+            self._logger.removeHandler(handler)
+
+        self._logger.addHandler(self._handler)
+        self._listener.start()
+
+    def stop(self) -> None:
+        """Writes pending records and suppression summaries, and restores the handlers."""
+        if self._stopped:
+            return
+
+        self._stopped = True
+        if self._filter is not None:
+            for pathname, lineno, suppressed in self._filter.pending():
+                record = self._logger.makeRecord(
+                    __name__, logging.WARNING, pathname, lineno,
+                    f"{suppressed} message(s) from {pathname}:{lineno} suppressed.", None, None)
+                self._handler.enqueue(record)
+
+        self._logger.removeHandler(self._handler)
+        self._listener.stop()
+        for handler in self._handlers:
+            self._logger.addHandler(handler)
+
+
+def install_async_logging(logger: logging.Logger = None, **kwargs) -> AsyncLogging:
+    """Moves the handlers of a logger behind a queue written by a background thread.
+
+    Pending records are written when the process exits.
+    Does nothing if the logger already logs asynchronously.
+
+    Args:
+        logger:
+            The logger to make asynchronous. Defaults to the root logger.
+
+        **kwargs:
+            Keyword arguments for AsyncLogging.
+
+    Returns:
+        The AsyncLogging, or None if it was already installed.
+    """
+    logger = logger or logging.getLogger()
+    if any(isinstance(h, AsyncQueueHandler) for h in logger.handlers):
+        return None
+
+    async_logging = AsyncLogging(logger, **kwargs)
+    async_logging.start()
+    atexit.register(async_logging.stop)
+    return async_logging
+
+
+def redirect_console_logging(logger: logging.Logger = None, stream=None) -> int:
+    """Makes the handlers of a logger that write to the standard output write to another stream.
+
+    Used when the standard output carries data, e.g., the records of a pipe sink.
+    Covers stream handlers, rich handlers, and handlers behind asynchronous logging.
+
+    Args:
+        logger:
+            The logger whose handlers are redirected. Defaults to the root logger.
+
+        stream:
+            The stream to write to. Defaults to the standard error.
+
+    Returns:
+        The number of redirected handlers.
+    """
+    logger = logger or logging.getLogger()
+    stream = stream or sys.stderr
+    stdout = (sys.stdout, sys.__stdout__)
+
+    redirected = 0
+    handlers = list(logger.handlers)
+    while handlers:
+        handler = handlers.pop()
+        listener = getattr(handler, "listener", None)
+        if listener is not None:
+            handlers.extend(listener.handlers)
+
+        if isinstance(handler, logging.StreamHandler) and handler.stream in stdout:
+            handler.setStream(stream)
+            redirected += 1
+
+        # RichHandler writes to the file of its console.
+        console = getattr(handler, "console", None)
+        if console is not None and getattr(console, "file", None) in stdout:
+            console.file = stream
+            redirected += 1
+
+    return redirected
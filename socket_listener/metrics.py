@@ -0,0 +1,136 @@
+"""Lightweight in-process metrics.
+
+Metrics are registered by name (and optional labels) in a MetricsRegistry.
+The module-level registry is used by default, similarly to the logging module.
+
+Counters are incremented in the hot path, so they hold their lock only for an addition.
+Request handlers run in a thread per packet, so per-thread cells would grow without bound.
+"""
+import logging
+import threading
+from typing import Callable, Union
+
+from .monitor import Monitor
+
+logger = logging.getLogger(__name__)
+
+Number = Union[int, float]
+
+
+class Counter:
+    """Monotonic counter that can be incremented concurrently."""
+    def __init__(self) -> None:
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        """Increments the counter by amount."""
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+
+class Gauge:
+    """Value that can go up and down.
+
+    Args:
+        function:
+            If passed, the value of the gauge is obtained by calling it.
+    """
+    def __init__(self, function: Callable[[], Number] = None) -> None:
+        self._function = function
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def set(self, value: Number) -> None:
+        self._value = value
+
+    def add(self, amount: Number) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> Number:
+        if self._function is not None:
+            return self._function()
+
+        return self._value
+
+
+class MetricsRegistry:
+    """Container of named metrics."""
+    def __init__(self) -> None:
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, **labels: str) -> Counter:
+        """Returns the counter with the given name and labels, creating it if needed."""
+        return self._get_or_create(Counter, name, labels)
+
+    def gauge(self, name: str, function: Callable[[], Number] = None, **labels: str) -> Gauge:
+        """Returns the gauge with the given name and labels, creating it if needed.
+
+        If function is passed, it replaces the function of an existing gauge.
+        """
+        gauge = self._get_or_create(Gauge, name, labels)
+        if function is not None:
+            gauge._function = function
+
+        return gauge
+
+    def snapshot(self) -> dict[str, Number]:
+        """Returns a dictionary with {metric_key: value} of all registered metrics."""
+        with self._lock:
+            metrics = list(self._metrics.items())
+
+        return {key: metric.value for key, metric in sorted(metrics)}
+
+    def clear(self) -> None:
+        """Removes all registered metrics."""
+        with self._lock:
+            self._metrics.clear()
+
+    def _get_or_create(self, cls, name: str, labels: dict):
+        key = self.key(name, **labels)
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.setdefault(key, cls())
+
+        if not isinstance(metric, cls):
+            raise TypeError(f"Metric {key} is already registered as {type(metric).__name__}.")
+
+        return metric
+
+    @staticmethod
+    def key(name: str, **labels: str) -> str:
+        """Returns the key of a metric, e.g., 'packets_total{source=10.0.0.1}'."""
+        if not labels:
+            return name
+
+        labels_str = ",".join(f"{k}={v}" for k, v in sorted(labels.items()))
+        return f"{name}{{{labels_str}}}"
+
+
+registry = MetricsRegistry()
+
+
+class MetricsMonitor(Monitor):
+    """Thread that periodically logs a snapshot of the registered metrics.
+
+    Args:
+        metrics:
+            The registry to log. Defaults to the module-level registry.
+
+        kwargs:
+            Any keyword argument to be passed to Monitor base class.
+    """
+    def __init__(self, metrics: MetricsRegistry = None, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._metrics = metrics or registry
+
+    def operation(self):
+        logger.info(f"Metrics: {self._metrics.snapshot()}")
@@ -4,7 +4,7 @@ from typing import Generator
 
 from datetime import datetime, timezone
 from functools import cached_property
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +27,9 @@ class Packet:
         source_host:
             IP of the source.
 
+        source_port:
+            Port of the source.
+
         source_name:
             Name of the source.
 
@@ -39,6 +42,7 @@ class Packet:
     data: bytes
     protocol: str = None
     source_host: tuple = None
+    source_port: int = None
     source_name: str = "Unknown"
     delimiter: str = "\n"
     decode_method: str = "utf-8"
@@ -93,6 +97,12 @@ class Packet:
             logger.debug("Will return a single message with raw data.")
             yield self.data
 
+    def with_data(self, data: bytes) -> "Packet":
+        """Returns a copy of the packet with other data, keeping the metadata and time."""
+        packet = replace(self, data=data)
+        packet.time = self.time
+        return packet
+
     def debug(self):
         """Logs the packet.
 
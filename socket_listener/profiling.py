@@ -0,0 +1,190 @@
+"""On-demand profiling of a running process.
+
+A Profiler is triggered (e.g., on SIGUSR1 or from the health server) and, during a time window,
+samples the stacks of all threads and traces memory allocations with tracemalloc.
+Results are written as files in a directory:
+    - <name>.collapsed: sampled stacks in collapsed format, e.g. for flamegraph.pl or speedscope.
+    - <name>.txt: functions with most samples, by own time and including callees.
+    - <name>-memory.txt: allocations that grew the most during the window.
+
+Stacks are sampled from a separate thread with sys._current_frames(), so, unlike cProfile,
+every request handler thread is included and nothing is hooked into the profiled threads.
+When not triggered, profiling has no overhead at all.
+"""
+import os
+import sys
+import time
+import logging
+import threading
+import tracemalloc
+from pathlib import Path
+from collections import Counter
+from typing import Union
+
+logger = logging.getLogger(__name__)
+
+
+def sample_stacks(duration: float, interval: float = 0.005) -> Counter:
+    """Samples the stacks of all threads, except the calling one, during duration seconds.
+
+    Returns:
+        A Counter of {stack: number of samples}, each stack a tuple of functions
+        from the outermost to the innermost frame.
+    """
+    own = threading.get_ident()
+    stacks = Counter()
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                filename = os.path.basename(code.co_filename)
+                stack.append(f"{code.co_name} ({filename}:{code.co_firstlineno})")
+                frame = frame.f_back
+
+            stacks[tuple(reversed(stack))] += 1
+
+        time.sleep(interval)
+
+    return stacks
+
+
+def collapsed(stacks: Counter) -> str:
+    """Formats stacks in collapsed format: one 'outer;...;inner count' line per stack."""
+    return "".join(f"{';'.join(stack)} {count}\n" for stack, count in stacks.most_common())
+
+
+def summary(stacks: Counter, top: int = 30) -> str:
+    """Formats the functions with most samples, by own samples and including callees."""
+    total = sum(stacks.values()) or 1
+    own = Counter()
+    cumulative = Counter()
+    for stack, count in stacks.items():
+        if stack:
+            own[stack[-1]] += count
+
+        for function in set(stack):
+            cumulative[function] += count
+
+    lines = [f"{total} samples.", ""]
+    for title, counter in (("Own", own), ("Including callees", cumulative)):
+        lines.append(f"{title}:")
+        for function, count in counter.most_common(top):
+            lines.append(f"{count / total:>7.1%} {count:>8}  {function}")
+
+        lines.append("")
+
+    return "\n".join(lines)
+
+
+class Profiler:
+    """Profiles the process during a time window, in a background thread.
+
+    Args:
+        directory:
+            Directory in which to write the results.
+
+        duration:
+            Default length of the profiling window in seconds.
+
+        interval:
+            Seconds between stack samples.
+
+        memory:
+            If True, memory allocations are traced during the window.
+
+        top:
+            Number of functions and allocation sites included in summaries.
+    """
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        duration: float = 30,
+        interval: float = 0.005,
+        memory: bool = True,
+        top: int = 30,
+    ) -> None:
+        self._directory = Path(directory)
+        self._duration = duration
+        self._interval = interval
+        self._memory = memory
+        self._top = top
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def trigger(self, duration: float = None) -> bool:
+        """Starts profiling in a background thread.
+
+        Returns:
+            True if profiling started, False if it was already running.
+        """
+        with self._lock:
+            if self.running:
+                logger.warning("Profiling is already running.")
+                return False
+
+            self._thread = threading.Thread(
+                target=self.profile, args=(duration,), name="profiler", daemon=True
+            )
+            self._thread.start()
+            return True
+
+    def profile(self, duration: float = None) -> list[Path]:
+        """Profiles the process during duration seconds and writes the results.
+
+        Returns:
+            The paths of the written files.
+        """
+        duration = self._duration if duration is None else duration
+        logger.info(f"Profiling for {duration} seconds...")
+
+        trace_memory = self._memory and not tracemalloc.is_tracing()
+        start_snapshot = None
+        if trace_memory:
+            tracemalloc.start()
+            start_snapshot = tracemalloc.take_snapshot()
+
+        try:
+            stacks = sample_stacks(duration, interval=self._interval)
+            end_snapshot = tracemalloc.take_snapshot() if trace_memory else None
+        finally:
+            if trace_memory:
+                tracemalloc.stop()
+
+        self._directory.mkdir(parents=True, exist_ok=True)
+        name = time.strftime("profile-%Y%m%dT%H%M%S", time.gmtime())
+
+        outputs = {
+            f"{name}.collapsed": collapsed(stacks),
+            f"{name}.txt": summary(stacks, top=self._top),
+        }
+
+        if end_snapshot is not None:
+            outputs[f"{name}-memory.txt"] = self._memory_summary(start_snapshot, end_snapshot)
+
+        paths = []
+        for filename, content in outputs.items():
+            path = self._directory / filename
+            path.write_text(content)
+            paths.append(path)
+
+        logger.info(f"Profile written to {self._directory / name}.*")
+        return paths
+
+    def _memory_summary(self, start: tracemalloc.Snapshot, end: tracemalloc.Snapshot) -> str:
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        start, end = start.filter_traces(filters), end.filter_traces(filters)
+
+        lines = ["Allocations that grew the most during the profiling window:", ""]
+        for stat in end.compare_to(start, "lineno")[:self._top]:
+            lines.append(str(stat))
+
+        return "\n".join(lines) + "\n"
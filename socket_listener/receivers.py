@@ -5,21 +5,46 @@ These objects support the continuous data reception from network sockets and pub
 to the configured data destinations or sinks.
 """
 
+import sys
+import time
+import signal
+import socket
 import logging
 import threading
 import socketserver
 from typing import Any
+from pathlib import Path
 
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, field, replace
 from functools import cached_property
 
+from . import framing
+from .backpressure import AIMDController
+from .budget import MemoryBudget
 from .handlers import UDPRequestHandler
-from .monitor import ThreadMonitor, ExceptionMonitor
+from .health import HealthCheck, HealthServer, IngestStats
+from .inflight import InFlight
+from .logs import install_async_logging
+from .metrics import MetricsMonitor, registry as metrics_registry
+from .profiling import Profiler
+from .monitor import ThreadMonitor
+from .routing import Route, Router, load_routes
 from .sinks import create_sink
+from .sinks.base import Sink
+from .supervisor import Supervisor
+from .tap import PacketTap, create_output
+from .validation import ChecksumValidator
 
 
 logger = logging.getLogger(__name__)
 
+# Linux returns the real size of truncated datagrams when receiving with MSG_TRUNC.
+RECV_FLAGS = socket.MSG_TRUNC if sys.platform.startswith("linux") else 0
+
+# Maximum size of UDP datagrams.
+MAX_DATAGRAM_SIZE = 65535
+
 
 def run(
     *args,
@@ -27,6 +52,45 @@ def run(
     pubsub_project: str = None,
     pubsub_topic: str = None,
     pubsub_data_format: str = "raw",
+    pubsub_metadata_encoding: str = "attributes",
+    pubsub_compression: str = None,
+    pubsub_clients: int = 1,
+    pubsub_sharding: str = "round_robin",
+    pubsub_ordering_key: str = None,
+    pubsub_emulated: bool = False,
+    pubsub_emulated_latency: float = 0.05,
+    pubsub_emulated_jitter: float = 0,
+    pubsub_emulated_error_rate: float = 0,
+    capture_dir: str = None,
+    capture_segment_size: int = 256,
+    capture_compress: bool = False,
+    unix_socket: str = None,
+    unix_socket_type: str = "stream",
+    pipe: str = None,
+    udp_forward: str = None,
+    publisher_processes: int = 0,
+    publisher_ring_size: int = 64,
+    publisher_max_wait: float = 1.0,
+    validate_checksums: bool = False,
+    invalid_pubsub_topic: str = None,
+    routes: str = None,
+    workdir: str = "workdir",
+    profile_duration: float = 30,
+    tap: str = None,
+    tap_every: int = None,
+    tap_rate: float = None,
+    async_logging: bool = False,
+    log_rate_limit: int = 10,
+    log_rate_window: float = 60,
+    memory_budget: int = None,
+    memory_budget_policy: str = "block",
+    memory_budget_max_wait: float = 1.0,
+    spill_dir: str = None,
+    backpressure: bool = False,
+    backpressure_target_latency: float = 0.5,
+    backpressure_max_concurrency: int = 200,
+    backpressure_policy: str = "block",
+    backpressure_max_wait: float = 1.0,
     daemon_thread: bool = False,
     unknown_unparsed_args: list = None,
     unknown_parsed_args: dict = None,
@@ -45,11 +109,138 @@ def run(
             GCP project id for Pub/Sub integration.
 
         pubsub_topic_id:
-            Topic id for Pub/Sub integration.
+            Topic id for Pub/Sub integration. Comma-separated to shard across multiple topics.
 
         pubsub_data_format:
             The data format for for Pub/Sub integration.
 
+        pubsub_metadata_encoding:
+            How packet metadata is sent to Pub/Sub: 'attributes' or 'compact'.
+
+        pubsub_compression:
+            Codec to compress Pub/Sub payloads with, e.g., 'zlib' or 'zstd'.
+
+        pubsub_clients:
+            Number of Pub/Sub publisher clients to shard publishing across.
+
+        pubsub_sharding:
+            How packets are assigned to Pub/Sub shards: 'round_robin', 'source' or 'provider'.
+
+        pubsub_ordering_key:
+            Packet attribute used as Pub/Sub ordering key: 'source' or 'provider'.
+
+        pubsub_emulated:
+            Publishes to an in-process Pub/Sub emulator instead of Google Pub/Sub service.
+
+        pubsub_emulated_latency:
+            Mean publish latency in seconds of the Pub/Sub emulator.
+
+        pubsub_emulated_jitter:
+            Maximum deviation in seconds of the Pub/Sub emulator publish latency.
+
+        pubsub_emulated_error_rate:
+            Fraction of messages that fail to be published in the Pub/Sub emulator.
+
+        capture_dir:
+            If passed, incoming packets are recorded into capture files in this directory.
+
+        capture_segment_size:
+            Size in MB after which a new capture segment is started.
+
+        capture_compress:
+            If True, closed capture segments are compressed with gzip.
+
+        unix_socket:
+            If passed, packets are written to the Unix domain socket at this path.
+
+        unix_socket_type:
+            Type of the Unix domain socket: 'stream' or 'datagram'.
+
+        pipe:
+            If passed, packets are written to the named pipe at this path, or stdout if '-'.
+
+        udp_forward:
+            Comma-separated 'host:port' addresses to forward each datagram to.
+
+        publisher_processes:
+            If > 0, sinks run in this number of separate publisher processes,
+            fed through shared-memory ring buffers. See socket_listener.sinks.process.
+
+        publisher_ring_size:
+            Size in MB of the ring buffer of each publisher process.
+
+        publisher_max_wait:
+            Max seconds to wait for free space in a full ring buffer before dropping a packet.
+
+        validate_checksums:
+            Enables validation of NMEA checksums. Messages with invalid checksums are dropped.
+
+        invalid_pubsub_topic:
+            With validate_checksums, Pub/Sub topic to publish invalid messages to,
+            instead of dropping them.
+
+        routes:
+            Path to a YAML file with routes to publish messages to different sinks
+            depending on their content. Sinks of each route override the configured ones.
+            See socket_listener.routing.
+
+        workdir:
+            Directory for outputs. Profiles are written in its 'profiles' subdirectory.
+
+        profile_duration:
+            Seconds to profile the receiver when profiling is triggered.
+
+        tap:
+            Comma-separated outputs of a sampled packet tap: 'file:<path>', 'memory[:<capacity>]'
+            or 'udp:<host>:<port>'. See socket_listener.tap. If None, disabled.
+
+        tap_every:
+            Samples 1 in every N packets to the tap.
+
+        tap_rate:
+            Samples at most N packets per second per provider to the tap.
+
+        async_logging:
+            If True, log records are written by a background thread, and warnings and errors
+            are rate limited per call site. See socket_listener.logs.
+
+        log_rate_limit:
+            With async_logging, max warnings and errors per call site within log_rate_window.
+            If 0, not rate limited.
+
+        log_rate_window:
+            With async_logging, length in seconds of the rate limit windows.
+
+        memory_budget:
+            Max MB held by packets in flight. If None, not limited.
+            See socket_listener.budget.
+
+        memory_budget_policy:
+            What to do with packets when the memory budget is exceeded:
+            'block', 'drop' or 'spill'.
+
+        memory_budget_max_wait:
+            With 'block' policy, max seconds to wait for memory before dropping a packet.
+
+        spill_dir:
+            With 'spill' policy, directory where packets are spilled in capture format.
+            Defaults to the 'spill' subdirectory of workdir.
+
+        backpressure:
+            Enables adaptive backpressure between reception and sinks.
+
+        backpressure_target_latency:
+            Publish latency in seconds above which sinks are considered overloaded.
+
+        backpressure_max_concurrency:
+            Maximum number of packets published concurrently.
+
+        backpressure_policy:
+            What to do with packets when sinks are overloaded: 'block' or 'drop'.
+
+        backpressure_max_wait:
+            With 'block' policy, max seconds to wait before dropping a packet.
+
         daemon_thread:
             If true, makes the thread daemonic.
 
@@ -58,16 +249,73 @@ def run(
     Returns:
         A tuple (receiver, thread).
     """
-    sinks_config = {}
-    if pubsub:
-        sinks_config["google_pubsub"] = dict(
-            project_id=pubsub_project,
-            topic_id=pubsub_topic,
-            data_format=pubsub_data_format,
+    if async_logging:
+        install_async_logging(rate_limit=log_rate_limit, rate_limit_window=log_rate_window)
+
+    configs = sinks_configs(
+        pubsub=pubsub,
+        pubsub_project=pubsub_project,
+        pubsub_topic=pubsub_topic,
+        pubsub_data_format=pubsub_data_format,
+        pubsub_metadata_encoding=pubsub_metadata_encoding,
+        pubsub_compression=pubsub_compression,
+        pubsub_clients=pubsub_clients,
+        pubsub_sharding=pubsub_sharding,
+        pubsub_ordering_key=pubsub_ordering_key,
+        pubsub_emulated=pubsub_emulated,
+        pubsub_emulated_latency=pubsub_emulated_latency,
+        pubsub_emulated_jitter=pubsub_emulated_jitter,
+        pubsub_emulated_error_rate=pubsub_emulated_error_rate,
+        capture_dir=capture_dir,
+        capture_segment_size=capture_segment_size,
+        capture_compress=capture_compress,
+        unix_socket=unix_socket,
+        unix_socket_type=unix_socket_type,
+        pipe=pipe,
+        udp_forward=udp_forward,
+        publisher_processes=publisher_processes,
+        publisher_ring_size=publisher_ring_size,
+        publisher_max_wait=publisher_max_wait,
+        validate_checksums=validate_checksums,
+        invalid_pubsub_topic=invalid_pubsub_topic,
+        routes=routes,
+        delimiter=kwargs.get("delimiter", "\n"),
+    )
+
+    backpressure_config = None
+    if backpressure:
+        backpressure_config = dict(
+            target_latency=backpressure_target_latency,
+            max_limit=backpressure_max_concurrency,
+            policy=backpressure_policy,
+            max_wait=backpressure_max_wait,
+        )
+
+    packet_tap = None
+    if tap is not None:
+        packet_tap = PacketTap(
+            [create_output(spec) for spec in tap.split(",")], every=tap_every, rate=tap_rate
+        )
+
+    budget = None
+    if memory_budget is not None:
+        budget = MemoryBudget(
+            max_bytes=memory_budget * 1024 * 1024,
+            policy=memory_budget_policy,
+            max_wait=memory_budget_max_wait,
+            spill_dir=spill_dir or Path(workdir, "spill"),
         )
 
     try:
-        receiver = create(*args, **kwargs, sinks_config=sinks_config)
+        receiver = create(
+            *args,
+            **kwargs,
+            **configs,
+            backpressure_config=backpressure_config,
+            profiler=Profiler(Path(workdir, "profiles"), duration=profile_duration),
+            tap=packet_tap,
+            budget=budget,
+        )
     except NotImplementedError as e:
         logger.error(e)
         return
@@ -79,6 +327,196 @@ def run(
     return receiver, thread
 
 
+def sinks_configs(
+    pubsub: bool = False,
+    pubsub_project: str = None,
+    pubsub_topic: str = None,
+    pubsub_data_format: str = "raw",
+    pubsub_metadata_encoding: str = "attributes",
+    pubsub_compression: str = None,
+    pubsub_clients: int = 1,
+    pubsub_sharding: str = "round_robin",
+    pubsub_ordering_key: str = None,
+    pubsub_emulated: bool = False,
+    pubsub_emulated_latency: float = 0.05,
+    pubsub_emulated_jitter: float = 0,
+    pubsub_emulated_error_rate: float = 0,
+    capture_dir: str = None,
+    capture_segment_size: int = 256,
+    capture_compress: bool = False,
+    unix_socket: str = None,
+    unix_socket_type: str = "stream",
+    pipe: str = None,
+    udp_forward: str = None,
+    publisher_processes: int = 0,
+    publisher_ring_size: int = 64,
+    publisher_max_wait: float = 1.0,
+    validate_checksums: bool = False,
+    invalid_pubsub_topic: str = None,
+    routes: str = None,
+    delimiter: str = "\n",
+) -> dict:
+    """Resolves the options of the sinks into their configuration for SocketReceiver.build().
+
+    See run() for the arguments.
+
+    Returns:
+        A dictionary with sinks_config, validation_config and routing_config.
+    """
+    sinks_config = {}
+    pubsub_config = dict(
+        project_id=pubsub_project,
+        topic_id=pubsub_topic.split(",") if pubsub_topic else pubsub_topic,
+        data_format=pubsub_data_format,
+        metadata_encoding=pubsub_metadata_encoding,
+        compression=pubsub_compression,
+        clients=pubsub_clients,
+        sharding=pubsub_sharding,
+        ordering_key=pubsub_ordering_key,
+    )
+
+    if pubsub:
+        sinks_config["google_pubsub"] = pubsub_config
+
+    if pubsub_emulated:
+        sinks_config["emulated_pubsub"] = dict(
+            **pubsub_config,
+            latency=pubsub_emulated_latency,
+            jitter=pubsub_emulated_jitter,
+            error_rate=pubsub_emulated_error_rate,
+        )
+
+    if capture_dir is not None:
+        sinks_config["capture"] = dict(
+            directory=capture_dir,
+            segment_size=capture_segment_size * 1024 * 1024,
+            compress=capture_compress,
+        )
+
+    if unix_socket is not None:
+        sinks_config["unix_socket"] = dict(path=unix_socket, socket_type=unix_socket_type)
+
+    if pipe is not None:
+        sinks_config["pipe"] = dict(path=None if pipe == "-" else pipe)
+
+    if udp_forward is not None:
+        sinks_config["udp_forward"] = dict(destinations=udp_forward.split(","))
+
+    validation_config = None
+    if validate_checksums:
+        invalid_sinks_config = {}
+        if invalid_pubsub_topic is not None:
+            name = "emulated_pubsub" if pubsub_emulated else "google_pubsub"
+            invalid_sinks_config[name] = dict(sinks_config.get(name, pubsub_config))
+            invalid_sinks_config[name]["topic_id"] = invalid_pubsub_topic
+
+        validation_config = dict(invalid_sinks_config=invalid_sinks_config)
+
+    routing_config = None
+    if routes is not None:
+        base_sinks_config = {
+            "google_pubsub": pubsub_config,
+            "emulated_pubsub": pubsub_config,
+            **sinks_config,
+        }
+
+        routes_config = []
+        for route in load_routes(routes):
+            route = dict(route)
+            route["sinks_config"] = {
+                name: dict(base_sinks_config.get(name, {}), **(config or {}))
+                for name, config in (route.pop("sinks", None) or {}).items()
+            }
+            routes_config.append(route)
+
+        routing_config = dict(routes_config=routes_config)
+
+    if publisher_processes > 0 and sinks_config:
+        sinks_config = {
+            "process": dict(
+                sinks_config=sinks_config,
+                processes=publisher_processes,
+                ring_size=publisher_ring_size * 1024 * 1024,
+                max_wait=publisher_max_wait,
+                delimiter=delimiter,
+            )
+        }
+
+    return dict(
+        sinks_config=sinks_config,
+        validation_config=validation_config,
+        routing_config=routing_config,
+    )
+
+
+def install_drain_handler(receiver: 'SocketReceiver') -> Any:
+    """Makes the receiver drain when the process receives SIGTERM.
+
+    Must be called from the main thread. Draining happens in a separate thread,
+    so the signal handler returns immediately to the main thread.
+    The handler is used only once: a second SIGTERM terminates the process as usual.
+
+    Args:
+        receiver:
+            The receiver to drain.
+
+    Returns:
+        The previous SIGTERM handler, so callers can restore it.
+    """
+    def _handle_sigterm(signum, frame):
+        logger.info("SIGTERM received.")
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        threading.Thread(target=receiver.drain, name="drain").start()
+
+    return signal.signal(signal.SIGTERM, _handle_sigterm)
+
+
+def install_profile_handler(receiver: 'SocketReceiver') -> Any:
+    """Makes the receiver profile itself when the process receives SIGUSR1.
+
+    Must be called from the main thread. Does nothing if the receiver has no profiler
+    or the platform has no SIGUSR1.
+
+    Args:
+        receiver:
+            The receiver to profile.
+
+    Returns:
+        The previous SIGUSR1 handler, so callers can restore it.
+    """
+    if receiver.profiler is None or not hasattr(signal, "SIGUSR1"):
+        return None
+
+    def _handle_sigusr1(signum, frame):
+        logger.info("SIGUSR1 received.")
+        receiver.profiler.trigger()
+
+    return signal.signal(signal.SIGUSR1, _handle_sigusr1)
+
+
+def install_tap_handler(receiver: 'SocketReceiver') -> Any:
+    """Makes the receiver toggle its packet tap when the process receives SIGUSR2.
+
+    Must be called from the main thread. Does nothing if the receiver has no tap
+    or the platform has no SIGUSR2.
+
+    Args:
+        receiver:
+            The receiver whose tap to toggle.
+
+    Returns:
+        The previous SIGUSR2 handler, so callers can restore it.
+    """
+    if receiver.tap is None or not hasattr(signal, "SIGUSR2"):
+        return None
+
+    def _handle_sigusr2(signum, frame):
+        logger.info("SIGUSR2 received.")
+        receiver.tap.toggle()
+
+    return signal.signal(signal.SIGUSR2, _handle_sigusr2)
+
+
 def create(protocol="UDP", *args, **kwargs) -> 'SocketReceiver':
     receivers = {
         UDPSocketReceiver.protocol: UDPSocketReceiver,
@@ -90,6 +528,130 @@ def create(protocol="UDP", *args, **kwargs) -> 'SocketReceiver':
     return receivers[protocol].build(*args, **kwargs)
 
 
+def build_sinks(
+    sinks_config: dict = None,
+    validation_config: dict = None,
+    routing_config: dict = None,
+) -> tuple[list[Sink], ChecksumValidator, Router]:
+    """Creates the sinks, checksum validator and router of a receiver.
+
+    See SocketReceiver.build() for the arguments.
+
+    Returns:
+        A tuple (sinks, validator, router). Validator and router may be None.
+    """
+    sinks = [create_sink(n, **v) for n, v in (sinks_config or {}).items()]
+
+    router = None
+    if routing_config is not None:
+        routes = []
+        for route_config in routing_config["routes_config"]:
+            route_config = dict(route_config)
+            route_sinks_config = route_config.pop("sinks_config", None) or {}
+            route_sinks = [create_sink(n, **v) for n, v in route_sinks_config.items()]
+            routes.append(Route(sinks=route_sinks, **route_config))
+
+        router = Router(routes, default_sinks=sinks)
+
+    validator = None
+    if validation_config is not None:
+        validation_config = dict(validation_config)
+        invalid_sinks_config = validation_config.pop("invalid_sinks_config", None) or {}
+        invalid_sinks = [create_sink(n, **v) for n, v in invalid_sinks_config.items()]
+        validator = ChecksumValidator(invalid_sinks=invalid_sinks, **validation_config)
+
+    return sinks, validator, router
+
+
+def _controlled_sinks(sinks: list[Sink], router: Router) -> list[Sink]:
+    # Sinks whose batching is tuned by the backpressure controller.
+    return list(sinks) + (router.sinks if router is not None else [])
+
+
+@dataclass(frozen=True)
+class ServerConfig:
+    """Configuration of the request handlers of a server, swapped as a whole on reload.
+
+    Each request handler takes the configuration once, so a packet is processed
+    with a single configuration. The packets processed with a configuration
+    are counted in its in_flight, so its sinks can be flushed once they finished.
+
+    Attributes:
+        max_packet_size:
+            The maximum amount of data to be received at once.
+
+        adaptive_packet_size:
+            If True, max_packet_size is grown when datagrams are truncated.
+
+        max_packet_size_limit:
+            With adaptive_packet_size, the maximum value of max_packet_size.
+
+        delimiter:
+            Symbol to use as delimiter while splitting packets into messages.
+
+        provider_name:
+            Provider name to use in the metadata.
+
+        sinks:
+            Sinks in which to publish incoming packets.
+
+        validator:
+            ChecksumValidator to filter out messages with invalid checksums.
+
+        router:
+            Router to publish messages to different sinks depending on their content.
+
+        in_flight:
+            Packets being processed with this configuration (or one with the same sinks).
+    """
+    max_packet_size: int = 4096
+    adaptive_packet_size: bool = False
+    max_packet_size_limit: int = MAX_DATAGRAM_SIZE
+    delimiter: str = "\n"
+    provider_name: str = "Unknown"
+    sinks: tuple[Sink, ...] = ()
+    validator: ChecksumValidator = None
+    router: Router = None
+    in_flight: InFlight = field(default_factory=InFlight, compare=False, repr=False)
+
+    def __post_init__(self):
+        # Fails on build or reload, instead of in every request handler of sinks with
+        # compact framing, where the provider name is encoded as the source name.
+        framing.check_text(self.provider_name or "")
+
+    @property
+    def all_sinks(self) -> list[Sink]:
+        """Returns the sinks, including those of the validator and the router."""
+        sinks = list(self.sinks)
+        if self.validator is not None:
+            sinks.extend(self.validator.sinks)
+
+        if self.router is not None:
+            sinks.extend(self.router.sinks)
+
+        return sinks
+
+
+@dataclass
+class DrainReport:
+    """Summary of a receiver drain.
+
+    Attributes:
+        completed:
+            Number of in-flight packets whose processing finished during the drain.
+            Delivery failures of those packets are logged by the sinks themselves.
+
+        abandoned:
+            Number of in-flight packets still being processed when the deadline expired.
+
+        sinks_abandoned:
+            Mapping of {sink_name: number of messages} that sinks could not deliver in time.
+    """
+    completed: int = 0
+    abandoned: int = 0
+    sinks_abandoned: dict[str, int] = field(default_factory=dict)
+
+
 class SocketReceiver(ABC):
     """Base class for socket data reception.
 
@@ -101,7 +663,7 @@ class SocketReceiver(ABC):
             Seconds to wait before poll for server shutdown.
 
         thread_monitor_delay:
-            Seconds between each log entry with number of active threads.
+            Seconds between each log entry with number of active threads. If None, disabled.
 
         host:
             The IP address to use.
@@ -111,6 +673,15 @@ class SocketReceiver(ABC):
 
         max_packet_size:
             The maximum amount of data to be received at once.
+            Larger datagrams are truncated: they are counted and their incomplete
+            last message is dropped.
+
+        adaptive_packet_size:
+            If True, max_packet_size is grown when datagrams are truncated,
+            up to max_packet_size_limit.
+
+        max_packet_size_limit:
+            With adaptive_packet_size, the maximum value of max_packet_size.
 
         delimiter:
             Symbol to use as delimiter while splitting packets into messages.
@@ -120,6 +691,50 @@ class SocketReceiver(ABC):
 
         provider_name:
             Provider name to use in the metadata.
+
+        drain_timeout:
+            Maximum seconds to wait for in-flight packets and sinks when draining.
+
+        controller:
+            AIMDController to apply backpressure between reception and sinks.
+
+        metrics_monitor_delay:
+            Seconds between each log entry with the metrics snapshot. If None, disabled.
+
+        validator:
+            ChecksumValidator to filter out messages with invalid checksums.
+
+        router:
+            Router to publish messages to different sinks depending on their content.
+            The sinks passed are the default sinks of the router.
+
+        error_budget:
+            Number of sink errors tolerated within error_window seconds.
+            When exceeded, the server is shut down immediately.
+
+        error_window:
+            Length in seconds of the sliding window in which sink errors are counted.
+
+        health_port:
+            Port in which to serve health checks (/healthz, /readyz) and metrics (/metrics).
+            If None, disabled.
+
+        health_max_idle:
+            Max seconds without receiving packets to be considered live. If None, not checked.
+
+        health_max_publish_delay:
+            Max seconds without publishing received packets, or with in-flight packets
+            at the backpressure limit, to be considered live.
+
+        profiler:
+            Profiler that can be triggered on demand, e.g. with POST /profile to the health server.
+
+        tap:
+            PacketTap that mirrors a sample of the received packets.
+            It can be reconfigured at runtime, e.g. with POST /tap to the health server.
+
+        budget:
+            MemoryBudget that limits the bytes held by packets in flight.
     """
     def __init__(
         self,
@@ -128,28 +743,81 @@ class SocketReceiver(ABC):
         host: str = "0.0.0.0",
         port: int = 10110,
         max_packet_size: int = 4096,
+        adaptive_packet_size: bool = False,
+        max_packet_size_limit: int = MAX_DATAGRAM_SIZE,
         delimiter: str = "\n",
         sinks=(),
         provider_name: str = "Unknown",
+        drain_timeout: float = 20,
+        controller: AIMDController = None,
+        metrics_monitor_delay: float = None,
+        validator: ChecksumValidator = None,
+        router: Router = None,
+        error_budget: int = 0,
+        error_window: float = 60,
+        health_port: int = None,
+        health_max_idle: float = None,
+        health_max_publish_delay: float = 60,
+        profiler: Profiler = None,
+        tap: PacketTap = None,
+        budget: MemoryBudget = None,
     ) -> None:
 
         self._poll_interval = poll_interval
+        self._drain_timeout = drain_timeout
+        # Created first, so invalid options fail before binding the socket.
+        config = ServerConfig(
+            max_packet_size=max_packet_size,
+            adaptive_packet_size=adaptive_packet_size,
+            max_packet_size_limit=max_packet_size_limit,
+            delimiter=delimiter,
+            provider_name=provider_name,
+            sinks=tuple(sinks),
+            validator=validator,
+            router=router,
+        )
         self._server = self.create_socketserver((host, port))
 
-        # Following proprerties are needed by the request handler.
-        # TODO: encapsulate these properties in ServerConfig class?
-        self._server.max_packet_size = max_packet_size
-        self._server.delimiter = delimiter
-        self._server.sinks = sinks
-        self._server.provider_name = provider_name
-        self._server.exceptions = {}
-
-        self._thread_monitor = ThreadMonitor(delay=thread_monitor_delay)
-        self._exceptions_monitor = ExceptionMonitor(
-            exceptions=self._server.exceptions,
+        # Following properties are needed by the request handler.
+        self._server.config = config
+        self._server.controller = controller
+        self._server.tap = tap
+        self._server.budget = budget
+
+        self._serving = False
+        self._stopped = False
+        self._serving_lock = threading.Lock()
+        self._supervisor = Supervisor(
             shutdown_server=self.shutdown,
-            delay=2,
+            error_budget=error_budget,
+            error_window=error_window,
         )
+        self._server.supervisor = self._supervisor
+        self._server.exceptions = self._supervisor.exceptions
+
+        self._thread_monitor = None
+        if thread_monitor_delay is not None:
+            self._thread_monitor = ThreadMonitor(delay=thread_monitor_delay)
+
+        self._metrics_monitor = None
+        if metrics_monitor_delay is not None:
+            self._metrics_monitor = MetricsMonitor(delay=metrics_monitor_delay)
+
+        self._profiler = profiler
+        self._health_server = None
+        if health_port is not None:
+            health = HealthCheck(
+                stats=self._server.stats,
+                serving=lambda: self._serving,
+                supervisor=self._supervisor,
+                in_flight=self._server.in_flight,
+                max_in_flight=(lambda: controller.limit) if controller is not None else None,
+                max_idle=health_max_idle,
+                max_publish_delay=health_max_publish_delay,
+            )
+            self._health_server = HealthServer(
+                health, host=host, port=health_port, profiler=profiler, tap=tap
+            )
 
     @staticmethod
     @abstractmethod
@@ -157,52 +825,409 @@ class SocketReceiver(ABC):
         """Instantiates a socketserver object."""
 
     @classmethod
-    def build(cls, sinks_config: dict = None, **kwargs: Any) -> 'SocketReceiver':
+    def build(
+        cls,
+        sinks_config: dict = None,
+        backpressure_config: dict = None,
+        validation_config: dict = None,
+        routing_config: dict = None,
+        **kwargs: Any
+    ) -> 'SocketReceiver':
         """Builds a socket receiver object.
 
         Args:
             sinks_config:
                 Dictionary with sinks configuration.
 
+            backpressure_config:
+                Dictionary with AIMDController configuration. If None, backpressure is disabled.
+
+            validation_config:
+                Dictionary with ChecksumValidator configuration, where invalid sinks are
+                configured in 'invalid_sinks_config'. If None, validation is disabled.
+
+            routing_config:
+                Dictionary with Router configuration, where each route of 'routes_config'
+                has its sinks configured in 'sinks_config'. If None, routing is disabled.
+
             **kwargs:
                 keyword arguments for SocketReceiver constructor.
         """
-        sinks = [create_sink(n, **v) for n, v in (sinks_config or {}).items()]
+        sinks, validator, router = build_sinks(sinks_config, validation_config, routing_config)
 
-        return cls(sinks=sinks, **kwargs)
+        controller = None
+        if backpressure_config is not None:
+            controller = AIMDController(
+                sinks=_controlled_sinks(sinks, router), **backpressure_config
+            )
+
+        return cls(
+            sinks=sinks, controller=controller, validator=validator, router=router, **kwargs
+        )
 
     @property
     def server(self):
         return self._server
 
+    @property
+    def supervisor(self) -> Supervisor:
+        return self._supervisor
+
+    @property
+    def health_server(self) -> HealthServer:
+        return self._health_server
+
+    @property
+    def profiler(self) -> Profiler:
+        return self._profiler
+
+    @property
+    def tap(self) -> PacketTap:
+        return self._server.tap
+
     @cached_property
     def server_address(self) -> str:
         """Unified string version of the host and port properties."""
         host, port = self._server.server_address
         return f"{host}:{port}"
 
-    @cached_property
+    @property
+    def config(self) -> ServerConfig:
+        return self._server.config
+
+    @property
     def sinks(self):
         """Returns list of sinks names."""
-        return [s.name for s in self._server.sinks]
+        return [s.name for s in self._server.config.sinks]
 
     def start(self) -> None:
         """Starts the socket receiver."""
         logger.info(f"Listening {self.protocol} socket on {self.server_address}...")
-        logger.info(f"{len(self.sinks)} sink(s) configured ({', '.join(self.sinks)}):")
-        for sink in self._server.sinks:
-            logger.info(f"{sink.name}: {sink.path}")
+        self._log_config(self._server.config)
+
+        if self._server.budget is not None:
+            budget = self._server.budget
+            logger.info(
+                f"Memory budget: {budget.max_bytes / 1024 / 1024:g} MB ({budget.policy}).")
+
+        if self._server.tap is not None:
+            state = "enabled" if self._server.tap.enabled else "disabled"
+            logger.info(f"Packet tap configured ({state}). Toggle it with SIGUSR2 or POST /tap.")
+
+        self._supervisor.start()
+        if self._thread_monitor is not None:
+            self._thread_monitor.start()
+
+        if self._metrics_monitor is not None:
+            self._metrics_monitor.start()
+
+        if self._health_server is not None:
+            self._health_server.start()
 
-        self._thread_monitor.start()
-        self._exceptions_monitor.start()
         with self._server:
-            self._server.serve_forever(poll_interval=self._poll_interval)
+            with self._serving_lock:
+                if self._stopped:
+                    return
+
+                self._serving = True
+
+            try:
+                self._server.serve_forever(poll_interval=self._poll_interval)
+            finally:
+                self._serving = False
 
     def shutdown(self):
-        self._server.shutdown()
+        """Stops receiving data and waits for request handlers to finish."""
+        self._stop_serving()
+
+    def drain(self, timeout: float = None) -> DrainReport:
+        """Stops receiving data and publishes in-flight packets before shutting down.
+
+        New datagrams are not accepted once this method is called.
+        Then, waits for request handlers to finish publishing their packets
+        and for sinks to deliver any buffered data, all within a single deadline.
+
+        Args:
+            timeout:
+                Maximum number of seconds to wait. Defaults to the drain_timeout of the receiver.
+
+        Returns:
+            A DrainReport with the number of completed and abandoned packets.
+        """
+        timeout = self._drain_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        def remaining():
+            return max(deadline - time.monotonic(), 0)
+
+        logger.info(f"Draining receiver (timeout: {timeout} seconds)...")
+
+        # The deadline is enforced here, so closing the server must not wait for handlers.
+        self._server.block_on_close = False
+        self._stop_serving()
+
+        pending = self._server.in_flight.count
+        self._server.in_flight.wait(timeout=remaining())
+
+        report = DrainReport()
+        report.abandoned = self._server.in_flight.count
+        report.completed = max(pending - report.abandoned, 0)
+
+        for sink in self._server.config.all_sinks:
+            abandoned = report.sinks_abandoned.get(sink.name, 0)
+            report.sinks_abandoned[sink.name] = abandoned + sink.flush(timeout=remaining())
+
+        logger.info(
+            f"Drain finished: {report.completed} packet(s) completed, "
+            f"{report.abandoned} packet(s) abandoned.")
+
+        for name, abandoned in report.sinks_abandoned.items():
+            if abandoned:
+                logger.warning(f"{name}: {abandoned} message(s) abandoned.")
+
+        return report
+
+    def reload(self, configs: dict = None, **changes: Any) -> None:
+        """Swaps the configuration of the server, without rebinding the socket.
+
+        Packets being processed finish with the previous configuration.
+        If sinks were replaced, the previous ones are flushed once those packets finished,
+        within drain_timeout seconds.
+
+        Args:
+            configs:
+                Dictionary with sinks_config, validation_config and routing_config,
+                as returned by sinks_configs(). If None, the sinks are kept.
+
+            **changes:
+                Other fields of ServerConfig to change, e.g., provider_name or delimiter.
+        """
+        if configs is not None:
+            sinks, validator, router = build_sinks(**configs)
+            changes.update(
+                sinks=tuple(sinks), validator=validator, router=router, in_flight=InFlight()
+            )
+
+        config = replace(self._server.config, **changes)
+        previous = self._server.swap_config(config)
+        logger.info(f"Configuration reloaded: {', '.join(sorted(changes))}.")
+        self._log_config(config)
+
+        if configs is None:
+            return
+
+        if self._server.controller is not None:
+            self._server.controller.set_sinks(_controlled_sinks(config.sinks, config.router))
+
+        deadline = time.monotonic() + self._drain_timeout
+        previous.in_flight.wait(timeout=self._drain_timeout)
+        for sink in previous.all_sinks:
+            abandoned = sink.flush(timeout=max(deadline - time.monotonic(), 0))
+            if abandoned:
+                logger.warning(f"{sink.name}: {abandoned} message(s) abandoned on reload.")
+
+    def _log_config(self, config: ServerConfig) -> None:
+        names = [s.name for s in config.sinks]
+        logger.info(f"{len(names)} sink(s) configured ({', '.join(names)}):")
+        for sink in config.sinks:
+            logger.info(f"{sink.name}: {sink.path}")
+
+        if config.validator is not None:
+            invalid = ", ".join(str(s.path) for s in config.validator.sinks) or "dropped"
+            logger.info(f"Checksum validation enabled. Invalid messages: {invalid}.")
+
+        if config.router is not None:
+            logger.info(f"{len(config.router.routes)} route(s) configured:")
+            for route in config.router.routes:
+                paths = ", ".join(str(s.path) for s in route.sinks) or "dropped"
+                logger.info(f"{route.name}: {paths}")
+
+    def _stop_serving(self):
+        with self._serving_lock:
+            self._stopped = True
+            serving = self._serving
+
+        # Shutting down a server that is not serving would block forever.
+        if serving:
+            self._server.shutdown()
+
         self._server.server_close()
-        self._thread_monitor.stop()
-        self._exceptions_monitor.stop()
+        self._supervisor.stop()
+        if self._thread_monitor is not None:
+            self._thread_monitor.stop()
+
+        if self._metrics_monitor is not None:
+            self._metrics_monitor.stop()
+
+        if self._health_server is not None:
+            self._health_server.stop()
+
+        if self._server.budget is not None:
+            self._server.budget.close()
+
+        if self._server.tap is not None:
+            # Handlers still running skip the tap once it is closed.
+            self._server.tap.close()
+
+
+class ThreadingUDPServer(socketserver.ThreadingUDPServer):
+    """ThreadingUDPServer that keeps track of the requests being processed.
+
+    Requests are registered in the server thread, before their handler thread is started,
+    so a datagram that was read from the socket is always accounted while in flight.
+
+    Datagrams are read into a preallocated buffer of max_packet_size bytes,
+    so only the received bytes are allocated for each one.
+    Truncated datagrams (larger than the buffer) are detected and counted per source,
+    and their incomplete last message is dropped.
+    With adaptive_packet_size, the buffer grows up to max_packet_size_limit on truncation.
+
+    Request handlers use the ServerConfig in config, which is swapped as a whole on reload.
+
+    With a memory budget, datagrams are accounted when read and released
+    once their handler finished publishing them.
+    """
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.in_flight = InFlight()
+        self.stats = IngestStats()
+        self.config = ServerConfig()
+        self.controller = None
+        self.tap = None
+        self.budget = None
+        self.supervisor = None
+
+        self._config_lock = threading.Lock()
+        self._buffer = None
+        self._warned_sources = set()
+
+        host, port = self.server_address[:2]
+        self._listener = f"{host}:{port}"
+        metrics_registry.gauge(
+            "receiver_buffer_bytes", lambda: self.max_packet_size, listener=self._listener
+        )
+
+    @property
+    def max_packet_size(self) -> int:
+        # Also read by socketserver.UDPServer.get_request().
+        return self.config.max_packet_size
+
+    def acquire_config(self) -> ServerConfig:
+        """Returns the current configuration, with a packet registered in its in_flight.
+
+        Call config.in_flight.release() once the packet was processed.
+        """
+        while True:
+            config = self.config
+            config.in_flight.acquire()
+            # If it was swapped meanwhile, its sinks may be flushed already.
+            if config.in_flight is self.config.in_flight:
+                return config
+
+            config.in_flight.release()
+
+    def swap_config(self, config: ServerConfig) -> ServerConfig:
+        """Replaces the configuration. Returns the previous one."""
+        with self._config_lock:
+            previous, self.config = self.config, config
+
+        return previous
+
+    def update_config(self, **changes: Any) -> None:
+        """Replaces some fields of the configuration."""
+        with self._config_lock:
+            self.config = replace(self.config, **changes)
+
+    def get_request(self):
+        if not hasattr(self.socket, "recvmsg_into"):
+            return super().get_request()
+
+        if self._buffer is None or len(self._buffer) != self.max_packet_size:
+            self._buffer = bytearray(self.max_packet_size)
+
+        nbytes, _, flags, client_address = self.socket.recvmsg_into([self._buffer], 0, RECV_FLAGS)
+
+        size = min(nbytes, len(self._buffer))
+        data = bytes(memoryview(self._buffer)[:size])
+        if flags & socket.MSG_TRUNC or nbytes > size:
+            data = self._handle_truncation(data, nbytes, client_address[0])
+
+        return (data, self.socket), client_address
+
+    def verify_request(self, request, client_address):
+        # First hook called by the server thread for every request read from the socket.
+        self.in_flight.acquire()
+        self.stats.received()
+
+        data, _ = request
+        if not data:
+            # Nothing left of a truncated datagram.
+            return False
+
+        # Both may block the server thread, so the socket stops being read until sinks catch up.
+        if self.budget is not None and not self.budget.acquire(data, *client_address[:2]):
+            return False
+
+        if self.controller is not None and not self.controller.acquire():
+            if self.budget is not None:
+                self.budget.release(data)
+
+            return False
+
+        return super().verify_request(request, client_address)
+
+    def finish_request(self, request, client_address):
+        # Only called for admitted requests, once their handler finished.
+        try:
+            super().finish_request(request, client_address)
+        finally:
+            if self.budget is not None:
+                self.budget.release(request[0])
+
+    def shutdown_request(self, request):
+        # Called once per verified request, even if it is rejected or processing fails.
+        try:
+            super().shutdown_request(request)
+        finally:
+            self.in_flight.release()
+
+    def server_close(self):
+        if self.block_on_close:
+            super().server_close()
+        else:
+            # ThreadingMixIn may still join handler threads if block_on_close was True
+            # when the first request was processed, so it is bypassed.
+            socketserver.UDPServer.server_close(self)
+
+    def _handle_truncation(self, data: bytes, nbytes: int, source: str) -> bytes:
+        metrics_registry.counter(
+            "receiver_truncated_total", listener=self._listener, source=source
+        ).inc()
+
+        if source not in self._warned_sources:
+            self._warned_sources.add(source)
+            size = f"{nbytes} bytes" if nbytes > len(data) else "unknown size"
+            logger.warning(
+                f"Datagram from {source} ({size}) truncated to {len(data)} bytes. "
+                "Consider increasing max_packet_size.")
+
+        config = self.config
+        if config.adaptive_packet_size:
+            self._grow_buffer(nbytes, config.max_packet_size_limit)
+
+        # Drop the incomplete last message.
+        delimiter = (config.delimiter or "\n").encode()
+        end = data.rfind(delimiter)
+        return data[:end + len(delimiter)] if end != -1 else b""
+
+    def _grow_buffer(self, nbytes: int, limit: int) -> None:
+        size = len(self._buffer)
+        # If the real size is unknown, the buffer is doubled.
+        new_size = 1 << (nbytes - 1).bit_length() if nbytes > size else size * 2
+        new_size = min(new_size, limit)
+        if new_size > self.max_packet_size:
+            logger.info(f"Growing max_packet_size of {self._listener} to {new_size} bytes.")
+            self.update_config(max_packet_size=new_size)
 
 
 class UDPSocketReceiver(SocketReceiver):
@@ -212,4 +1237,4 @@ class UDPSocketReceiver(SocketReceiver):
 
     @staticmethod
     def create_socketserver(server_address: tuple[str, int], **kwargs):
-        return socketserver.ThreadingUDPServer(server_address, UDPRequestHandler, **kwargs)
+        return ThreadingUDPServer(server_address, UDPRequestHandler, **kwargs)
@@ -0,0 +1,179 @@
+"""Reload of the receiver configuration from its YAML file, without rebinding the socket.
+
+On SIGHUP, or when the file changes, the options that changed in the file are applied
+to the running receiver with SocketReceiver.reload():
+    - Options of the server (e.g., provider_name or delimiter) are swapped without
+      touching the sinks.
+    - If options of the sinks changed (e.g., pubsub_topic), new sinks are created and swapped in.
+      The previous ones are flushed once the packets being published to them finished.
+
+Changed options take precedence over those passed in the command line.
+Other options (e.g., port or health_port) need a restart: changes to them are logged and ignored,
+as are options removed from the file. If the new configuration is invalid,
+the receiver keeps the current one.
+"""
+import os
+import signal
+import inspect
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Union
+
+import yaml
+
+from socket_listener import receivers
+from socket_listener.monitor import Monitor
+
+logger = logging.getLogger(__name__)
+
+SERVER_OPTIONS = frozenset([
+    "max_packet_size",
+    "adaptive_packet_size",
+    "max_packet_size_limit",
+    "delimiter",
+    "provider_name",
+])
+
+SINK_OPTIONS = frozenset(inspect.signature(receivers.sinks_configs).parameters) - {"delimiter"}
+
+RELOADABLE = SERVER_OPTIONS | SINK_OPTIONS
+
+_MISSING = object()
+
+
+class ConfigReloader(Monitor):
+    """Reloads a receiver when its configuration file changes, or when reload() is called.
+
+    Args:
+        receiver:
+            The receiver to reload.
+
+        path:
+            Path of the YAML configuration file.
+
+        options:
+            Resolved options the receiver was run with.
+
+        delay:
+            Seconds between checks of the file.
+    """
+    def __init__(
+        self,
+        receiver: 'receivers.SocketReceiver',
+        path: Union[str, Path],
+        options: dict,
+        delay: float = 2,
+    ) -> None:
+        super().__init__(delay=delay)
+        self.name = "config-reloader"
+        self.daemon = True
+        self._receiver = receiver
+        self._path = Path(path)
+        self._options = dict(options)
+        self._lock = threading.Lock()
+        self._stat = self._stat_file()
+        self._file_options = self._load()
+
+    def operation(self) -> None:
+        stat = self._stat_file()
+        if stat != self._stat:
+            self._stat = stat
+            self.reload()
+
+    def reload(self) -> bool:
+        """Applies the options that changed in the file since the last reload.
+
+        Returns:
+            True if the receiver was reloaded.
+        """
+        with self._lock:
+            try:
+                file_options = self._load()
+            except (OSError, yaml.YAMLError) as e:
+                logger.error(f"Failed to read {self._path}: {e}. Keeping the current one.")
+                return False
+
+            changes = {
+                key: value for key, value in file_options.items()
+                if self._file_options.get(key, _MISSING) != value
+            }
+
+            removed = sorted(self._file_options.keys() - file_options.keys())
+            if removed:
+                logger.warning(f"Options removed from file are kept: {', '.join(removed)}.")
+
+            restart = sorted(changes.keys() - RELOADABLE)
+            if restart:
+                logger.warning(f"Changes to {', '.join(restart)} need a restart. Ignored.")
+
+            reloadable = {key: value for key, value in changes.items() if key in RELOADABLE}
+            if not reloadable:
+                logger.info(f"No changes to reload in {self._path}.")
+                self._file_options.update(changes)
+                return False
+
+            # If applying fails, the changes are retried on the next reload.
+            if not self._apply(reloadable):
+                return False
+
+            self._file_options.update(changes)
+            return True
+
+    def _apply(self, changes: dict) -> bool:
+        options = dict(self._options, **changes)
+
+        configs = None
+        rebuild = changes.keys() & SINK_OPTIONS
+        # Publisher processes rebuild packets with the delimiter.
+        if rebuild or ("delimiter" in changes and options.get("publisher_processes")):
+            params = inspect.signature(receivers.sinks_configs).parameters
+            configs = receivers.sinks_configs(
+                **{key: value for key, value in options.items() if key in params}
+            )
+
+        server_changes = {key: options[key] for key in changes.keys() & SERVER_OPTIONS}
+        try:
+            self._receiver.reload(configs, **server_changes)
+        except Exception as e:
+            logger.error(f"Failed to reload configuration: {e!r}. Keeping the current one.")
+            return False
+
+        self._options = options
+        return True
+
+    def _load(self) -> dict:
+        with open(self._path) as f:
+            return yaml.safe_load(f) or {}
+
+    def _stat_file(self) -> Any:
+        try:
+            stat = os.stat(self._path)
+        except OSError:
+            return None
+
+        return stat.st_mtime_ns, stat.st_size
+
+
+def install_reload_handler(reloader: ConfigReloader) -> Any:
+    """Makes the reloader reload the configuration when the process receives SIGHUP.
+
+    Must be called from the main thread. Reloading happens in a separate thread,
+    so the signal handler returns immediately to the main thread.
+    Does nothing if the platform has no SIGHUP.
+
+    Args:
+        reloader:
+            The ConfigReloader to trigger.
+
+    Returns:
+        The previous SIGHUP handler, so callers can restore it.
+    """
+    if not hasattr(signal, "SIGHUP"):
+        return None
+
+    def _handle_sighup(signum, frame):
+        logger.info("SIGHUP received.")
+        threading.Thread(target=reloader.reload, name="reload").start()
+
+    return signal.signal(signal.SIGHUP, _handle_sighup)
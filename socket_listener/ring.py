@@ -0,0 +1,163 @@
+"""Ring buffer of variable-size records in shared memory, to pass packets between processes.
+
+The buffer has a single producer and a single consumer, which may live in different processes.
+It is a multiprocessing.shared_memory block with a header and a data region:
+
+```text
+ offset  size  field
+ 0       8     write position: bytes written since creation (unsigned, little-endian)
+ 64      8     read position: bytes read since creation (unsigned, little-endian)
+ 128     C     data region, with records of a 4-byte length (N) followed by N bytes
+```
+
+Positions only grow and each one is updated by a single side, after the record is written
+or read, so no locks are needed between processes. Positions are on separate cache lines.
+A record never wraps around the end of the data region: the remaining space is skipped,
+marked with a length of 0xFFFFFFFF if there is room for it.
+"""
+import struct
+from multiprocessing import shared_memory
+from typing import Optional
+
+HEADER_SIZE = 128
+MIN_CAPACITY = 1024
+
+_POSITION = struct.Struct("<Q")
+_LENGTH = struct.Struct("<I")
+
+_WRITE_OFFSET = 0
+_READ_OFFSET = 64
+_WRAP = 0xFFFFFFFF
+
+
+class RingBuffer:
+    """Single-producer, single-consumer ring buffer in shared memory.
+
+    Create it in one process and attach to it by name in the other one.
+    Neither side is thread-safe: a producer shared by threads must be guarded by a lock.
+
+    Args:
+        capacity:
+            Size in bytes of the data region. Ignored when attaching.
+
+        name:
+            Name of an existing buffer to attach to. If None, a new buffer is created.
+    """
+    def __init__(self, capacity: int = None, name: str = None) -> None:
+        if name is None:
+            if capacity is None or capacity < MIN_CAPACITY:
+                raise ValueError(f"Invalid capacity: {capacity}. Must be >= {MIN_CAPACITY}.")
+
+            self._memory = shared_memory.SharedMemory(create=True, size=HEADER_SIZE + capacity)
+            self._memory.buf[:HEADER_SIZE] = bytes(HEADER_SIZE)
+            self._owner = True
+        else:
+            self._memory = shared_memory.SharedMemory(name=name)
+            self._owner = False
+
+        self._buf = self._memory.buf
+        self._data = self._buf[HEADER_SIZE:]
+        self._capacity = len(self._data)
+
+        # Each side caches its own position, as it is the only one that updates it.
+        self._write = self._load(_WRITE_OFFSET)
+        self._read = self._load(_READ_OFFSET)
+
+    @property
+    def name(self) -> str:
+        return self._memory.name
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def closed(self) -> bool:
+        return self._buf is None
+
+    @property
+    def used(self) -> int:
+        """Returns the number of bytes written and not yet read, including record headers."""
+        if self.closed:
+            return 0
+
+        return self._load(_WRITE_OFFSET) - self._load(_READ_OFFSET)
+
+    @property
+    def empty(self) -> bool:
+        return self.used == 0
+
+    def put(self, record: bytes) -> bool:
+        """Appends a record. Producer side.
+
+        Returns:
+            True if the record was written, False if there was not enough free space.
+
+        Raises:
+            ValueError: if the record is larger than half the capacity,
+                which is the largest size that always fits once the buffer is emptied.
+        """
+        size = _LENGTH.size + len(record)
+        if size > self._capacity // 2:
+            raise ValueError(f"Record of {len(record)} bytes too large for the ring buffer.")
+
+        offset = self._write % self._capacity
+        remaining = self._capacity - offset
+        skip = remaining if remaining < size else 0
+
+        if self._write + skip + size - self._load(_READ_OFFSET) > self._capacity:
+            return False
+
+        if skip:
+            if remaining >= _LENGTH.size:
+                _LENGTH.pack_into(self._data, offset, _WRAP)
+
+            offset = 0
+
+        _LENGTH.pack_into(self._data, offset, len(record))
+        self._data[offset + _LENGTH.size:offset + size] = record
+
+        # Published after the record is complete, so the consumer never sees a partial record.
+        self._write += skip + size
+        _POSITION.pack_into(self._buf, _WRITE_OFFSET, self._write)
+        return True
+
+    def get(self) -> Optional[bytes]:
+        """Removes the oldest record. Consumer side.
+
+        Returns:
+            The record, or None if the buffer is empty.
+        """
+        while self._read < self._load(_WRITE_OFFSET):
+            offset = self._read % self._capacity
+            remaining = self._capacity - offset
+            if remaining < _LENGTH.size:
+                self._advance_read(remaining)
+                continue
+
+            (length,) = _LENGTH.unpack_from(self._data, offset)
+            if length == _WRAP:
+                self._advance_read(remaining)
+                continue
+
+            start = offset + _LENGTH.size
+            record = bytes(self._data[start:start + length])
+            self._advance_read(_LENGTH.size + length)
+            return record
+
+        return None
+
+    def close(self) -> None:
+        """Detaches from the buffer. The creator also frees the shared memory."""
+        self._data.release()
+        self._buf = None
+        self._memory.close()
+        if self._owner:
+            self._memory.unlink()
+
+    def _advance_read(self, size: int) -> None:
+        self._read += size
+        _POSITION.pack_into(self._buf, _READ_OFFSET, self._read)
+
+    def _load(self, offset: int) -> int:
+        return _POSITION.unpack_from(self._buf, offset)[0]
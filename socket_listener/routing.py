@@ -0,0 +1,276 @@
+"""Content-based routing of messages to sinks.
+
+Routes select messages by packet attributes (provider name, source host)
+and by NMEA sentence content (talker, e.g. 'AIVDM', and AIS message type),
+which is read from raw bytes without decoding payloads:
+    - The talker is the five characters after the '!' or '$' start character.
+    - The AIS message type is the first armored character of the payload.
+
+Rules are compiled once per (provider, source) into a dispatch table,
+and the sinks of each (talker, message type) are memoized, so routing a message
+costs a split of its first fields and a dictionary lookup.
+"""
+import logging
+from typing import Iterable, Sequence
+
+import yaml
+
+from socket_listener.metrics import MetricsRegistry, registry as default_registry
+from socket_listener.packet import Packet
+from socket_listener.sinks.base import Sink
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROUTE = "default"
+
+# Maximum number of (provider, source) entries in the dispatch table before it is reset.
+MAX_TABLE_SIZE = 10000
+
+
+def load_routes(path: str) -> list[dict]:
+    """Loads a list of routes from a YAML file.
+
+    Each route is a mapping with a name, optional matching criteria
+    (talkers, message_types, providers, sources) and the configuration of its sinks, e.g.:
+    ```yaml
+    - name: positions
+      message_types: [1, 2, 3]
+      sinks:
+        google_pubsub: {topic_id: nmea-positions, batch_size: 1000, linger: 0.05}
+    ```
+    """
+    with open(path) as f:
+        routes = yaml.safe_load(f) or []
+
+    if not isinstance(routes, list):
+        raise ValueError(f"Invalid routes file: {path}. Must contain a list of routes.")
+
+    return routes
+
+
+def message_type_char(message_type: int) -> bytes:
+    """Returns the first armored character of AIS payloads of the given message type."""
+    if not 1 <= message_type <= 63:
+        raise ValueError(f"Invalid AIS message type: {message_type}. Must be in [1, 63].")
+
+    return bytes([message_type + 48 if message_type < 40 else message_type + 56])
+
+
+def parse_sentence(line: bytes) -> tuple[bytes, bytes, bool]:
+    """Extracts routing fields from an NMEA sentence, optionally prefixed with a tagblock.
+
+    Returns:
+        A tuple (talker, AIS message type character, whether it is the continuation
+        of a multipart message). The message type is empty if there is no AIS payload.
+    """
+    if line.startswith(b"\\"):
+        line = line[line.find(b"\\", 1) + 1:]
+
+    fields = line.split(b",", 6)
+    talker = fields[0][1:]
+    if len(fields) < 6 or not line.startswith(b"!"):
+        # Not an encapsulated sentence (e.g., '$GPGLL,...'), it has no AIS payload.
+        return talker, b"", False
+
+    return talker, fields[5][:1], fields[2] not in (b"1", b"")
+
+
+class Route:
+    """Set of sinks that receive the messages matching some criteria.
+
+    A message matches if it matches every criteria passed.
+
+    Args:
+        name:
+            Name of the route, used in logs and metrics.
+
+        sinks:
+            Sinks in which to publish the matching messages.
+
+        talkers:
+            NMEA talker and sentence formatters to match, e.g. 'AIVDM' or 'BSVDM'.
+
+        message_types:
+            AIS message types to match. Multipart messages are matched by their first part.
+
+        providers:
+            Provider names to match.
+
+        sources:
+            Source IPs to match.
+    """
+    def __init__(
+        self,
+        name: str,
+        sinks: Sequence[Sink] = (),
+        talkers: Iterable[str] = None,
+        message_types: Iterable[int] = None,
+        providers: Iterable[str] = None,
+        sources: Iterable[str] = None,
+    ) -> None:
+        self.name = name
+        self.sinks = tuple(sinks)
+        self._talkers = _optional_set(t.upper().encode() for t in talkers or ())
+        self._types = _optional_set(message_type_char(int(t)) for t in message_types or ())
+        self._providers = _optional_set(providers)
+        self._sources = _optional_set(sources)
+
+    @property
+    def by_content(self) -> bool:
+        """Returns whether the route depends on the content of messages."""
+        return self._talkers is not None or self._types is not None
+
+    def matches_packet(self, provider: str, source: str) -> bool:
+        return (
+            (self._providers is None or provider in self._providers)
+            and (self._sources is None or source in self._sources)
+        )
+
+    def matches_message(self, talker: bytes, message_type: bytes) -> bool:
+        return (
+            (self._talkers is None or talker in self._talkers)
+            and (self._types is None or message_type in self._types)
+        )
+
+
+class Router:
+    """Dispatches the messages of packets to the sinks of matching routes.
+
+    Messages are published to the sinks of every route they match,
+    and messages matching no route are published to the default sinks.
+    Continuation parts of multipart messages follow their first part.
+
+    Args:
+        routes:
+            Routes to evaluate for each message.
+
+        default_sinks:
+            Sinks in which to publish messages that don't match any route.
+            If empty, those messages are dropped.
+
+        metrics:
+            Registry where the number of packets dispatched to each route is counted.
+    """
+    def __init__(
+        self,
+        routes: Sequence[Route],
+        default_sinks: Sequence[Sink] = (),
+        metrics: MetricsRegistry = None,
+    ) -> None:
+        self.routes = list(routes)
+        self._default = _Target(DEFAULT_ROUTE, default_sinks, metrics or default_registry)
+        self._targets = {
+            route: _Target(route.name, route.sinks, metrics or default_registry)
+            for route in self.routes
+        }
+
+        self._table = {}
+
+    @property
+    def sinks(self) -> list[Sink]:
+        """Returns the sinks of all routes."""
+        return [sink for route in self.routes for sink in route.sinks]
+
+    def route(self, packet: Packet) -> list[tuple[Sink, Packet]]:
+        """Returns (sink, packet) pairs, each packet with the messages routed to the sink."""
+        dispatch = self._dispatch(packet.source_name, packet.source_host)
+        if isinstance(dispatch, _Target):
+            # Routing does not depend on content, the packet is not split.
+            dispatch.inc()
+            return [(sink, packet) for sink in dispatch.sinks]
+
+        delimiter = packet.delimiter.encode(packet.decode_method)
+        lines_by_target = {}
+        target = self._default
+        for line in packet.data.split(delimiter):
+            line = line.strip()
+            if not line:
+                continue
+
+            talker, message_type, continuation = parse_sentence(line)
+            if not continuation:
+                key = (talker, message_type)
+                target = dispatch.get(key)
+                if target is None:
+                    target = dispatch[key] = self._content_target(dispatch.routes, *key)
+
+            lines_by_target.setdefault(target, []).append(line)
+
+        deliveries = []
+        whole = len(lines_by_target) == 1
+        for target, lines in lines_by_target.items():
+            target.inc()
+            routed = packet if whole else packet.with_data(delimiter.join(lines))
+            deliveries.extend((sink, routed) for sink in target.sinks)
+
+        return deliveries
+
+    def _dispatch(self, provider: str, source: str):
+        # Either the target of every message of the packet,
+        # or a _ContentDispatch to resolve the target of each message.
+        key = (provider, source)
+        dispatch = self._table.get(key)
+        if dispatch is None:
+            if len(self._table) >= MAX_TABLE_SIZE:
+                self._table = {}
+
+            routes = tuple(r for r in self.routes if r.matches_packet(provider, source))
+            if any(r.by_content for r in routes):
+                dispatch = _ContentDispatch(routes)
+            else:
+                dispatch = self._target(routes)
+
+            self._table[key] = dispatch
+
+        return dispatch
+
+    def _content_target(self, routes, talker: bytes, message_type: bytes) -> '_Target':
+        return self._target([r for r in routes if r.matches_message(talker, message_type)])
+
+    def _target(self, routes: Sequence[Route]) -> '_Target':
+        if not routes:
+            return self._default
+
+        if len(routes) == 1:
+            return self._targets[routes[0]]
+
+        # Packets dispatched to several routes are counted in each of them.
+        targets = [self._targets[r] for r in routes]
+        sinks = tuple(dict.fromkeys(s for t in targets for s in t.sinks))
+        return _Target("+".join(t.name for t in targets), sinks, counters=targets)
+
+
+class _Target:
+    """Sinks to which messages are dispatched, and counters of dispatched packets."""
+    def __init__(
+        self,
+        name: str,
+        sinks: Sequence[Sink],
+        metrics: MetricsRegistry = None,
+        counters: Sequence['_Target'] = None,
+    ) -> None:
+        self.name = name
+        self.sinks = tuple(sinks)
+        if counters is None:
+            counters = [metrics.counter("routing_packets_total", route=name)]
+        else:
+            counters = [c for target in counters for c in target._counters]
+
+        self._counters = counters
+
+    def inc(self) -> None:
+        for counter in self._counters:
+            counter.inc()
+
+
+class _ContentDispatch(dict):
+    """Memoized {(talker, message type): _Target} of the routes matching a packet."""
+    def __init__(self, routes: Sequence[Route]) -> None:
+        super().__init__()
+        self.routes = routes
+
+
+def _optional_set(values: Iterable) -> frozenset:
+    # None means "match anything", as opposed to an empty set, which would match nothing.
+    values = frozenset(values or ())
+    return values or None
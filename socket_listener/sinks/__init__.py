@@ -1,13 +1,50 @@
-"""Package with sink options to publish incoming packets."""
-from .pubsub import GooglePubSub
+"""Package with sink options to publish incoming packets.
 
-__all__ = [GooglePubSub]
+Sink classes are imported lazily, when they are first used,
+so heavy dependencies (e.g., the Pub/Sub client) are only loaded if needed.
+"""
+import importlib
+
+__all__ = [
+    "GooglePubSub",
+    "EmulatedPubSub",
+    "CaptureSink",
+    "ProcessSink",
+    "UnixSocketSink",
+    "PipeSink",
+    "UdpForwardSink",
+]
 
 
 SUBCLASSES_MAP = {
-    "google_pubsub": GooglePubSub,
+    "google_pubsub": "socket_listener.sinks.pubsub:GooglePubSub",
+    "emulated_pubsub": "socket_listener.sinks.emulator:EmulatedPubSub",
+    "capture": "socket_listener.sinks.capture:CaptureSink",
+    "process": "socket_listener.sinks.process:ProcessSink",
+    "unix_socket": "socket_listener.sinks.local:UnixSocketSink",
+    "pipe": "socket_listener.sinks.local:PipeSink",
+    "udp_forward": "socket_listener.sinks.udp:UdpForwardSink",
 }
 
+_CLASSES = {path.split(":")[1]: path for path in SUBCLASSES_MAP.values()}
+
+
+def get_sink_class(name):
+    """Returns the sink class registered with the given name, importing its module."""
+    return _load(SUBCLASSES_MAP[name])
+
 
 def create_sink(name, *args, **kwargs):
-    return SUBCLASSES_MAP[name](*args, **kwargs)
+    return get_sink_class(name)(*args, **kwargs)
+
+
+def __getattr__(name):
+    if name in _CLASSES:
+        return _load(_CLASSES[name])
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _load(path):
+    module_name, class_name = path.split(":")
+    return getattr(importlib.import_module(module_name), class_name)
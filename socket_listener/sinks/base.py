@@ -12,3 +12,29 @@ class Sink(ABC):
     @abstractmethod
     def publish(self, packet: Packet) -> None:
         """Publish instance of Packet to desired destination."""
+
+    def flush(self, timeout: float = None) -> int:
+        """Delivers any buffered data, waiting at most timeout seconds.
+
+        After this method is called, the sink is not expected to receive more packets.
+        The default implementation does nothing, which is correct for unbuffered sinks.
+
+        Args:
+            timeout:
+                Maximum number of seconds to wait. If None, waits indefinitely.
+
+        Returns:
+            The number of messages that could not be delivered before the timeout.
+        """
+        return 0
+
+    def tune(self, batch_size: int, linger: float) -> None:
+        """Adjusts batching of the sink, if supported. The default implementation does nothing.
+
+        Args:
+            batch_size:
+                Maximum number of messages per batch.
+
+            linger:
+                Maximum seconds to wait for a batch to fill up before sending it.
+        """
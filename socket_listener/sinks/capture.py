@@ -0,0 +1,56 @@
+"""Sink that records incoming packets into capture files, for later replay."""
+import logging
+from pathlib import Path
+
+from socket_listener import framing
+from socket_listener.capture import CaptureWriter
+from socket_listener.packet import Packet
+
+from .base import Sink
+
+logger = logging.getLogger(__name__)
+
+
+class CaptureSink(Sink):
+    """Writes each packet, with its reception time and source address, to capture files.
+
+    See socket_listener.capture for a description of the format.
+    Captures can be replayed with the transmitter.
+
+    Args:
+        directory:
+            Directory where capture segments are written.
+
+        segment_size:
+            Size in bytes after which a new segment is started.
+
+        compress:
+            If True, closed segments are compressed with gzip.
+    """
+    name = "capture"
+
+    def __init__(
+        self,
+        directory: str,
+        segment_size: int = 256 * 1024 * 1024,
+        compress: bool = False,
+    ) -> None:
+        self._writer = CaptureWriter(directory, segment_size=segment_size, compress=compress)
+
+    @property
+    def path(self) -> Path:
+        return self._writer.directory
+
+    def publish(self, packet: Packet) -> None:
+        """Appends the packet to the current capture segment."""
+        self._writer.write(
+            packet.data,
+            time_ns=framing.to_epoch_ns(packet.time),
+            host=packet.source_host,
+            port=packet.source_port,
+        )
+
+    def flush(self, timeout: float = None) -> int:
+        """Closes the current capture segment. Writes are synchronous, so nothing is abandoned."""
+        self._writer.close()
+        return 0
@@ -0,0 +1,162 @@
+"""Contains an in-process stand-in for Google Pub/Sub, useful for offline load testing."""
+import time
+import heapq
+import random
+import logging
+import itertools
+import threading
+from typing import Any
+
+from google.cloud.pubsub_v1 import types
+from google.cloud.pubsub_v1.publisher import futures
+from google.api_core import exceptions
+
+from socket_listener.sinks.pubsub import GooglePubSub
+
+logger = logging.getLogger(__name__)
+
+
+class EmulatedPublisherClient:
+    """Emulates the publishing interface of pubsub_v1.PublisherClient without network access.
+
+    Each published message resolves its future after a simulated latency,
+    so callers observe realistic publish times and can build up backpressure.
+    Futures are completed by a single background thread, in order of due time.
+
+    Args:
+        latency:
+            Mean publish latency in seconds.
+
+        jitter:
+            Maximum deviation in seconds (uniformly distributed) added to the latency.
+
+        error_rate:
+            Fraction of messages, between 0 and 1, that fail with ServiceUnavailable.
+
+        seed:
+            Seed for the random number generator, to get reproducible runs.
+    """
+    def __init__(
+        self,
+        latency: float = 0.05,
+        jitter: float = 0,
+        error_rate: float = 0,
+        seed: int = None,
+    ) -> None:
+        if not 0 <= error_rate <= 1:
+            raise ValueError(f"Invalid error_rate: {error_rate}. Must be between 0 and 1.")
+
+        self.batch_settings = types.BatchSettings()
+
+        self._latency = latency
+        self._jitter = jitter
+        self._error_rate = error_rate
+        self._random = random.Random(seed)
+
+        self._queue = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._stopped = False
+
+        self.published = 0
+        self.failed = 0
+
+        self._thread = threading.Thread(target=self._complete_futures, name="pubsub-emulator")
+        self._thread.daemon = True
+        self._thread.start()
+
+    @staticmethod
+    def topic_path(project: str, topic: str) -> str:
+        return f"projects/{project}/topics/{topic}"
+
+    def publish(self, topic: str, data: bytes, ordering_key: str = "", **attrs: str):
+        """Publishes a message, returning a future that resolves to the message id."""
+        if not isinstance(data, bytes):
+            raise TypeError("Data being published to Pub/Sub must be sent as a bytestring.")
+
+        future = futures.Future()
+        delay = self._latency + self._random.uniform(-self._jitter, self._jitter)
+        fail = self._random.random() < self._error_rate
+
+        with self._condition:
+            if self._stopped:
+                raise RuntimeError("Cannot publish on a stopped publisher.")
+
+            due = time.monotonic() + max(delay, 0)
+            heapq.heappush(self._queue, (due, next(self._sequence), future, fail))
+            self._condition.notify()
+
+        return future
+
+    def resume_publish(self, topic: str, ordering_key: str) -> None:
+        """Resumes publishing of an ordering key after an error. The emulator never pauses keys."""
+
+    def stop(self) -> None:
+        """Prevents further publishing. Already published messages are still resolved."""
+        with self._condition:
+            if self._stopped:
+                raise RuntimeError("Cannot stop a publisher already stopped.")
+
+            self._stopped = True
+            self._condition.notify()
+
+    def _complete_futures(self) -> None:
+        while True:
+            with self._condition:
+                while True:
+                    if not self._queue:
+                        if self._stopped:
+                            return
+
+                        self._condition.wait()
+                        continue
+
+                    wait = self._queue[0][0] - time.monotonic()
+                    if wait <= 0:
+                        _, message_id, future, fail = heapq.heappop(self._queue)
+                        break
+
+                    self._condition.wait(timeout=wait)
+
+            if fail:
+                self.failed += 1
+                future.set_exception(exceptions.ServiceUnavailable("Injected publish error."))
+            else:
+                self.published += 1
+                future.set_result(str(message_id))
+
+
+class EmulatedPubSub(GooglePubSub):
+    """GooglePubSub sink that publishes to an in-process EmulatedPublisherClient.
+
+    Exercises the same publishing code path as GooglePubSub,
+    but with configurable latency, jitter and error rate and without network access.
+
+    Args:
+        *args:
+            Positional arguments for GooglePubSub constructor.
+
+        latency, jitter, error_rate, seed:
+            Arguments for EmulatedPublisherClient constructor.
+
+        **kwargs:
+            Keyword arguments for GooglePubSub constructor.
+    """
+    name = "emulated_pubsub"
+
+    def __init__(
+        self,
+        *args: Any,
+        latency: float = 0.05,
+        jitter: float = 0,
+        error_rate: float = 0,
+        seed: int = None,
+        **kwargs: Any
+    ) -> None:
+        self._emulator_kwargs = dict(
+            latency=latency, jitter=jitter, error_rate=error_rate, seed=seed
+        )
+        super().__init__(*args, **kwargs)
+
+    def _create_publisher(self, publisher_options: Any = None) -> EmulatedPublisherClient:
+        return EmulatedPublisherClient(**self._emulator_kwargs)
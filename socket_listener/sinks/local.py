@@ -0,0 +1,338 @@
+"""Sinks that hand packets off to consumers on the same node.
+
+Packets are written as length-prefixed records:
+
+```text
+ offset  size  field
+ 0       4     payload length (N, unsigned, big-endian)
+ 4       N     payload: the packet data, prefixed with its compact metadata header by default
+```
+
+See socket_listener.framing for the metadata header. Use read_records() to read them back.
+
+Request handlers only append records to an in-memory batch.
+A writer thread sends batches as soon as they reach batch_bytes or after linger seconds,
+so local consumers get packets with sub-millisecond latency and few system calls.
+If the consumer is not there or can't keep up, records are dropped and counted,
+instead of blocking the receiver; the connection is retried with the next batch.
+"""
+import sys
+import time
+import struct
+import socket
+import logging
+import threading
+from abc import abstractmethod
+from typing import BinaryIO, Iterator
+
+from socket_listener import framing
+from socket_listener.logs import redirect_console_logging
+from socket_listener.metrics import MetricsRegistry, registry as default_registry
+from socket_listener.packet import Packet
+
+from .base import Sink
+
+logger = logging.getLogger(__name__)
+
+_LENGTH = struct.Struct(">I")
+
+
+class SocketType:
+    STREAM = "stream"
+    DATAGRAM = "datagram"
+
+    ALL = frozenset([STREAM, DATAGRAM])
+
+
+def read_records(stream: BinaryIO) -> Iterator[bytes]:
+    """Yields the payloads of the length-prefixed records of a binary stream, until EOF."""
+    while True:
+        header = stream.read(_LENGTH.size)
+        if len(header) < _LENGTH.size:
+            return
+
+        (length,) = _LENGTH.unpack(header)
+        yield stream.read(length)
+
+
+class BatchWriterSink(Sink):
+    """Base class for sinks that write records in batches from a thread.
+
+    By default, records are length-prefixed. Subclasses may override _encode().
+
+    Args:
+        metadata:
+            If True, payloads are prefixed with the compact metadata header of the packet.
+            Otherwise, payloads are just the packet data.
+
+        batch_bytes:
+            Size in bytes of the batches that are sent without waiting for linger.
+
+        linger:
+            Max seconds to wait for a batch to fill up before sending it.
+
+        max_buffer_bytes:
+            Max bytes of records waiting to be sent. When exceeded, new records are dropped.
+
+        retry_delay:
+            Seconds after a failed write during which records are dropped
+            without trying to reconnect.
+
+        metrics:
+            Registry where sent, failed and dropped messages are counted.
+    """
+    def __init__(
+        self,
+        metadata: bool = True,
+        batch_bytes: int = 256 * 1024,
+        linger: float = 0.0005,
+        max_buffer_bytes: int = 64 * 1024 * 1024,
+        retry_delay: float = 1,
+        metrics: MetricsRegistry = None,
+    ) -> None:
+        self._metadata = metadata
+        self._batch_bytes = batch_bytes
+        self._linger = linger
+        self._max_buffer_bytes = max_buffer_bytes
+        self._retry_delay = retry_delay
+
+        metrics = metrics or default_registry
+        labels = dict(sink=self.name, path=str(self.path))
+        self._sent = metrics.counter("local_sink_sent_total", **labels)
+        self._failed = metrics.counter("local_sink_failed_total", **labels)
+        self._dropped = metrics.counter("local_sink_dropped_total", **labels)
+
+        self._records = []
+        self._size = 0
+        self._sending = 0
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._failed_at = None
+        self._thread = threading.Thread(target=self._run, name=f"{self.name}-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    @abstractmethod
+    def path(self) -> str:
+        """Returns the destination of the records."""
+
+    def publish(self, packet: Packet) -> None:
+        """Appends the packet to the current batch."""
+        record = self._encode(packet)
+        with self._condition:
+            if self._stopped:
+                logger.warning(f"Packet published to {self.path} after flush. Abandoned.")
+                return
+
+            if self._size + len(record) > self._max_buffer_bytes:
+                self._dropped.inc()
+                return
+
+            self._records.append(record)
+            self._size += len(record)
+            # The writer waits for the first record to start lingering, and for a full batch.
+            if len(self._records) == 1 or self._size >= self._batch_bytes:
+                self._condition.notify()
+
+    def flush(self, timeout: float = None) -> int:
+        """Sends the pending records and closes the destination.
+
+        Returns:
+            The number of records that could not be sent before the timeout.
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+
+        self._thread.join(timeout=timeout)
+        with self._condition:
+            return len(self._records) + self._sending if self._thread.is_alive() else 0
+
+    def tune(self, batch_size: int, linger: float) -> None:
+        """Adjusts the linger time. Batches are sized in bytes, so batch_size is ignored."""
+        self._linger = linger
+
+    def _encode(self, packet: Packet) -> bytes:
+        """Returns the record of a packet."""
+        payload = framing.encode(packet) if self._metadata else packet.data
+        return _LENGTH.pack(len(payload)) + payload
+
+    @abstractmethod
+    def _open(self) -> None:
+        """Opens the destination."""
+
+    @abstractmethod
+    def _write(self, records: list[bytes]) -> None:
+        """Writes records to the open destination."""
+
+    @abstractmethod
+    def _close(self) -> None:
+        """Closes the destination, if open."""
+
+    def _run(self) -> None:
+        opened = False
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._records or self._stopped)
+                if not self._stopped and self._size < self._batch_bytes:
+                    self._condition.wait_for(
+                        lambda: self._stopped or self._size >= self._batch_bytes,
+                        timeout=self._linger,
+                    )
+
+                records, self._records, self._size = self._records, [], 0
+                self._sending = len(records)
+                if not records and self._stopped:
+                    break
+
+            opened = self._send(records, opened)
+            self._sending = 0
+
+        if opened:
+            self._close()
+
+    def _send(self, records: list[bytes], opened: bool) -> bool:
+        # Returns whether the destination is open after sending.
+        if not opened and self._failed_at is not None:
+            if time.monotonic() - self._failed_at < self._retry_delay:
+                self._failed.inc(len(records))
+                return False
+
+        try:
+            if not opened:
+                self._open()
+                logger.info(f"Connected to {self.path}.")
+
+            self._write(records)
+        except OSError as e:
+            if self._failed_at is None:
+                logger.warning(f"Failed to write to {self.path}: {e!r}. Retrying.")
+
+            self._failed_at = time.monotonic()
+            self._failed.inc(len(records))
+            self._close()
+            return False
+
+        self._failed_at = None
+        self._sent.inc(len(records))
+        return True
+
+
+class UnixSocketSink(BatchWriterSink):
+    """Writes packets to a Unix domain socket.
+
+    With a stream socket, batches are written with a single sendall().
+    With a datagram socket, each datagram packs as many whole records as fit in
+    max_datagram_size, so records are never split between datagrams.
+
+    Args:
+        path:
+            Path of the Unix domain socket, bound by the consumer.
+
+        socket_type:
+            Either 'stream' or 'datagram'.
+
+        max_datagram_size:
+            With datagram sockets, maximum size in bytes of each datagram.
+
+        **kwargs:
+            Keyword arguments for BatchWriterSink.
+    """
+    name = "unix_socket"
+
+    def __init__(
+        self,
+        path: str,
+        socket_type: str = SocketType.STREAM,
+        max_datagram_size: int = 65536,
+        **kwargs,
+    ) -> None:
+        if socket_type not in SocketType.ALL:
+            raise ValueError(
+                f"Invalid socket type: {socket_type}. Must be one of {sorted(SocketType.ALL)}.")
+
+        self._path = path
+        self._socket_type = socket_type
+        self._max_datagram_size = max_datagram_size
+        self._socket = None
+        super().__init__(**kwargs)
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def _open(self) -> None:
+        kind = socket.SOCK_STREAM if self._socket_type == SocketType.STREAM else socket.SOCK_DGRAM
+        sock = socket.socket(socket.AF_UNIX, kind)
+        try:
+            sock.connect(self._path)
+        except OSError:
+            sock.close()
+            raise
+
+        self._socket = sock
+
+    def _write(self, records: list[bytes]) -> None:
+        if self._socket_type == SocketType.STREAM:
+            self._socket.sendall(b"".join(records))
+            return
+
+        datagram, size = [], 0
+        for record in records:
+            if datagram and size + len(record) > self._max_datagram_size:
+                self._socket.send(b"".join(datagram))
+                datagram, size = [], 0
+
+            datagram.append(record)
+            size += len(record)
+
+        if datagram:
+            self._socket.send(b"".join(datagram))
+
+    def _close(self) -> None:
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+
+class PipeSink(BatchWriterSink):
+    """Writes packets to a named pipe (FIFO), a file, or the standard output.
+
+    A named pipe is opened by the writer thread, which waits until a consumer opens it.
+
+    Args:
+        path:
+            Path of the named pipe. If None, packets are written to the standard output,
+            and logs that were written there are moved to the standard error.
+
+        **kwargs:
+            Keyword arguments for BatchWriterSink.
+    """
+    name = "pipe"
+
+    def __init__(self, path: str = None, **kwargs) -> None:
+        self._path = path
+        self._file = None
+        super().__init__(**kwargs)
+        if path is None and redirect_console_logging():
+            logger.info("Logs moved to stderr, as packets are written to stdout.")
+
+    @property
+    def path(self) -> str:
+        return "stdout" if self._path is None else self._path
+
+    def _open(self) -> None:
+        self._file = sys.stdout.buffer if self._path is None else open(self._path, "ab")
+
+    def _write(self, records: list[bytes]) -> None:
+        self._file.write(b"".join(records))
+        self._file.flush()
+
+    def _close(self) -> None:
+        if self._file is not None and self._path is not None:
+            try:
+                self._file.close()
+            except OSError:
+                logger.debug(f"Buffered data to {self.path} lost on close.")
+
+        self._file = None
@@ -0,0 +1,281 @@
+"""Sink that publishes packets from separate processes, fed through shared-memory ring buffers.
+
+Serialization and client threads of sinks (e.g., gRPC threads of the Pub/Sub client)
+compete for the GIL with the socket read loop when they share an interpreter.
+A ProcessSink moves the configured sinks to publisher processes:
+request handlers only append each packet, with its compact metadata header
+(see socket_listener.framing), to the ring buffer of a publisher process.
+
+When a ring buffer is full, publish() blocks for up to max_wait seconds,
+so the latency seen by the backpressure controller grows, and then drops the packet.
+Full rings and dropped packets are counted per ring.
+"""
+import time
+import struct
+import logging
+import itertools
+import threading
+import multiprocessing
+from datetime import datetime
+
+from socket_listener import framing
+from socket_listener.metrics import MetricsRegistry, registry as default_registry
+from socket_listener.packet import Packet
+from socket_listener.ring import RingBuffer
+from socket_listener.sinks import create_sink
+
+from .base import Sink, SinkError
+
+logger = logging.getLogger(__name__)
+
+# Record prefix with the source port, which is not part of the compact metadata header.
+_PORT = struct.Struct("<H")
+
+_FOREVER = 365 * 24 * 3600
+
+
+class ProcessSinkError(SinkError):
+    pass
+
+
+class ProcessSink(Sink):
+    """Publishes packets to sinks living in separate processes.
+
+    Args:
+        sinks_config:
+            Dictionary with the configuration of the sinks of each publisher process.
+
+        processes:
+            Number of publisher processes. Each one has its own ring buffer and sinks,
+            and packets are assigned to them in round-robin.
+
+        ring_size:
+            Size in bytes of the ring buffer of each publisher process.
+
+        max_wait:
+            Max seconds to wait for free space in a full ring buffer before dropping a packet.
+            If 0, packets are dropped immediately.
+
+        delimiter:
+            Delimiter of the packets rebuilt in publisher processes.
+
+        poll_interval:
+            Seconds that publisher processes, and publish() when blocked, sleep between polls.
+
+        metrics:
+            Registry where full rings and dropped packets are counted.
+    """
+    name = "process"
+
+    def __init__(
+        self,
+        sinks_config: dict,
+        processes: int = 1,
+        ring_size: int = 64 * 1024 * 1024,
+        max_wait: float = 1.0,
+        delimiter: str = "\n",
+        poll_interval: float = 0.001,
+        metrics: MetricsRegistry = None,
+    ) -> None:
+        if processes < 1:
+            raise ValueError(f"Invalid number of processes: {processes}. Must be >= 1.")
+
+        self._sinks_config = dict(sinks_config)
+        self._max_wait = max_wait
+        self._poll_interval = poll_interval
+        self._next = itertools.count()
+        self._reported_errors = 0
+        self._flushed = False
+
+        # Spawn, because forking a process with running threads is not safe.
+        context = multiprocessing.get_context("spawn")
+        self._stop = context.Event()
+        self._deadline = context.RawValue("d", 0)
+        self._tuning = context.RawArray("d", 3)
+
+        metrics = metrics or default_registry
+        self._publishers = []
+        for i in range(processes):
+            publisher = _Publisher(context, RingBuffer(ring_size), metrics, label=str(i))
+            publisher.process = context.Process(
+                target=_run_publisher,
+                args=(
+                    publisher.ring.name, self._sinks_config, delimiter, poll_interval,
+                    self._stop, self._deadline, self._tuning,
+                    publisher.consumed, publisher.errors, publisher.abandoned,
+                ),
+                name=f"publisher-{i}",
+                daemon=True,
+            )
+            self._publishers.append(publisher)
+
+        for publisher in self._publishers:
+            publisher.process.start()
+
+    @property
+    def path(self) -> str:
+        names = ", ".join(self._sinks_config) or "no sinks"
+        return f"{len(self._publishers)} publisher process(es) ({names})"
+
+    @property
+    def dropped(self) -> int:
+        """Returns the number of packets dropped because ring buffers were full."""
+        return sum(publisher.dropped.value for publisher in self._publishers)
+
+    def publish(self, packet: Packet) -> None:
+        """Appends the packet to the ring buffer of a publisher process.
+
+        Raises:
+            ProcessSinkError: if publishing failed in publisher processes since the last call,
+                or the publisher process is not running.
+        """
+        if self._flushed:
+            logger.warning("Packet published after the sink was flushed. Abandoned.")
+            return
+
+        record = _PORT.pack(packet.source_port or 0) + framing.encode(packet)
+        publisher = self._publishers[next(self._next) % len(self._publishers)]
+        if not publisher.put(record):
+            if not publisher.process.is_alive():
+                raise ProcessSinkError(f"Publisher process {publisher.process.name} is dead.")
+
+            publisher.full.inc()
+            deadline = time.monotonic() + self._max_wait
+            while not publisher.put(record):
+                if time.monotonic() >= deadline:
+                    publisher.dropped.inc()
+                    logger.debug(f"Ring buffer of {publisher.process.name} full. Packet dropped.")
+                    break
+
+                time.sleep(self._poll_interval)
+
+        errors = sum(publisher.errors.value for publisher in self._publishers)
+        if errors > self._reported_errors:
+            new_errors = errors - self._reported_errors
+            self._reported_errors = errors
+            raise ProcessSinkError(f"{new_errors} error(s) publishing in publisher processes.")
+
+    def flush(self, timeout: float = None) -> int:
+        """Waits for publisher processes to consume their ring buffers and flush their sinks.
+
+        Returns:
+            The number of packets not consumed plus the messages abandoned by the sinks.
+        """
+        if self._flushed:
+            return 0
+
+        self._flushed = True
+        timeout = _FOREVER if timeout is None else timeout
+        self._deadline.value = time.time() + timeout
+        self._stop.set()
+
+        deadline = time.monotonic() + timeout
+        for publisher in self._publishers:
+            publisher.process.join(timeout=max(deadline - time.monotonic(), 0))
+
+        abandoned = 0
+        for publisher in self._publishers:
+            abandoned += publisher.close()
+
+        return abandoned
+
+    def tune(self, batch_size: int, linger: float) -> None:
+        """Adjusts batching of the sinks of publisher processes."""
+        self._tuning[1] = batch_size
+        self._tuning[2] = linger
+        self._tuning[0] += 1
+
+
+class _Publisher:
+    """Ring buffer, counters and process of a publisher, on the producer side."""
+    def __init__(self, context, ring: RingBuffer, metrics: MetricsRegistry, label: str) -> None:
+        self.ring = ring
+        self.process = None
+        self.written = 0
+        self.consumed = context.RawValue("q", 0)
+        self.errors = context.RawValue("q", 0)
+        self.abandoned = context.RawValue("q", 0)
+        self.full = metrics.counter("publisher_ring_full_total", ring=label)
+        self.dropped = metrics.counter("publisher_ring_dropped_total", ring=label)
+        metrics.gauge("publisher_ring_used_bytes", lambda: ring.used, ring=label)
+        self._lock = threading.Lock()
+
+    def put(self, record: bytes) -> bool:
+        with self._lock:
+            if self.ring.closed:
+                logger.warning("Packet published after the sink was flushed. Abandoned.")
+                return True
+
+            if not self.ring.put(record):
+                return False
+
+            self.written += 1
+            return True
+
+    def close(self) -> int:
+        """Stops the process, if still running, and frees the ring buffer.
+
+        Returns:
+            The number of packets not consumed plus the messages abandoned by the sinks.
+        """
+        if self.process.is_alive():
+            logger.warning(f"Publisher process {self.process.name} did not finish in time.")
+            self.process.terminate()
+            self.process.join()
+
+        with self._lock:
+            self.ring.close()
+            return self.written - self.consumed.value + self.abandoned.value
+
+
+def _run_publisher(
+    ring_name, sinks_config, delimiter, poll_interval,
+    stop, deadline, tuning, consumed, errors, abandoned,
+):
+    ring = RingBuffer(name=ring_name)
+    sinks = [create_sink(n, **v) for n, v in sinks_config.items()]
+    tuned = 0
+
+    while True:
+        if tuning[0] != tuned:
+            tuned = tuning[0]
+            for sink in sinks:
+                sink.tune(int(tuning[1]), tuning[2])
+
+        record = ring.get()
+        if record is None:
+            # Checked only when the ring is empty, so every packet is published before stopping.
+            if stop.is_set():
+                break
+
+            time.sleep(poll_interval)
+            continue
+
+        if stop.is_set() and time.time() > deadline.value:
+            break
+
+        (port,) = _PORT.unpack_from(record)
+        metadata, data = framing.decode(record[_PORT.size:])
+        packet = Packet(
+            data,
+            protocol=metadata["protocol"],
+            source_host=metadata["source_host"],
+            source_port=port or None,
+            source_name=metadata["source_name"],
+            delimiter=delimiter,
+        )
+        packet.time = datetime.fromisoformat(metadata["time"])
+
+        for sink in sinks:
+            try:
+                sink.publish(packet)
+            except SinkError as e:
+                errors.value += 1
+                logger.error(f"Error publishing to {sink.name}: {e!r}.")
+
+        consumed.value += 1
+
+    for sink in sinks:
+        abandoned.value += sink.flush(timeout=max(deadline.value - time.time(), 0))
+
+    ring.close()
@@ -1,11 +1,21 @@
 """Contains class for Google Pub/Sub publication."""
+import time
+import zlib
 import logging
-from typing import Callable
+import itertools
+import threading
+import concurrent.futures
+from typing import Callable, NamedTuple, Sequence, Union
 from functools import cached_property
 
 from google.cloud import pubsub_v1
+from google.cloud.pubsub_v1 import types
 from google.api_core import exceptions
 
+from socket_listener import framing
+from socket_listener.compression import create_codec
+from socket_listener.inflight import InFlight
+from socket_listener.metrics import Counter, MetricsRegistry, registry as default_registry
 from socket_listener.sinks.base import Sink, SinkError
 from socket_listener.packet import Packet
 
@@ -19,10 +29,40 @@ class Format:
     ALL = frozenset([RAW, SPLIT])
 
 
+class MetadataEncoding:
+    ATTRIBUTES = "attributes"
+    COMPACT = "compact"
+
+    ALL = frozenset([ATTRIBUTES, COMPACT])
+
+
+class Sharding:
+    ROUND_ROBIN = "round_robin"
+    SOURCE = "source"
+    PROVIDER = "provider"
+
+    ALL = frozenset([ROUND_ROBIN, SOURCE, PROVIDER])
+
+
+class OrderingKey:
+    SOURCE = "source"
+    PROVIDER = "provider"
+
+    ALL = frozenset([SOURCE, PROVIDER])
+
+
 class GooglePubSubError(SinkError):
     pass
 
 
+class Shard(NamedTuple):
+    """A (publisher client, topic) pair to which messages are published."""
+    publisher: pubsub_v1.PublisherClient
+    topic_path: str
+    published: Counter
+    failed: Counter
+
+
 class GooglePubSub(Sink):
     """Publish Packet instances to Google PubSub service.
 
@@ -35,19 +75,92 @@ class GooglePubSub(Sink):
 
         data_format:
             Either 'raw' or 'split'. Defaults to 'raw'.
+
+        metadata_encoding:
+            How packet metadata is sent. Either 'attributes' (string message attributes)
+            or 'compact' (binary header prepended to data, see socket_listener.framing).
+            Defaults to 'attributes'.
+
+        compression:
+            Name of the codec used to compress payloads (see socket_listener.compression).
+            Only supported with 'raw' data format. The codec name is sent in the
+            'content_encoding' attribute. Defaults to None (no compression).
+
+        clients:
+            Number of publisher clients. Each client publishes to every topic,
+            so there are (clients x topics) shards. Defaults to 1.
+
+        sharding:
+            How packets are assigned to shards. Either 'round_robin',
+            or 'source' / 'provider' (hash of the source IP / provider name).
+            Defaults to 'round_robin'.
+
+        ordering_key:
+            If passed, messages are published with an ordering key taken from the packet:
+            'source' (source IP) or 'provider' (provider name).
+            With more than one shard, it must match sharding, so each key uses a single shard.
+
+        batch_size:
+            Maximum number of messages per batch. Defaults to the Pub/Sub client default.
+
+        linger:
+            Maximum seconds to wait for a batch to fill up. Defaults to the Pub/Sub client default.
+
+        metrics:
+            Registry where the published and failed messages of each shard are counted.
     """
     name = "google_pubsub"
 
-    def __init__(self, project_id: str, topic_id: str, data_format: str = Format.RAW) -> None:
+    def __init__(
+        self,
+        project_id: str,
+        topic_id: Union[str, Sequence[str]],
+        data_format: str = Format.RAW,
+        metadata_encoding: str = MetadataEncoding.ATTRIBUTES,
+        compression: str = None,
+        clients: int = 1,
+        sharding: str = Sharding.ROUND_ROBIN,
+        ordering_key: str = None,
+        batch_size: int = None,
+        linger: float = None,
+        metrics: MetricsRegistry = None,
+    ) -> None:
         self._project_id = project_id
-        self._topic_id = topic_id
+        self._topic_ids = list(topic_id) if isinstance(topic_id, (list, tuple)) else [topic_id]
         self._data_format = self._validate_data_format(data_format)
+        self._metadata_encoding = self._validate_metadata_encoding(metadata_encoding)
+        self._codec = self._create_codec(compression)
+        self._sharding = self._validate_sharding(sharding, ordering_key, clients)
+        self._ordering_key = ordering_key
+
+        publisher_options = None
+        if ordering_key is not None:
+            publisher_options = types.PublisherOptions(enable_message_ordering=True)
+
+        self._publishers = [self._create_publisher(publisher_options) for _ in range(clients)]
+        if batch_size is not None or linger is not None:
+            defaults = types.BatchSettings()
+            self.tune(
+                batch_size=defaults.max_messages if batch_size is None else batch_size,
+                linger=defaults.max_latency if linger is None else linger,
+            )
 
-        self._publisher = pubsub_v1.PublisherClient()
+        self._shards = self._create_shards(metrics or default_registry)
+        self._round_robin = itertools.count()
+
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+        # Publish calls in progress, made outside the lock so shards publish concurrently.
+        self._publishing = InFlight()
+        self._stopped = False
 
     @cached_property
     def path(self):
-        return self._publisher.topic_path(self._project_id, self._topic_id)
+        paths = list(dict.fromkeys(shard.topic_path for shard in self._shards))
+        if len(paths) == 1:
+            return paths[0]
+
+        return ", ".join(paths)
 
     @cached_property
     def publish_methods(self) -> dict[str, Callable[[Packet], None]]:
@@ -60,26 +173,144 @@ class GooglePubSub(Sink):
         """Publish a Packet to Google Pub/Sub using the selected format."""
         self.publish_methods[self._data_format](packet)
 
+    def flush(self, timeout: float = None) -> int:
+        """Waits for pending futures to complete and stops the publisher client.
+
+        Messages published after this method is called are logged and abandoned.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._pending_lock:
+            self._stopped = True
+
+        # Publish calls that passed the check above add their futures before finishing.
+        self._publishing.wait(timeout=timeout)
+        with self._pending_lock:
+            pending = list(self._pending)
+
+        if deadline is not None:
+            timeout = max(deadline - time.monotonic(), 0)
+
+        _, not_done = concurrent.futures.wait(pending, timeout=timeout)
+
+        for publisher in self._publishers:
+            try:
+                # Sends any outstanding batch. No more publish calls can happen at this point.
+                publisher.stop()
+            except RuntimeError:
+                logger.debug("Publisher client was already stopped.")
+
+        return len(not_done)
+
+    def tune(self, batch_size: int, linger: float) -> None:
+        """Adjusts the batch settings of the publisher clients. Applies to new batches."""
+        for publisher in self._publishers:
+            publisher.batch_settings = types.BatchSettings(
+                max_bytes=publisher.batch_settings.max_bytes,
+                max_latency=linger,
+                max_messages=batch_size,
+            )
+
     def _publish_raw(self, packet: Packet) -> None:
-        self._publish(data=packet.data, **packet.metadata)
+        self._publish_message(packet, packet.data)
 
     def _publish_split(self, packet: Packet) -> None:
         # Attempt to split the packet. If it cannot be split, it will contain a single raw message.
         for message in packet.messages:
-            self._publish(data=message, **packet.metadata)
+            self._publish_message(packet, message)
+
+    def _publish_message(self, packet: Packet, data: bytes) -> None:
+        attrs = {}
+        if self._metadata_encoding == MetadataEncoding.COMPACT:
+            data = framing.encode(packet, data)
+        else:
+            attrs = packet.metadata
 
-    def _publish(self, data: bytes, **attrs: str) -> None:
+        if self._codec is not None:
+            data = self._codec.compress(data)
+            attrs = dict(attrs, content_encoding=self._codec.name)
+
+        if self._ordering_key is not None:
+            attrs = dict(attrs, ordering_key=self._packet_key(packet, self._ordering_key))
+
+        self._publish(self._select_shard(packet), data=data, **attrs)
+
+    def _select_shard(self, packet: Packet) -> Shard:
+        if len(self._shards) == 1:
+            return self._shards[0]
+
+        if self._sharding == Sharding.ROUND_ROBIN:
+            index = next(self._round_robin)
+        else:
+            # crc32 instead of hash(), which is randomized for every process.
+            index = zlib.crc32(self._packet_key(packet, self._sharding).encode())
+
+        return self._shards[index % len(self._shards)]
+
+    @staticmethod
+    def _packet_key(packet: Packet, key: str) -> str:
+        value = packet.source_host if key == OrderingKey.SOURCE else packet.source_name
+        return str(value or "")
+
+    def _publish(self, shard: Shard, data: bytes, **attrs: str) -> None:
         try:
-            future = self._publisher.publish(topic=self.path, data=data, **attrs)
-            message_id = future.result(timeout=5.0)
-            logger.debug(f"Published message ID: {message_id}")
+            with self._pending_lock:
+                if self._stopped:
+                    logger.warning("Publisher was stopped while draining. Message abandoned.")
+                    return
+
+                self._publishing.acquire()
+
+            try:
+                future = shard.publisher.publish(topic=shard.topic_path, data=data, **attrs)
+                with self._pending_lock:
+                    self._pending.add(future)
+            finally:
+                self._publishing.release()
+
+            try:
+                message_id = future.result(timeout=5.0)
+            finally:
+                with self._pending_lock:
+                    self._pending.discard(future)
+
+            shard.published.inc()
+            # Formatted lazily, only if the record is emitted.
+            logger.debug("Published message ID: %s", message_id)
         except exceptions.PermissionDenied as e:
             # This is a critical error — the server must be terminated in this case.
-            logger.critical(f"Failed to publish message: {e}")
+            shard.failed.inc()
+            logger.critical("Failed to publish message: %s", e)
             raise GooglePubSubError(e)
         except Exception as e:
             # The cause of this error is unknown; we simply log it
-            logger.critical(f"Failed to publish message: {e}")
+            shard.failed.inc()
+            logger.critical("Failed to publish message: %s", e)
+
+            ordering_key = attrs.get("ordering_key")
+            if ordering_key is not None:
+                # Publishing of a key is paused after an error, until it is resumed.
+                shard.publisher.resume_publish(shard.topic_path, ordering_key)
+
+    def _create_publisher(self, publisher_options: types.PublisherOptions = None):
+        # Honors PUBSUB_EMULATOR_HOST, so it can also target the official Pub/Sub emulator.
+        if publisher_options is None:
+            return pubsub_v1.PublisherClient()
+
+        return pubsub_v1.PublisherClient(publisher_options=publisher_options)
+
+    def _create_shards(self, metrics: MetricsRegistry) -> list[Shard]:
+        shards = []
+        for publisher in self._publishers:
+            for topic_id in self._topic_ids:
+                labels = dict(sink=self.name, shard=len(shards), topic=topic_id)
+                shards.append(Shard(
+                    publisher=publisher,
+                    topic_path=publisher.topic_path(self._project_id, topic_id),
+                    published=metrics.counter("pubsub_published_total", **labels),
+                    failed=metrics.counter("pubsub_failed_total", **labels),
+                ))
+
+        return shards
 
     def _validate_data_format(self, data_format: str) -> str:
         if data_format not in Format.ALL:
@@ -88,3 +319,44 @@ class GooglePubSub(Sink):
             )
 
         return data_format
+
+    def _validate_sharding(self, sharding: str, ordering_key: str, clients: int) -> str:
+        if sharding not in Sharding.ALL:
+            raise ValueError(f"Invalid sharding: {sharding}. Must be one of: {Sharding.ALL}")
+
+        if ordering_key is not None and ordering_key not in OrderingKey.ALL:
+            raise ValueError(
+                f"Invalid ordering_key: {ordering_key}. Must be one of: {OrderingKey.ALL}"
+            )
+
+        if clients < 1:
+            raise ValueError(f"Invalid number of clients: {clients}. Must be >= 1.")
+
+        shards = clients * len(self._topic_ids)
+        if ordering_key is not None and shards > 1 and sharding != ordering_key:
+            raise ValueError(
+                f"With {shards} shards, sharding must be '{ordering_key}' "
+                f"to keep the order of messages with the same ordering key."
+            )
+
+        return sharding
+
+    def _create_codec(self, compression: str):
+        if compression is None:
+            return None
+
+        if self._data_format != Format.RAW:
+            raise ValueError(
+                f"Compression is only supported with '{Format.RAW}' data format."
+            )
+
+        return create_codec(compression)
+
+    def _validate_metadata_encoding(self, metadata_encoding: str) -> str:
+        if metadata_encoding not in MetadataEncoding.ALL:
+            raise ValueError(
+                f"Invalid metadata_encoding: {metadata_encoding}. "
+                f"Must be one of: {MetadataEncoding.ALL}"
+            )
+
+        return metadata_encoding
@@ -0,0 +1,160 @@
+"""Sink that forwards datagrams to other UDP listeners, e.g. to mirror the raw feed."""
+import time
+import errno
+import socket
+import logging
+from typing import Sequence, Union
+
+from socket_listener.metrics import MetricsRegistry, registry as default_registry
+from socket_listener.packet import Packet
+
+from .local import BatchWriterSink
+
+logger = logging.getLogger(__name__)
+
+
+def parse_address(address: str) -> tuple[str, int]:
+    """Parses a 'host:port' address. IPv6 hosts are enclosed in brackets, e.g. '[::1]:10110'."""
+    host, sep, port = address.rpartition(":")
+    if not sep or not host or not port.isdigit():
+        raise ValueError(f"Invalid address: {address}. Must be 'host:port'.")
+
+    return host.strip("[]"), int(port)
+
+
+class UdpForwardSink(BatchWriterSink):
+    """Forwards each packet, as a single datagram, to one or more destinations.
+
+    Python has no sendmmsg(), so batches are sent by the writer thread with one send()
+    per datagram and destination, on a connected socket per destination.
+    Request handlers only append packets to the batch.
+
+    A failing destination does not affect the others: the rest of its batch is dropped
+    and counted, and its socket is reconnected after retry_delay seconds.
+    Sent and failed datagrams are counted per destination.
+
+    Args:
+        destinations:
+            Addresses to forward to, as 'host:port' strings.
+
+        retry_delay:
+            Seconds after a failure during which a destination is skipped.
+
+        metrics:
+            Registry where sent and failed datagrams are counted.
+
+        **kwargs:
+            Keyword arguments for BatchWriterSink.
+    """
+    name = "udp_forward"
+
+    def __init__(
+        self,
+        destinations: Union[str, Sequence[str]],
+        retry_delay: float = 1,
+        metrics: MetricsRegistry = None,
+        **kwargs,
+    ) -> None:
+        if isinstance(destinations, str):
+            destinations = [destinations]
+
+        if not destinations:
+            raise ValueError("At least one destination is required.")
+
+        metrics = metrics or default_registry
+        self._destinations = [
+            _Destination(address, retry_delay=retry_delay, metrics=metrics)
+            for address in destinations
+        ]
+
+        super().__init__(retry_delay=retry_delay, metrics=metrics, **kwargs)
+
+    @property
+    def path(self) -> str:
+        return ", ".join(d.address for d in self._destinations)
+
+    def _encode(self, packet: Packet) -> bytes:
+        return packet.data
+
+    def _open(self) -> None:
+        # Destinations connect on their own, so a failing one doesn't affect the others.
+        pass
+
+    def _write(self, records: list[bytes]) -> None:
+        for destination in self._destinations:
+            destination.send(records)
+
+    def _close(self) -> None:
+        for destination in self._destinations:
+            destination.close()
+
+
+class _Destination:
+    """Connected UDP socket to a destination, with its counters."""
+    def __init__(self, address: str, retry_delay: float, metrics: MetricsRegistry) -> None:
+        self.address = address
+        self._host, self._port = parse_address(address)
+        self._retry_delay = retry_delay
+        self._socket = None
+        self._failed_at = None
+        self._sent = metrics.counter("udp_forward_sent_total", destination=address)
+        self._failed = metrics.counter("udp_forward_failed_total", destination=address)
+
+    def send(self, datagrams: list[bytes]) -> None:
+        if self._socket is None:
+            now = time.monotonic()
+            if self._failed_at is not None and now - self._failed_at < self._retry_delay:
+                self._failed.inc(len(datagrams))
+                return
+
+            try:
+                self._connect()
+            except OSError as e:
+                self._fail(e, len(datagrams))
+                return
+
+        sent = 0
+        for i, datagram in enumerate(datagrams):
+            try:
+                self._socket.send(datagram)
+            except OSError as e:
+                if e.errno == errno.EMSGSIZE:
+                    logger.debug(f"Datagram of {len(datagram)} B too large for {self.address}.")
+                    self._failed.inc()
+                    continue
+
+                self._sent.inc(sent)
+                self._fail(e, len(datagrams) - i)
+                self.close()
+                return
+
+            sent += 1
+
+        self._sent.inc(sent)
+        self._failed_at = None
+
+    def close(self) -> None:
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def _connect(self) -> None:
+        family, kind, proto, _, address = socket.getaddrinfo(
+            self._host, self._port, type=socket.SOCK_DGRAM
+        )[0]
+
+        sock = socket.socket(family, kind, proto)
+        try:
+            sock.connect(address)
+        except OSError:
+            sock.close()
+            raise
+
+        self._socket = sock
+
+    def _fail(self, error: OSError, count: int) -> None:
+        if self._failed_at is None:
+            logger.warning(f"Failed to forward to {self.address}: {error!r}. Retrying.")
+
+        self._failed_at = time.monotonic()
+        self._failed.inc(count)
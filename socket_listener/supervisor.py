@@ -0,0 +1,133 @@
+"""Event-driven handling of sink errors.
+
+Request handlers report errors to a Supervisor as they happen. When the error budget
+is exhausted, the supervisor thread is notified immediately and shuts down the server,
+instead of polling the errors periodically. While idle, the supervisor thread never wakes up.
+"""
+import time
+import logging
+import threading
+from collections import deque
+from typing import Callable, Dict, Type
+
+from socket_listener.metrics import MetricsRegistry, registry as default_registry
+
+logger = logging.getLogger(__name__)
+
+
+class Health:
+    HEALTHY = "healthy"
+    DEGRADED = "degraded"
+    FAILED = "failed"
+
+    ALL = frozenset([HEALTHY, DEGRADED, FAILED])
+
+
+class Supervisor:
+    """Shuts down the server as soon as sink errors exceed an error budget.
+
+    Args:
+        shutdown_server:
+            Function to shutdown the server. Called from the supervisor thread,
+            so it can wait for request handlers to finish.
+
+        error_budget:
+            Number of errors tolerated within error_window seconds.
+            Defaults to 0: the first error shuts down the server.
+
+        error_window:
+            Length in seconds of the sliding window in which errors are counted.
+
+        metrics:
+            Registry where the number of reported errors is counted.
+
+        clock:
+            Function returning monotonic time in seconds.
+    """
+    def __init__(
+        self,
+        shutdown_server: Callable[[], None],
+        error_budget: int = 0,
+        error_window: float = 60,
+        metrics: MetricsRegistry = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if error_budget < 0:
+            raise ValueError(f"Invalid error budget: {error_budget}. Must be >= 0.")
+
+        self.exceptions: Dict[Type[BaseException], BaseException] = {}
+
+        self._shutdown_server = shutdown_server
+        self._error_budget = error_budget
+        self._error_window = error_window
+        self._clock = clock
+        self._errors_total = (metrics or default_registry).counter("supervisor_errors_total")
+
+        self._errors = deque()
+        self._condition = threading.Condition()
+        self._failed = threading.Event()
+        self._stopped = False
+        self._thread = None
+
+    @property
+    def failed(self) -> bool:
+        """Returns whether the error budget was exhausted. Cheap to check in the hot path."""
+        return self._failed.is_set()
+
+    @property
+    def health(self) -> str:
+        """Returns the health state: failed, degraded (recent errors) or healthy."""
+        if self.failed:
+            return Health.FAILED
+
+        with self._condition:
+            self._expire(self._clock())
+            return Health.DEGRADED if self._errors else Health.HEALTHY
+
+    def report(self, error: BaseException) -> None:
+        """Registers an error. May be called concurrently from request handlers."""
+        self._errors_total.inc()
+        with self._condition:
+            self.exceptions[type(error)] = error
+            now = self._clock()
+            self._errors.append(now)
+            self._expire(now)
+
+            if len(self._errors) > self._error_budget and not self.failed:
+                logger.error(
+                    f"{len(self._errors)} error(s) in the last {self._error_window} seconds "
+                    f"exceeded the error budget ({self._error_budget}). Last error: {error!r}.")
+                self._failed.set()
+                self._condition.notify_all()
+
+    def wait(self, timeout: float = None) -> bool:
+        """Waits until the error budget is exhausted.
+
+        Returns:
+            True if the error budget was exhausted, False if timeout expired.
+        """
+        return self._failed.wait(timeout)
+
+    def start(self) -> None:
+        """Starts the supervisor thread."""
+        self._thread = threading.Thread(target=self._run, name="supervisor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops the supervisor thread without shutting down the server."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+    def _run(self) -> None:
+        with self._condition:
+            self._condition.wait_for(lambda: self._stopped or self.failed)
+            if not self.failed:
+                return
+
+        logger.error("Shutting down server...")
+        self._shutdown_server()
+
+    def _expire(self, now: float) -> None:
+        while self._errors and now - self._errors[0] > self._error_window:
+            self._errors.popleft()
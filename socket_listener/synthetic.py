@@ -0,0 +1,265 @@
+"""Synthetic AIS traffic generator.
+
+Generates valid NMEA AIS sentences (6-bit armored payloads and checksums) without reading files.
+Sentences are precomputed once per vessel of a fictitious fleet:
+    - Single-part position reports (message type 1).
+    - Two-part static and voyage related data (message type 5).
+
+When tagblocks are enabled, they are computed at most once per second (and per multipart group),
+so messages can be generated at very high rates entirely in memory.
+"""
+import time
+import random
+import functools
+from typing import Callable, Iterator, Sequence
+
+from socket_listener.utils import nmea_checksum
+
+# Maximum amount of payload characters in a single sentence.
+MAX_PAYLOAD_CHARS = 60
+
+CHANNELS = ("A", "B")
+
+_NAMES = ("SYNTHETIC", "SOCKET LISTENER", "NMEA TEST", "LOAD TEST", "FISHING WORLD")
+_DESTINATIONS = ("NOWHERE", "ANYWHERE", "THE HIGH SEAS")
+
+
+def checksum(content: str) -> str:
+    """Returns the NMEA checksum (XOR of all characters) of content as two hex digits."""
+    return f"{nmea_checksum(content.encode('ascii')):02X}"
+
+
+def pack_bits(fields: Sequence[tuple[int, int]]) -> tuple[int, int]:
+    """Packs (value, number of bits) fields into an integer, the first field in the MSBs.
+
+    Negative values are packed in two's complement.
+
+    Returns:
+        A tuple (bits, number of bits).
+    """
+    bits = 0
+    length = 0
+    for value, size in fields:
+        bits = (bits << size) | (value & ((1 << size) - 1))
+        length += size
+
+    return bits, length
+
+
+def encode_text(text: str, chars: int) -> tuple[int, int]:
+    """Encodes text with the AIS 6-bit character set, padded with '@' to chars characters."""
+    text = text.upper()[:chars].ljust(chars, "@")
+    return pack_bits([(ord(c) - 64 if ord(c) >= 64 else ord(c), 6) for c in text])
+
+
+def armor(bits: int, length: int) -> tuple[str, int]:
+    """Armors bits into an AIS payload of 6-bit ASCII characters.
+
+    Returns:
+        A tuple (payload, number of fill bits).
+    """
+    fill = -length % 6
+    bits <<= fill
+    chars = []
+    for shift in range(length + fill - 6, -1, -6):
+        value = (bits >> shift) & 0x3F
+        chars.append(chr(value + 48 if value < 40 else value + 56))
+
+    return "".join(chars), fill
+
+
+def dearmor(payload: str, fill: int = 0) -> tuple[int, int]:
+    """Inverse of armor.
+
+    Returns:
+        A tuple (bits, number of bits).
+    """
+    bits = 0
+    for char in payload:
+        value = ord(char) - 48
+        bits = (bits << 6) | (value - 8 if value > 40 else value)
+
+    return bits >> fill, len(payload) * 6 - fill
+
+
+def sentences(
+    payload: str, fill: int, seq_id: str = "", channel: str = "A", talker: str = "AIVDM"
+) -> list[str]:
+    """Splits an armored payload into as many sentences as needed, with checksums."""
+    parts = [
+        payload[i:i + MAX_PAYLOAD_CHARS] for i in range(0, len(payload), MAX_PAYLOAD_CHARS)
+    ] or [""]
+
+    total = len(parts)
+    result = []
+    for number, part in enumerate(parts, 1):
+        part_fill = fill if number == total else 0
+        content = f"{talker},{total},{number},{seq_id},{channel},{part},{part_fill}"
+        result.append(f"!{content}*{checksum(content)}")
+
+    return result
+
+
+def tagblock(content: str) -> str:
+    """Returns a tagblock with the given content, e.g., 's:source,c:1700000000'."""
+    return f"\\{content}*{checksum(content)}\\"
+
+
+class SyntheticAIS:
+    """Infinite stream of synthetic AIS messages.
+
+    Args:
+        fleet_size:
+            Number of distinct vessels (and precomputed messages).
+
+        multipart_ratio:
+            Fraction of messages that are multipart (static data), between 0 and 1.
+
+        tagblocks:
+            If True, sentences are prefixed with tagblocks including source and timestamp.
+
+        source:
+            Source to use in tagblocks.
+
+        seed:
+            Seed for the random generation of the fleet.
+
+        clock:
+            Function returning the current time in seconds, used in tagblocks.
+    """
+    def __init__(
+        self,
+        fleet_size: int = 1000,
+        multipart_ratio: float = 0.1,
+        tagblocks: bool = False,
+        source: str = "synthetic",
+        seed: int = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if fleet_size < 1:
+            raise ValueError(f"Invalid fleet size: {fleet_size}. Must be >= 1.")
+
+        if not 0 <= multipart_ratio <= 1:
+            raise ValueError(f"Invalid multipart ratio: {multipart_ratio}. Must be in [0, 1].")
+
+        self._fleet_size = fleet_size
+        self._multipart_ratio = multipart_ratio
+        self._tagblocks = tagblocks
+        self._source = source
+        self._clock = clock
+        self._rng = random.Random(seed)
+
+    @functools.cached_property
+    def templates(self) -> list[list[str]]:
+        """Returns the precomputed messages (lists of sentences) without tagblocks."""
+        multipart = round(self._fleet_size * self._multipart_ratio)
+        kinds = [True] * multipart + [False] * (self._fleet_size - multipart)
+        self._rng.shuffle(kinds)
+
+        templates = []
+        for i, is_multipart in enumerate(kinds):
+            mmsi = self._rng.randint(201000000, 775999999)
+            channel = CHANNELS[i % 2]
+
+            if is_multipart:
+                bits, length = self._static_data(mmsi)
+                seq_id = str(i % 10)
+            else:
+                bits, length = self._position_report(mmsi)
+                seq_id = ""
+
+            payload, fill = armor(bits, length)
+            templates.append(sentences(payload, fill, seq_id=seq_id, channel=channel))
+
+        return templates
+
+    def messages(self) -> Iterator[list[str]]:
+        """Yields messages (lists of sentences) forever."""
+        templates = self.templates
+        if not self._tagblocks:
+            while True:
+                yield from templates
+
+        current_second = None
+        source = f"s:{self._source}"
+        while True:
+            for group, message in enumerate(templates, 1):
+                second = int(self._clock())
+                if second != current_second:
+                    current_second = second
+                    single = tagblock(f"{source},c:{second}")
+
+                if len(message) == 1:
+                    yield [single + message[0]]
+                    continue
+
+                total = len(message)
+                first = tagblock(f"g:1-{total}-{group},{source},c:{second}")
+                rest = [
+                    tagblock(f"g:{part}-{total}-{group}") + sentence
+                    for part, sentence in enumerate(message[1:], 2)
+                ]
+                yield [first + message[0], *rest]
+
+    def lines(self, limit: int = None) -> Iterator[str]:
+        """Yields sentences. Parts of a multipart message are consecutive.
+
+        Args:
+            limit:
+                Maximum number of sentences. Multipart messages are never cut,
+                so fewer sentences may be yielded. If None, yields sentences forever.
+        """
+        count = 0
+        for message in self.messages():
+            count += len(message)
+            if limit is not None and count > limit:
+                return
+
+            yield from message
+
+    def _position_report(self, mmsi: int) -> tuple[int, int]:
+        rng = self._rng
+        return pack_bits([
+            (1, 6),                                       # message type
+            (0, 2),                                       # repeat indicator
+            (mmsi, 30),
+            (rng.choice([0, 7]), 4),                      # navigation status
+            (rng.randint(-126, 126), 8),                  # rate of turn
+            (rng.randint(0, 200), 10),                    # speed over ground (1/10 knot)
+            (1, 1),                                       # position accuracy
+            (rng.randint(-180 * 600000, 180 * 600000), 28),  # longitude (1/10000 min)
+            (rng.randint(-90 * 600000, 90 * 600000), 27),    # latitude (1/10000 min)
+            (rng.randint(0, 3599), 12),                   # course over ground (1/10 degree)
+            (rng.randint(0, 359), 9),                     # true heading
+            (rng.randint(0, 59), 6),                      # timestamp (second)
+            (0, 2),                                       # maneuver indicator
+            (0, 3),                                       # spare
+            (0, 1),                                       # RAIM
+            (rng.getrandbits(19), 19),                    # radio status
+        ])
+
+    def _static_data(self, mmsi: int) -> tuple[int, int]:
+        rng = self._rng
+        return pack_bits([
+            (5, 6),                                       # message type
+            (0, 2),                                       # repeat indicator
+            (mmsi, 30),
+            (0, 2),                                       # AIS version
+            (rng.randint(1000000, 9999999), 30),          # IMO number
+            encode_text(f"SL{rng.randint(0, 99999)}", 7),  # call sign
+            encode_text(rng.choice(_NAMES), 20),          # vessel name
+            (30, 8),                                      # ship type (fishing)
+            (rng.randint(5, 100), 9),                     # dimension to bow
+            (rng.randint(5, 100), 9),                     # dimension to stern
+            (rng.randint(1, 20), 6),                      # dimension to port
+            (rng.randint(1, 20), 6),                      # dimension to starboard
+            (1, 4),                                       # position fix type (GPS)
+            (rng.randint(1, 12), 4),                      # ETA month
+            (rng.randint(1, 28), 5),                      # ETA day
+            (rng.randint(0, 23), 5),                      # ETA hour
+            (rng.randint(0, 59), 6),                      # ETA minute
+            (rng.randint(10, 100), 8),                    # draught (1/10 m)
+            encode_text(rng.choice(_DESTINATIONS), 20),   # destination
+            (0, 1),                                       # DTE
+            (0, 1),                                       # spare
+        ])
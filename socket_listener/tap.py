@@ -0,0 +1,295 @@
+"""Sampled live view of incoming packets, to see the traffic without DEBUG logging.
+
+A PacketTap mirrors a sample of the received packets to one or more outputs:
+    - file:<path>: a log file, with a line per message.
+    - memory[:<capacity>]: a ring of the most recent sampled packets,
+      served by the health server in GET /tap.
+    - udp:<host>:<port>: a local UDP port, one datagram per sampled packet.
+
+Packets are sampled either 1-in-N, or at most N per second per provider.
+The tap can be enabled, disabled and resampled at runtime, with POST /tap to the health server
+or SIGUSR2 (which toggles it). While disabled, request handlers only check a boolean.
+"""
+import time
+import socket
+import logging
+import itertools
+import threading
+import collections
+from abc import ABC, abstractmethod
+from typing import Callable, Sequence
+
+from socket_listener.metrics import MetricsRegistry, registry as default_registry
+from socket_listener.packet import Packet
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EVERY = 1000
+DEFAULT_CAPACITY = 100
+
+
+class TapOutput(ABC):
+    """Destination of sampled packets. Written from request handler threads."""
+    name = None
+
+    @abstractmethod
+    def write(self, packet: Packet) -> None:
+        """Writes a sampled packet."""
+
+    def close(self) -> None:
+        """Releases the resources of the output."""
+
+
+class FileOutput(TapOutput):
+    """Appends a line per message of the sampled packets to a file.
+
+    Args:
+        path:
+            Path of the file.
+    """
+    name = "file"
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, "a", buffering=1)
+        self._lock = threading.Lock()
+
+    def write(self, packet: Packet) -> None:
+        source = f"{packet.source_host}:{packet.source_port}"
+        prefix = f"{packet.time.isoformat()} {packet.source_name} {source}"
+        lines = "".join(f"{prefix} {m.decode(errors='replace')}\n" for m in packet.messages)
+        with self._lock:
+            # Handlers may still be running when the tap is closed.
+            if not self._file.closed:
+                self._file.write(lines)
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class MemoryOutput(TapOutput):
+    """Keeps the most recent sampled packets in memory.
+
+    Args:
+        capacity:
+            Number of packets to keep.
+    """
+    name = "memory"
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        if capacity < 1:
+            raise ValueError(f"Invalid capacity: {capacity}. Must be >= 1.")
+
+        self._packets = collections.deque(maxlen=capacity)
+
+    def write(self, packet: Packet) -> None:
+        # Appending to a bounded deque is atomic, so no lock is needed.
+        self._packets.append(packet)
+
+    def recent(self) -> list[dict]:
+        """Returns the kept packets, oldest first, as JSON-serializable dictionaries."""
+        return [
+            dict(
+                packet.metadata,
+                source_port=packet.source_port,
+                messages=[m.decode(errors="replace") for m in packet.messages],
+            )
+            for packet in list(self._packets)
+        ]
+
+
+class UdpOutput(TapOutput):
+    """Sends the data of each sampled packet as a datagram to a local port.
+
+    Args:
+        address:
+            Tuple (host, port) to send to.
+    """
+    name = "udp"
+
+    def __init__(self, address: tuple[str, int]) -> None:
+        self.address = address
+        family, kind, proto, _, sockaddr = socket.getaddrinfo(*address, type=socket.SOCK_DGRAM)[0]
+        self._socket = socket.socket(family, kind, proto)
+        self._socket.setblocking(False)
+        self._socket.connect(sockaddr)
+
+    def write(self, packet: Packet) -> None:
+        try:
+            self._socket.send(packet.data)
+        except OSError as e:
+            # Nobody listening, or the socket buffer is full. The sample is lost.
+            logger.debug(f"Tapped packet not sent to {self.address}: {e!r}.")
+
+    def close(self) -> None:
+        self._socket.close()
+
+
+def create_output(spec: str) -> TapOutput:
+    """Creates a tap output from its specification.
+
+    Args:
+        spec:
+            One of 'file:<path>', 'memory[:<capacity>]' or 'udp:<host>:<port>'.
+            A spec without a known prefix is taken as the path of a file.
+    """
+    kind, _, value = spec.partition(":")
+    if kind == MemoryOutput.name:
+        return MemoryOutput(int(value) if value else DEFAULT_CAPACITY)
+
+    if kind == UdpOutput.name:
+        # Imported here to avoid loading the sinks package with this module.
+        from socket_listener.sinks.udp import parse_address
+        return UdpOutput(parse_address(value))
+
+    if kind == FileOutput.name:
+        return FileOutput(value)
+
+    return FileOutput(spec)
+
+
+class PacketTap:
+    """Mirrors a sample of packets to outputs.
+
+    Only one of every and rate can be set. If neither is set, 1 in 1000 packets is sampled.
+
+    Args:
+        outputs:
+            Outputs that receive the sampled packets.
+
+        every:
+            Samples 1 in every N packets.
+
+        rate:
+            Samples at most N packets per second per provider.
+
+        enabled:
+            Whether the tap starts enabled.
+
+        metrics:
+            Registry where sampled packets are counted.
+
+        clock:
+            Function returning monotonic time in seconds.
+    """
+    def __init__(
+        self,
+        outputs: Sequence[TapOutput],
+        every: int = None,
+        rate: float = None,
+        enabled: bool = True,
+        metrics: MetricsRegistry = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._outputs = list(outputs)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._sampled = (metrics or default_registry).counter("tap_sampled_total")
+        # Replaced as a whole, so request handlers never see a mix of old and new values.
+        self._sampling = (None, None)
+        self.enabled = False
+
+        self.configure(enabled=enabled, every=every, rate=rate)
+
+    @property
+    def every(self) -> int:
+        return self._sampling[0]
+
+    @property
+    def rate(self) -> float:
+        return self._sampling[1]
+
+    @property
+    def outputs(self) -> list[TapOutput]:
+        return self._outputs
+
+    @property
+    def state(self) -> dict:
+        """Returns the current configuration, as a JSON-serializable dictionary."""
+        return dict(
+            enabled=self.enabled,
+            every=self.every,
+            rate=self.rate,
+            outputs=[output.name for output in self._outputs],
+        )
+
+    def recent(self) -> list[dict]:
+        """Returns the packets kept by memory outputs."""
+        packets = []
+        for output in self._outputs:
+            if isinstance(output, MemoryOutput):
+                packets.extend(output.recent())
+
+        return packets
+
+    def configure(self, enabled: bool = None, every: int = None, rate: float = None) -> None:
+        """Changes the tap at runtime. Arguments that are None are left unchanged.
+
+        Setting every replaces rate and vice versa.
+
+        Raises:
+            ValueError: if every or rate are invalid, or both are passed.
+        """
+        if every is not None and rate is not None:
+            raise ValueError("Only one of every and rate can be set.")
+
+        if every is not None and every < 1:
+            raise ValueError(f"Invalid every: {every}. Must be >= 1.")
+
+        if rate is not None and rate <= 0:
+            raise ValueError(f"Invalid rate: {rate}. Must be > 0.")
+
+        with self._lock:
+            self._count = itertools.count()
+            self._buckets = {}
+            if every is not None or rate is not None:
+                self._sampling = (every, rate)
+            elif self._sampling == (None, None):
+                self._sampling = (DEFAULT_EVERY, None)
+
+            if enabled is not None:
+                self.enabled = enabled
+
+        logger.info(f"Packet tap {'enabled' if self.enabled else 'disabled'}: {self._describe()}.")
+
+    def toggle(self) -> None:
+        """Enables the tap if disabled, and vice versa."""
+        self.configure(enabled=not self.enabled)
+
+    def offer(self, packet: Packet) -> None:
+        """Writes the packet to the outputs if it is sampled."""
+        if not self.enabled or not self._sample(packet):
+            return
+
+        self._sampled.inc()
+        for output in self._outputs:
+            output.write(packet)
+
+    def close(self) -> None:
+        self.enabled = False
+        for output in self._outputs:
+            output.close()
+
+    def _sample(self, packet: Packet) -> bool:
+        every, rate = self._sampling
+        if rate is None:
+            # Incrementing an itertools.count is atomic in CPython.
+            return next(self._count) % every == 0
+
+        # Token bucket per provider, holding up to a second of samples
+        # (or a single one, so rates below 1/s can reach a whole token).
+        capacity = max(rate, 1)
+        now = self._clock()
+        with self._lock:
+            tokens, last = self._buckets.get(packet.source_name, (capacity, now))
+            tokens = min(tokens + (now - last) * rate, capacity)
+            sampled = tokens >= 1
+            self._buckets[packet.source_name] = (tokens - 1 if sampled else tokens, now)
+
+        return sampled
+
+    def _describe(self) -> str:
+        sampling = f"1 in {self.every}" if self.rate is None else f"{self.rate}/s per provider"
+        outputs = ", ".join(output.name for output in self._outputs) or "no outputs"
+        return f"{sampling} to {outputs}"
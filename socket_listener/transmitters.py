@@ -5,48 +5,61 @@ import math
 import gzip
 import socket
 import atexit
+import random
 import signal
 import logging
 import threading
+import multiprocessing
 
 from pathlib import Path
 from typing import Generator, Iterable, Any, Union, Callable
 from abc import ABC, abstractmethod
-from functools import cached_property
+from functools import cached_property, lru_cache, partial
 from itertools import islice
 
-from rich.progress import track
-from rich.console import Console
-
 from gfw.common.iterables import chunked_it
 
-from .utils import chunked_nmea_it
+from .capture import CaptureReader, list_segments
+from .synthetic import SyntheticAIS
+from .utils import (
+    DEFAULT_DATAGRAM_SIZE,
+    chunked_bytes_it,
+    chunked_nmea_bytes_it,
+    chunked_nmea_it,
+)
+
 
-console = Console()
+@lru_cache(maxsize=None)
+def console():
+    """Returns the rich console. Created on first use, so rich is not imported until needed."""
+    from rich.console import Console
+    return Console()
 
 
 def _cleanup_terminal():
     """Restore terminal state (show cursor and newline)."""
-    console.show_cursor(True)
-    console.print()  # Forces newline in case progress bar was interrupted
+    console().show_cursor(True)
+    console().print()  # Forces newline in case progress bar was interrupted
 
 
 def _handle_sigint(sig, frame):
     """Handle Ctrl+C cleanly and exit."""
-    console.print("[red]Interrupted by user (Ctrl+C)[/red]")
+    console().print("[red]Interrupted by user (Ctrl+C)[/red]")
     sys.exit(130)
 
 
+@lru_cache(maxsize=None)
 def setup_rich_cleanup():
-    """Call this once at the start of your script to ensure terminal is cleaned up properly."""
+    """Call this once at the start of your script to ensure terminal is cleaned up properly.
+
+    Must be called from the main thread. Subsequent calls do nothing.
+    """
     atexit.register(_cleanup_terminal)
     signal.signal(signal.SIGINT, _handle_sigint)
 
 
 logger = logging.getLogger(__name__)
 
-setup_rich_cleanup()
-
 
 def open_file(path: Path, mode: str = 'rt', **kwargs: Any):
     """Open a file using gzip.open if it ends with .gz, otherwise use open.
@@ -68,9 +81,42 @@ def open_file(path: Path, mode: str = 'rt', **kwargs: Any):
     return opener(path, mode, **kwargs)
 
 
+def read_byte_range(path: Path, start: int, end: int) -> Generator[bytes, None, None]:
+    """Yields the lines of a file that start within the range of bytes [start, end).
+
+    Splitting a file into contiguous ranges yields every line exactly once.
+    """
+    with open(path, "rb") as f:
+        position = start
+        if start > 0:
+            # Skip the line that started in the previous range, if any.
+            f.seek(start - 1)
+            position = start - 1 + len(f.readline())
+
+        while position < end:
+            line = f.readline()
+            if not line:
+                break
+
+            position += len(line)
+            yield line
+
+
+def split_byte_ranges(path: Path, n: int) -> list[tuple[int, int]]:
+    """Splits a file into n contiguous ranges of bytes of (roughly) equal size."""
+    size = path.stat().st_size
+    bounds = [size * i // n for i in range(n + 1)]
+    return list(zip(bounds, bounds[1:]))
+
+
 def run(
     path,
     *args,
+    synthetic: bool = False,
+    synthetic_fleet_size: int = 1000,
+    synthetic_multipart_ratio: float = 0.1,
+    synthetic_tagblocks: bool = False,
+    processes: int = 1,
     daemon_thread=False,
     unknown_unparsed_args: list = None,
     unknown_parsed_args: dict = None,
@@ -85,6 +131,21 @@ def run(
         *args:
             Positional arguments for socket transmitter constructor.
 
+        synthetic:
+            If true, sends synthetic AIS messages generated in memory instead of the path.
+
+        synthetic_fleet_size:
+            Number of distinct vessels of the synthetic traffic.
+
+        synthetic_multipart_ratio:
+            Fraction of synthetic messages that are multipart.
+
+        synthetic_tagblocks:
+            If true, synthetic sentences are prefixed with tagblocks.
+
+        processes:
+            Number of processes to shard the transmission across.
+
         daemon_thread:
             If true, makes the thread daemonic.
 
@@ -93,8 +154,27 @@ def run(
     Returns:
         A tuple (transmitter, thread).
     """
+    if threading.current_thread() is threading.main_thread():
+        setup_rich_cleanup()
+
+    synthetic_config = None
+    if synthetic:
+        synthetic_config = dict(
+            fleet_size=synthetic_fleet_size,
+            multipart_ratio=synthetic_multipart_ratio,
+            tagblocks=synthetic_tagblocks,
+        )
+
     try:
-        transmitter = create(*args, **kwargs)
+        if processes > 1:
+            transmitter = MultiProcessTransmitter(
+                processes, *args, synthetic_config=synthetic_config, **kwargs
+            )
+        else:
+            if synthetic_config is not None:
+                kwargs["synthetic"] = SyntheticAIS(**synthetic_config)
+
+            transmitter = create(*args, **kwargs)
     except NotImplementedError as e:
         logger.error(e)
         return
@@ -120,8 +200,13 @@ def create(protocol="UDP", **kwargs):
 _SPLITTERS = {
     "fixed": chunked_it,
     "nmea": chunked_nmea_it,
+    "bytes": chunked_bytes_it,
+    "nmea-bytes": chunked_nmea_bytes_it,
 }
 
+# Splitters that fill each datagram up to a number of bytes.
+_BYTES_SPLITTERS = frozenset(["bytes", "nmea-bytes"])
+
 Splitter = Callable[[Iterable, int], Iterable]
 
 
@@ -148,6 +233,46 @@ class SocketTransmitter(ABC):
             Function to use when splitting file into chunks. One of:
             - "fixed": Splits into chunks of fixed size.
             - "nmea": Splits into fixed-size chunks without breaking multipart NMEA messages.
+            - "bytes": Fills each datagram with up to datagram_size bytes
+              (and up to chunk_size messages).
+            - "nmea-bytes": Like "bytes", without breaking multipart NMEA messages.
+
+        datagram_size:
+            With "bytes" and "nmea-bytes" splitters, max size in bytes of each datagram.
+            By default, the largest UDP payload that is not fragmented over Ethernet.
+
+        capture:
+            If True, the path points to capture files recorded by the receiver.
+            Datagrams are replayed with their original boundaries and inter-arrival timing.
+
+        speed:
+            With capture, factor applied to the original timing, e.g., 2 replays twice as fast.
+            If 0, datagrams are sent as fast as possible.
+
+        synthetic:
+            If passed, messages are taken from this generator instead of the path.
+            Transmission stops after first_n messages, or when shut down.
+
+        rate:
+            Target number of messages per second, instead of delay.
+            With synthetic, if None, messages are sent as fast as possible.
+
+        byte_range:
+            If passed, a tuple (start, end) with the range of bytes of the file to send.
+            Lines are assigned to the range in which they start. Not supported for gzip files.
+
+        sent_counter:
+            multiprocessing.Value incremented with the number of sent messages.
+            Used to aggregate counts and to keep the rate target across processes.
+
+        replay_origin:
+            With capture, a tuple (time_ns, start): the record with time_ns is sent
+            at the time.time() start, and the rest relative to it.
+            Used to keep the original timing across processes.
+            By default, the first replayed record is sent immediately.
+
+        progress:
+            If False, progress bars are not shown.
     """
     def __init__(
         self,
@@ -156,21 +281,60 @@ class SocketTransmitter(ABC):
         delay: float = 1,
         chunk_size: int = 50,
         first_n: int = None,
-        splitter: Union[str, Splitter] = chunked_it
+        splitter: Union[str, Splitter] = chunked_it,
+        datagram_size: int = DEFAULT_DATAGRAM_SIZE,
+        capture: bool = False,
+        speed: float = 1,
+        synthetic: SyntheticAIS = None,
+        rate: float = None,
+        byte_range: tuple[int, int] = None,
+        sent_counter: Any = None,
+        replay_origin: tuple[int, float] = None,
+        progress: bool = True,
     ):
+        if speed < 0:
+            raise ValueError(f"Invalid speed: {speed}. Must be >= 0.")
+
+        if datagram_size <= 0:
+            raise ValueError(f"Invalid datagram_size: {datagram_size}. Must be > 0.")
+
         self._host = host
         self._port = port
         self._delay = delay
         self._chunk_size = chunk_size
         self._first_n = first_n
+        self._datagram_size = datagram_size
+        self._packs_bytes = isinstance(splitter, str) and splitter.lower() in _BYTES_SPLITTERS
         self._splitter = self._resolve_splitter(splitter)
+        self._capture = capture
+        self._speed = speed
+        self._synthetic = synthetic
+        self._rate = rate
+        self._byte_range = byte_range
+        self._sent_counter = sent_counter
+        self._progress = progress
 
         self.__shutdown_request = False
+        self._replay_origin = None
+        if replay_origin is not None:
+            # time.time() is shared across processes, perf_counter() is used to sleep.
+            first_ns, start = replay_origin
+            self._replay_origin = (first_ns, time.perf_counter() + start - time.time())
+
+        self._start_time = None
+        self.sent = 0
 
     @abstractmethod
     def _send_messages(self):
         raise NotImplementedError
 
+    @abstractmethod
+    def _send_datagram(self, data: bytes):
+        raise NotImplementedError
+
+    def _close(self):
+        """Releases resources used while sending. Called once transmission finishes."""
+
     @cached_property
     def address(self):
         """Unified string version of the host and port properties."""
@@ -186,6 +350,17 @@ class SocketTransmitter(ABC):
         Args:
             path: Path to the file or folder containing the data to be sent.
         """
+        if self._start_time is None:
+            self._start_time = time.perf_counter()
+
+        if self._synthetic is not None:
+            self._send_synthetic()
+            return
+
+        if self._capture:
+            self._replay(path)
+            return
+
         logger.info(f"Reading messages from {path}.")
         logger.info(
             "Sending chunks of {} messages using '{}' protocol to {} every {} seconds".format(
@@ -206,38 +381,161 @@ class SocketTransmitter(ABC):
                 continue
 
             self._process_file(p, i, len(paths))
+            if self.__shutdown_request or self._remaining() == 0:
+                break
 
     def _process_file(self, path, i, n):
-        messages = islice(self._read_messages(path), 0, self._first_n)
+        messages = islice(self._read_messages(path), 0, self._remaining())
         chunks = self._splitter(messages, self._chunk_size)
 
-        total = math.ceil(self._get_file_line_count(path) / self._chunk_size)
-        description = "Processing {i}/{n}:"
-        for chunk in track(chunks, total=total, description=description.format(i=i, n=n)):
+        total = None
+        # The number of datagrams filled up to a size is not known in advance.
+        if not self._packs_bytes:
+            total = math.ceil(self._get_file_line_count(path) / self._chunk_size)
+
+        description = "Processing {i}/{n}:".format(i=i, n=n)
+        for chunk in self._track(chunks, total=total, description=description):
+            chunk = list(chunk)
             self._send_messages(chunk)
+            self._pace(len(chunk))
+            if not self._rate:
+                time.sleep(self._delay)
+
             if self.__shutdown_request:
                 break
 
+    def _send_synthetic(self):
+        logger.info(
+            f"Sending synthetic messages in chunks of {self._chunk_size} "
+            f"using '{self.name}' protocol to {self.address} "
+            f"at {self._rate or 'max'} messages/s.")
+
+        lines = self._synthetic.lines(limit=self._first_n)
+        chunks = self._splitter(lines, self._chunk_size)
+
+        total = None
+        if self._first_n is not None and not self._packs_bytes:
+            total = math.ceil(self._first_n / self._chunk_size)
+
+        try:
+            for chunk in self._track(chunks, total=total, description="Sending synthetic:"):
+                chunk = list(chunk)
+                self._send_datagram("\n".join(chunk).encode("utf-8"))
+                self._pace(len(chunk))
+
+                if self.__shutdown_request:
+                    break
+        finally:
+            self._close()
+
+        elapsed = time.perf_counter() - self._start_time
+        logger.info(
+            f"Sent {self.sent} messages in {elapsed:.2f} seconds "
+            f"({self.sent / max(elapsed, 1e-9):.0f} messages/s).")
+
+    def _replay(self, path):
+        logger.info(f"Replaying captures from {path}.")
+        logger.info(
+            f"Sending datagrams using '{self.name}' protocol to {self.address} "
+            f"at {self._speed or 'max'} speed.")
+
+        paths = list_segments(path)
+        try:
+            for i, p in enumerate(paths, 1):
+                self._replay_file(p, i, len(paths))
+                if self.__shutdown_request or self._remaining() == 0:
+                    break
+        finally:
+            self._close()
+
+    def _replay_file(self, path, i, n):
+        with CaptureReader(path) as reader:
+            description = f"Replaying {i}/{n}:"
+            records = islice(reader, 0, self._remaining())
+            for record in self._track(records, description=description):
+                self._wait_for(record.time_ns)
+                self._send_datagram(record.data)
+                self._pace(1)
+                if self.__shutdown_request:
+                    break
+
+    def _remaining(self) -> int:
+        """Returns the number of messages left to reach first_n, across files and segments.
+
+        Returns None if first_n was not passed.
+        """
+        if self._first_n is None:
+            return None
+
+        return max(self._first_n - self.sent, 0)
+
+    def _wait_for(self, time_ns: int):
+        """Sleeps until the (scaled) offset of time_ns from the first replayed datagram."""
+        if not self._speed:
+            return
+
+        if self._replay_origin is None:
+            self._replay_origin = (time_ns, time.perf_counter())
+
+        first_ns, start = self._replay_origin
+        self._sleep_until(start + (time_ns - first_ns) / 1e9 / self._speed)
+
+    def _pace(self, n: int):
+        """Registers n sent messages and sleeps as needed to keep the target rate."""
+        self.sent += n
+        total = self.sent
+
+        if self._sent_counter is not None:
+            with self._sent_counter.get_lock():
+                self._sent_counter.value += n
+                total = self._sent_counter.value
+
+        if self._rate:
+            self._sleep_until(self._start_time + total / self._rate)
+
+    def _track(self, sequence: Iterable, **kwargs: Any) -> Iterable:
+        if not self._progress:
+            return sequence
+
+        from rich.progress import track
+        return track(sequence, console=console(), **kwargs)
+
+    @staticmethod
+    def _sleep_until(target: float):
+        """Sleeps until time.perf_counter() reaches target, if it is in the future."""
+        remaining = target - time.perf_counter()
+        if remaining > 0:
+            time.sleep(remaining)
+
     def _get_file_line_count(self, path) -> Generator:
         count = 0
-        with open_file(path, "rt") as f:
-            for line in f:
-                count += 1
+        for line in self._read_messages(path):
+            count += 1
 
         return count
 
     def _read_messages(self, path) -> Generator:
+        if self._byte_range is not None:
+            for line in read_byte_range(path, *self._byte_range):
+                yield line.decode("utf-8").strip()
+
+            return
+
         with open_file(path, "rt") as f:
             for line in f:
                 yield line.strip()
 
     def _resolve_splitter(self, splitter: Union[str, Splitter]) -> Splitter:
         if isinstance(splitter, str):
-            try:
-                return _SPLITTERS[splitter.lower()]
-            except KeyError:
+            name = splitter.lower()
+            if name not in _SPLITTERS:
                 raise ValueError(f"Unknown splitter: {splitter}")
 
+            if name in _BYTES_SPLITTERS:
+                return partial(_SPLITTERS[name], max_bytes=self._datagram_size)
+
+            return _SPLITTERS[name]
+
         return splitter
 
 
@@ -256,4 +554,177 @@ class UDPSocketTransmitter(SocketTransmitter):
         sock.close()
 
         logger.debug(f"Data sent: {data}")
-        time.sleep(self._delay)
+
+    @cached_property
+    def _socket(self):
+        return socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def _send_datagram(self, data: bytes):
+        self._socket.sendto(data, (self._host, self._port))
+
+    def _close(self):
+        if "_socket" in self.__dict__:
+            self._socket.close()
+            del self._socket
+
+
+class MultiProcessTransmitter:
+    """Shards transmission across worker processes, to exceed single-core send rates.
+
+    The input is sharded as follows:
+        - synthetic: each process generates its own fleet.
+        - capture: segments are distributed round-robin.
+        - folder: files are distributed round-robin.
+        - file: split into contiguous byte ranges (gzip files can't be split).
+
+    first_n is split evenly across processes. The rate target is global:
+    processes share a counter of sent messages, against which each one paces its sending.
+    Captures keep their original timing: all processes replay relative to the first record
+    of the first segment, sent when the processes are started.
+
+    Args:
+        processes:
+            Number of worker processes.
+
+        *args:
+            Positional arguments for the socket transmitter of each process.
+
+        synthetic_config:
+            Keyword arguments for SyntheticAIS. If passed, sends synthetic messages.
+
+        monitor_delay:
+            Seconds between each log entry with the aggregated number of sent messages.
+
+        **kwargs:
+            Keyword arguments for the socket transmitter of each process.
+    """
+    def __init__(
+        self,
+        processes: int = 2,
+        *args: Any,
+        synthetic_config: dict = None,
+        monitor_delay: float = 1,
+        **kwargs: Any,
+    ) -> None:
+        if processes < 1:
+            raise ValueError(f"Invalid number of processes: {processes}. Must be >= 1.")
+
+        # Fail early with invalid arguments, before starting any process.
+        create(*args, **kwargs)
+
+        self._processes = processes
+        self._args = args
+        self._synthetic_config = synthetic_config
+        self._monitor_delay = monitor_delay
+        self._kwargs = kwargs
+
+        # Spawn, because forking a process with running threads is not safe.
+        self._context = multiprocessing.get_context("spawn")
+        self._sent = self._context.Value("q", 0)
+        self._stop = self._context.Event()
+
+    @property
+    def sent(self) -> int:
+        """Returns the number of messages sent by all processes."""
+        return self._sent.value
+
+    def shutdown(self):
+        """Terminates all processes."""
+        self._stop.set()
+
+    def start(self, path: str) -> None:
+        """Starts the worker processes and waits for them to finish.
+
+        Args:
+            path: Path to the file or folder containing the data to be sent.
+        """
+        shards = self._shards(path)
+        workers = [
+            self._context.Process(
+                target=_run_worker,
+                args=(self._args, kwargs, paths, self._sent, self._stop),
+                name=f"transmitter-{i}",
+            )
+            for i, (paths, kwargs) in enumerate(shards)
+        ]
+
+        logger.info(f"Starting {len(workers)} transmitter processes...")
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+
+        while any(worker.is_alive() for worker in workers):
+            for worker in workers:
+                worker.join(timeout=self._monitor_delay / len(workers))
+
+            logger.info(f"Sent {self.sent} messages.")
+
+        elapsed = time.perf_counter() - start
+        logger.info(
+            f"Sent {self.sent} messages in {elapsed:.2f} seconds "
+            f"({self.sent / max(elapsed, 1e-9):.0f} messages/s) using {len(workers)} processes.")
+
+        failed = [w.name for w in workers if w.exitcode != 0]
+        if failed:
+            logger.error(f"Transmitter processes failed: {', '.join(failed)}.")
+
+    def _shards(self, path: str) -> list[tuple[list, dict]]:
+        """Returns a list of (paths, kwargs) with the input assigned to each process."""
+        n = self._processes
+
+        if self._synthetic_config is not None:
+            seed = random.randrange(2 ** 32)
+            shards = [
+                ([None], dict(synthetic=SyntheticAIS(**self._synthetic_config, seed=seed + i)))
+                for i in range(n)
+            ]
+        else:
+            path = Path(path)
+            if self._kwargs.get("capture"):
+                paths = list_segments(path)
+            elif path.is_dir():
+                paths = [p for p in sorted(path.iterdir()) if not p.is_dir()]
+            else:
+                paths = [path]
+
+            if len(paths) == 1 and paths[0].suffix != ".gz" and not self._kwargs.get("capture"):
+                shards = [(paths, dict(byte_range=r)) for r in split_byte_ranges(paths[0], n)]
+            else:
+                shards = [(paths[i::n], {}) for i in range(min(n, len(paths)))]
+
+        if len(shards) < n:
+            logger.info(f"Input can only be sharded across {len(shards)} processes.")
+
+        replay_origin = None
+        if self._synthetic_config is None and self._kwargs.get("capture") and paths:
+            with CaptureReader(paths[0]) as reader:
+                first = next(iter(reader), None)
+
+            if first is not None:
+                replay_origin = (first.time_ns, time.time())
+
+        first_n = self._kwargs.get("first_n")
+        for i, (_, kwargs) in enumerate(shards):
+            kwargs.update(self._kwargs)
+            if replay_origin is not None:
+                kwargs["replay_origin"] = replay_origin
+            if first_n is not None:
+                kwargs["first_n"] = first_n // len(shards) + (i < first_n % len(shards))
+
+        return shards
+
+
+def _run_worker(args, kwargs, paths, sent_counter, stop):
+    transmitter = create(*args, **kwargs, sent_counter=sent_counter, progress=False)
+
+    def _watch_stop():
+        stop.wait()
+        transmitter.shutdown()
+
+    threading.Thread(target=_watch_stop, daemon=True).start()
+
+    for path in paths:
+        if stop.is_set():
+            break
+
+        transmitter.start(path)
@@ -19,11 +19,26 @@ NMEA_PREFIXES = (
 # Extract prefix names without the "!" and join with |
 nmea_prefixes_pattern = '|'.join(prefix for prefix in NMEA_PREFIXES)
 
+# Largest UDP payload that is not fragmented over Ethernet: MTU (1500) - IPv4 (20) - UDP (8).
+DEFAULT_DATAGRAM_SIZE = 1472
+
 MULTIPART_REGEX = re.compile(
     rf'^!(?:{nmea_prefixes_pattern}),(?P<total>\d+),(?P<part>\d+),(?P<seq_id>[^,]*),'
 )
 
 
+def nmea_checksum(data: bytes) -> int:
+    """Returns the NMEA checksum of data: the XOR of all its bytes.
+
+    A plain loop over bytes is as fast as lookup tables or XOR of machine words in CPython.
+    """
+    value = 0
+    for byte in data:
+        value ^= byte
+
+    return value
+
+
 def find_nmea_start(line: str) -> int:
     for prefix in NMEA_PREFIXES:
         pos = line.find(f"!{prefix}")
@@ -33,32 +48,19 @@ def find_nmea_start(line: str) -> int:
     return -1
 
 
-def chunked_nmea_it(
-    lines: Iterable[str],
-    max_lines_per_packet: int = 20
-) -> Generator[List[str], None, None]:
-    r"""Splits a stream of NMEA sentences into packets of up to `max_lines_per_packet`
-    without splitting multipart messages.
+def nmea_groups(lines: Iterable[str]) -> Generator[List[str], None, None]:
+    """Groups a stream of NMEA sentences so that multipart messages are kept together.
 
-    This functions expects an input like:
-    ```text
-    \s:rMT7892,t:marinetraffic,c:1749945745*45\!AIVDM,1,1,,A,13m0Nj01C@WPIfR1>5d0phnd00SN,0*44
-    \s:rMT9999,t:marinetraffic,c:1749945745*41\!AIVDM,2,1,2,B,569@?q00000091Ho@00HDUPTtpOF222222222216>@DB45Vh0<0hCiQBA2@C,0*42
-    ```
-
-    So, for single-part sentences we have an empty slot in the tagblock for the .
+    Empty lines are skipped and sentences are stripped.
+    Sentences are buffered until the last part of a multipart message is received.
 
     Args:
         lines:
             An iterable of NMEA sentence strings.
 
-        max_lines_per_packet:
-            Maximum number of sentences per packet.
-
     Yields:
-        Lists of NMEA sentences representing one packet.
+        Lists with the sentences of a single-part or a complete multipart message.
     """
-    packet = []
     buffer = deque()
 
     for line in lines:
@@ -82,15 +84,8 @@ def chunked_nmea_it(
                 continue  # wait for last part
 
             # last part received
-            multipart = list(buffer)
+            yield list(buffer)
             buffer.clear()
-
-            if packet and len(packet) + len(multipart) > max_lines_per_packet:
-                yield packet
-                packet = []
-
-            packet.extend(multipart)
-            continue
         else:
             raise ValueError(f"Line was not matched by regex: {line}")
 
@@ -98,5 +93,135 @@ def chunked_nmea_it(
     if buffer:
         raise ValueError("We have buffer leftover")
 
+
+def pack_groups(
+    groups: Iterable[List[str]],
+    max_lines: int = None,
+    max_bytes: int = None,
+    delimiter: str = "\n",
+) -> Generator[List[str], None, None]:
+    """Packs groups of lines into packets, without splitting any group.
+
+    Groups are added to a packet while it stays within both limits.
+    A group that alone exceeds a limit is sent in a packet of its own.
+
+    Args:
+        groups:
+            An iterable of lists of lines.
+
+        max_lines:
+            Maximum number of lines per packet. Not limited if None.
+
+        max_bytes:
+            Maximum size in bytes of each packet, with lines joined by the delimiter.
+            Not limited if None.
+
+        delimiter:
+            Delimiter between lines in the packet.
+
+    Yields:
+        Lists of lines representing one packet.
+    """
+    delimiter_size = len(delimiter.encode("utf-8"))
+    packet = []
+    packet_bytes = 0
+
+    for group in groups:
+        group_bytes = 0
+        if max_bytes is not None:
+            group_bytes = sum(len(line.encode("utf-8")) + delimiter_size for line in group)
+
+        if packet and (
+            (max_lines is not None and len(packet) + len(group) > max_lines)
+            or (max_bytes is not None and packet_bytes + group_bytes - delimiter_size > max_bytes)
+        ):
+            yield packet
+            packet = []
+            packet_bytes = 0
+
+        packet.extend(group)
+        packet_bytes += group_bytes
+
     if packet:
         yield packet
+
+
+def chunked_nmea_it(
+    lines: Iterable[str],
+    max_lines_per_packet: int = 20
+) -> Generator[List[str], None, None]:
+    r"""Splits a stream of NMEA sentences into packets of up to `max_lines_per_packet`
+    without splitting multipart messages.
+
+    This functions expects an input like:
+    ```text
+    \s:rMT7892,t:marinetraffic,c:1749945745*45\!AIVDM,1,1,,A,13m0Nj01C@WPIfR1>5d0phnd00SN,0*44
+    \s:rMT9999,t:marinetraffic,c:1749945745*41\!AIVDM,2,1,2,B,569@?q00000091Ho@00HDUPTtpOF222222222216>@DB45Vh0<0hCiQBA2@C,0*42
+    ```
+
+    So, for single-part sentences we have an empty slot in the tagblock for the .
+
+    Args:
+        lines:
+            An iterable of NMEA sentence strings.
+
+        max_lines_per_packet:
+            Maximum number of sentences per packet.
+
+    Yields:
+        Lists of NMEA sentences representing one packet.
+    """
+    return pack_groups(nmea_groups(lines), max_lines=max_lines_per_packet)
+
+
+def chunked_bytes_it(
+    lines: Iterable[str],
+    max_lines_per_packet: int = None,
+    max_bytes: int = DEFAULT_DATAGRAM_SIZE,
+) -> Generator[List[str], None, None]:
+    """Splits a stream of lines into packets that fill up to `max_bytes` bytes.
+
+    Args:
+        lines:
+            An iterable of lines.
+
+        max_lines_per_packet:
+            Maximum number of lines per packet. Not limited if None.
+
+        max_bytes:
+            Maximum size in bytes of each packet, with lines joined by newlines.
+            Lines larger than that are sent alone.
+
+    Yields:
+        Lists of lines representing one packet.
+    """
+    return pack_groups(
+        ([line] for line in lines), max_lines=max_lines_per_packet, max_bytes=max_bytes
+    )
+
+
+def chunked_nmea_bytes_it(
+    lines: Iterable[str],
+    max_lines_per_packet: int = None,
+    max_bytes: int = DEFAULT_DATAGRAM_SIZE,
+) -> Generator[List[str], None, None]:
+    """Splits a stream of NMEA sentences into packets that fill up to `max_bytes` bytes,
+    without splitting multipart messages.
+
+    Args:
+        lines:
+            An iterable of NMEA sentence strings.
+
+        max_lines_per_packet:
+            Maximum number of sentences per packet. Not limited if None.
+
+        max_bytes:
+            Maximum size in bytes of each packet, with sentences joined by newlines.
+            Multipart messages larger than that are sent alone.
+
+    Yields:
+        Lists of NMEA sentences representing one packet.
+    """
+    return pack_groups(
+        nmea_groups(lines), max_lines=max_lines_per_packet, max_bytes=max_bytes
+    )
@@ -0,0 +1,101 @@
+"""Optional validation of NMEA checksums of incoming messages.
+
+Validation works over raw bytes: only the '*hh' checksums of sentences (and tagblocks)
+are verified, so AIS payloads are never decoded.
+"""
+import logging
+from typing import Sequence
+
+from socket_listener.metrics import MetricsRegistry, registry as default_registry
+from socket_listener.packet import Packet
+from socket_listener.sinks.base import Sink
+from socket_listener.utils import nmea_checksum
+
+logger = logging.getLogger(__name__)
+
+_SENTENCE_STARTS = (b"!", b"$")
+
+
+def verify_checksum(line: bytes) -> bool:
+    """Returns whether an NMEA sentence, and its tagblock if any, have valid checksums.
+
+    Expects a line like b'\\s:117,c:1668046497*0A\\!AIVDM,1,1,,,369KwSP000<G`Kh0iuk...,0*12'.
+    Lines without checksum are not valid.
+    """
+    if line.startswith(b"\\"):
+        end = line.find(b"\\", 1)
+        if end == -1 or not _verify_part(line[1:end]):
+            return False
+
+        line = line[end + 1:]
+
+    if line[:1] not in _SENTENCE_STARTS:
+        return False
+
+    return _verify_part(line[1:])
+
+
+def _verify_part(part: bytes) -> bool:
+    # The checksum is the XOR of all bytes between the start character and '*'.
+    star = part.rfind(b"*")
+    if star == -1 or len(part) - star != 3:
+        return False
+
+    try:
+        expected = int(part[star + 1:], 16)
+    except ValueError:
+        return False
+
+    return nmea_checksum(part[:star]) == expected
+
+
+class ChecksumValidator:
+    """Filters out messages with invalid NMEA checksums from packets.
+
+    Args:
+        invalid_sinks:
+            Sinks to publish invalid messages to. If empty, invalid messages are dropped.
+
+        metrics:
+            Registry where the number of valid and invalid messages is counted.
+    """
+    def __init__(self, invalid_sinks: Sequence[Sink] = (), metrics: MetricsRegistry = None):
+        self.sinks = list(invalid_sinks)
+
+        metrics = metrics or default_registry
+        self._valid = metrics.counter("validation_valid_total")
+        self._invalid = metrics.counter("validation_invalid_total")
+
+    def filter(self, packet: Packet) -> Packet:
+        """Returns the packet with only its valid messages, or None if none are valid.
+
+        Invalid messages are published to the invalid sinks, as a packet with the same metadata.
+        """
+        delimiter = packet.delimiter.encode(packet.decode_method)
+        valid = []
+        invalid = []
+        for line in packet.data.split(delimiter):
+            line = line.strip()
+            if not line:
+                continue
+
+            if verify_checksum(line):
+                valid.append(line)
+                self._valid.inc()
+            else:
+                invalid.append(line)
+                self._invalid.inc()
+
+        if invalid:
+            logger.debug(f"{len(invalid)} invalid message(s) from {packet.source_host}.")
+            invalid_packet = packet.with_data(delimiter.join(invalid))
+            for sink in self.sinks:
+                sink.publish(invalid_packet)
+
+        if not valid:
+            return None
+
+        if not invalid:
+            return packet
+
+        return packet.with_data(delimiter.join(valid))
@@ -0,0 +1,32 @@
+import pytest
+
+from socket_listener import capture, framing, sinks
+from socket_listener.capture import CaptureReader
+from socket_listener.packet import Packet
+from socket_listener.sinks import create_sink
+from socket_listener.sinks.capture import CaptureSink
+
+
+def test_publish(tmp_path):
+    sink = create_sink("capture", directory=tmp_path)
+    assert sink.path == tmp_path
+
+    packet = Packet(b"msg1\nmsg2", source_host="10.0.0.1", source_port=5000)
+    sink.publish(packet)
+    assert sink.flush() == 0
+
+    [segment] = capture.list_segments(tmp_path)
+    with CaptureReader(segment) as reader:
+        [record] = list(reader)
+        assert record.time_ns == framing.to_epoch_ns(packet.time)
+        assert record.host == "10.0.0.1"
+        assert record.port == 5000
+        assert record.data == b"msg1\nmsg2"
+
+
+def test_lazy_attributes():
+    assert sinks.CaptureSink is CaptureSink
+    assert sinks.get_sink_class("capture") is CaptureSink
+
+    with pytest.raises(AttributeError):
+        sinks.Unknown
@@ -0,0 +1,68 @@
+import time
+
+import pytest
+from google.api_core import exceptions
+
+from socket_listener.packet import Packet
+from socket_listener.sinks import create_sink
+from socket_listener.sinks.emulator import EmulatedPublisherClient
+
+
+def test_publish_resolves_after_latency():
+    client = EmulatedPublisherClient(latency=0.05)
+
+    start = time.monotonic()
+    future = client.publish(client.topic_path("p", "t"), b"data", source_name="test")
+    assert future.result(timeout=1) == "0"
+    assert time.monotonic() - start >= 0.05
+    assert client.published == 1
+
+
+def test_futures_resolve_in_due_order():
+    client = EmulatedPublisherClient(latency=0.05, jitter=0.04, seed=1)
+
+    futures = [client.publish("t", b"data") for _ in range(20)]
+    assert all(f.result(timeout=1) for f in futures)
+    assert client.published == 20
+
+
+def test_injected_errors():
+    client = EmulatedPublisherClient(latency=0, error_rate=1)
+    future = client.publish("t", b"data")
+
+    with pytest.raises(exceptions.ServiceUnavailable):
+        future.result(timeout=1)
+
+    assert client.failed == 1
+
+
+def test_stop():
+    client = EmulatedPublisherClient(latency=0.01)
+    future = client.publish("t", b"data")
+    client.stop()
+
+    # Messages published before stopping are still resolved.
+    assert future.result(timeout=1) == "0"
+
+    with pytest.raises(RuntimeError):
+        client.publish("t", b"data")
+
+    with pytest.raises(RuntimeError):
+        client.stop()
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        EmulatedPublisherClient(error_rate=2)
+
+    with pytest.raises(TypeError):
+        EmulatedPublisherClient().publish("t", "not bytes")
+
+
+def test_emulated_sink():
+    sink = create_sink("emulated_pubsub", "project", "topic", data_format="split", latency=0)
+    sink.publish(Packet(b"msg1\nmsg2"))
+
+    assert sink.path == "projects/project/topics/topic"
+    assert sink._publishers[0].published == 2
+    assert sink.flush(timeout=1) == 0
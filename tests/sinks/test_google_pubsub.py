@@ -1,10 +1,15 @@
+import zlib
 import logging
+import threading
+import concurrent.futures
 from unittest import mock
 
 import pytest
 from google.cloud import pubsub_v1
 from google.api_core import exceptions
 
+from socket_listener import framing
+from socket_listener.metrics import MetricsRegistry
 from socket_listener.sinks import GooglePubSub
 from socket_listener.packet import Packet
 from socket_listener.sinks.pubsub import GooglePubSubError
@@ -92,3 +97,240 @@ def test_publish_generic_exception_logged(monkeypatch, caplog):
     pubsub.publish(packet)
 
     assert "Failed to publish message: Unexpected failure" in caplog.text
+
+
+def test_flush_waits_for_pending_futures(monkeypatch):
+    mock_client = mock.Mock()
+    monkeypatch.setattr(pubsub_v1, "PublisherClient", lambda: mock_client)
+
+    pubsub = GooglePubSub("project-test", "topic-test")
+    assert pubsub.flush(timeout=0) == 0
+    mock_client.stop.assert_called_once()
+
+    # A second flush must not fail even though the client is already stopped.
+    mock_client.stop.side_effect = RuntimeError("Already stopped")
+
+    pending = concurrent.futures.Future()
+    pubsub._pending.add(pending)
+    assert pubsub.flush(timeout=0.01) == 1
+
+    pending.set_result("message-id")
+    assert pubsub.flush(timeout=0.01) == 0
+
+
+def test_publish_calls_are_concurrent(monkeypatch):
+    barrier = threading.Barrier(2, timeout=2)
+
+    def publish(**kwargs):
+        # Both calls must be in progress at the same time to pass the barrier.
+        barrier.wait()
+        future = concurrent.futures.Future()
+        future.set_result("message-id")
+        return future
+
+    mock_client = mock.Mock()
+    mock_client.publish.side_effect = publish
+    monkeypatch.setattr(pubsub_v1, "PublisherClient", lambda: mock_client)
+
+    metrics = MetricsRegistry()
+    pubsub = GooglePubSub("project-test", "topic-test", metrics=metrics)
+    threads = [threading.Thread(target=pubsub.publish, args=(Packet(b"test"),)) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert not barrier.broken
+    assert sum(v for k, v in metrics.snapshot().items() if "published" in k) == 2
+
+
+def test_flush_waits_for_publish_in_progress(monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+    future = concurrent.futures.Future()
+
+    def publish(**kwargs):
+        started.set()
+        release.wait(timeout=2)
+        return future
+
+    mock_client = mock.Mock()
+    mock_client.publish.side_effect = publish
+    monkeypatch.setattr(pubsub_v1, "PublisherClient", lambda: mock_client)
+
+    pubsub = GooglePubSub("project-test", "topic-test")
+    thread = threading.Thread(target=pubsub.publish, args=(Packet(b"test"),))
+    thread.start()
+    assert started.wait(timeout=2)
+
+    threading.Timer(0.05, release.set).start()
+    # The future of the publish in progress is waited for.
+    assert pubsub.flush(timeout=0.2) == 1
+    mock_client.stop.assert_called_once()
+
+    future.set_result("message-id")
+    thread.join(timeout=5)
+
+
+def test_publish_after_flush_is_abandoned(monkeypatch, caplog):
+    mock_client = mock.Mock()
+    monkeypatch.setattr(pubsub_v1, "PublisherClient", lambda: mock_client)
+
+    pubsub = GooglePubSub("project-test", "topic-test")
+    pubsub.flush(timeout=0)
+
+    pubsub.publish(Packet(b"test"))
+
+    mock_client.publish.assert_not_called()
+    assert "Message abandoned" in caplog.text
+
+
+def test_publish_compact_metadata(monkeypatch):
+    mock_client = mock.Mock()
+    monkeypatch.setattr(pubsub_v1, "PublisherClient", lambda: mock_client)
+
+    pubsub = GooglePubSub(
+        "project-test", "topic-test", data_format="split", metadata_encoding="compact")
+
+    packet = Packet(b"msg1\nmsg2", protocol="UDP", source_host="10.0.0.1", source_name="test")
+    pubsub.publish(packet)
+
+    assert mock_client.publish.call_count == 2
+    for call, message in zip(mock_client.publish.call_args_list, [b"msg1", b"msg2"]):
+        assert call.kwargs.keys() == {"topic", "data"}
+        assert framing.decode(call.kwargs["data"]) == (packet.metadata, message)
+
+
+def test_invalid_metadata_encoding_raises():
+    with pytest.raises(ValueError):
+        GooglePubSub("project-test", "topic-test", metadata_encoding="invalid")
+
+
+def test_publish_compressed(monkeypatch):
+    mock_client = mock.Mock()
+    monkeypatch.setattr(pubsub_v1, "PublisherClient", lambda: mock_client)
+
+    pubsub = GooglePubSub("project-test", "topic-test", compression="zlib")
+    packet = Packet(b"msg1\nmsg1\nmsg1\nmsg1", source_name="test")
+    pubsub.publish(packet)
+
+    kwargs = mock_client.publish.call_args.kwargs
+    assert kwargs["content_encoding"] == "zlib"
+    assert kwargs["source_name"] == "test"
+    assert zlib.decompress(kwargs["data"]) == packet.data
+
+
+def test_compression_requires_raw_format():
+    with pytest.raises(ValueError, match="only supported"):
+        GooglePubSub("project-test", "topic-test", data_format="split", compression="zlib")
+
+
+def test_tune_updates_batch_settings(monkeypatch):
+    mock_client = mock.Mock()
+    mock_client.batch_settings = pubsub_v1.types.BatchSettings()
+    monkeypatch.setattr(pubsub_v1, "PublisherClient", lambda: mock_client)
+
+    pubsub = GooglePubSub("project-test", "topic-test")
+    pubsub.tune(batch_size=500, linger=0.05)
+
+    assert mock_client.batch_settings.max_messages == 500
+    assert mock_client.batch_settings.max_latency == 0.05
+
+
+def test_batch_settings_from_arguments(monkeypatch):
+    mock_client = mock.Mock()
+    mock_client.batch_settings = pubsub_v1.types.BatchSettings()
+    monkeypatch.setattr(pubsub_v1, "PublisherClient", lambda: mock_client)
+
+    GooglePubSub("project-test", "topic-test", batch_size=1000)
+
+    assert mock_client.batch_settings.max_messages == 1000
+    assert mock_client.batch_settings.max_latency == pubsub_v1.types.BatchSettings().max_latency
+
+
+def create_clients(monkeypatch):
+    clients = []
+
+    def create_client(**kwargs):
+        client = mock.Mock()
+        client.topic_path = lambda project, topic: f"projects/{project}/topics/{topic}"
+        client.options = kwargs
+        clients.append(client)
+        return client
+
+    monkeypatch.setattr(pubsub_v1, "PublisherClient", create_client)
+    return clients
+
+
+def published_topics(client):
+    return [call.kwargs["topic"] for call in client.publish.call_args_list]
+
+
+def test_round_robin_sharding(monkeypatch):
+    clients = create_clients(monkeypatch)
+    metrics = MetricsRegistry()
+
+    pubsub = GooglePubSub("p", ["t1", "t2"], clients=2, metrics=metrics)
+    assert pubsub.path == "projects/p/topics/t1, projects/p/topics/t2"
+
+    for _ in range(8):
+        pubsub.publish(Packet(b"test"))
+
+    assert len(clients) == 2
+    for client in clients:
+        assert published_topics(client) == ["projects/p/topics/t1", "projects/p/topics/t2"] * 2
+
+    snapshot = metrics.snapshot()
+    assert snapshot["pubsub_published_total{shard=0,sink=google_pubsub,topic=t1}"] == 2
+    assert snapshot["pubsub_published_total{shard=3,sink=google_pubsub,topic=t2}"] == 2
+
+
+def test_hash_sharding_and_ordering_keys(monkeypatch):
+    clients = create_clients(monkeypatch)
+
+    pubsub = GooglePubSub(
+        "p", "t", clients=4, sharding="source", ordering_key="source", metrics=MetricsRegistry()
+    )
+
+    sources = [f"10.0.0.{i}" for i in range(20)]
+    for source in sources * 2:
+        pubsub.publish(Packet(b"test", source_host=source))
+
+    assert all(c.options["publisher_options"].enable_message_ordering for c in clients)
+
+    shard_of = {}
+    for i, client in enumerate(clients):
+        for call in client.publish.call_args_list:
+            key = call.kwargs["ordering_key"]
+            assert shard_of.setdefault(key, i) == i
+
+    assert sorted(shard_of) == sorted(sources)
+    assert len(set(shard_of.values())) > 1
+
+
+def test_failed_ordered_publish_resumes_key(monkeypatch):
+    clients = create_clients(monkeypatch)
+    metrics = MetricsRegistry()
+
+    pubsub = GooglePubSub("p", "t", ordering_key="provider", metrics=metrics)
+    clients[0].publish.return_value.result.side_effect = exceptions.ServiceUnavailable("Down")
+    pubsub.publish(Packet(b"test", source_name="provider"))
+
+    clients[0].resume_publish.assert_called_once_with("projects/p/topics/t", "provider")
+    assert metrics.snapshot()["pubsub_failed_total{shard=0,sink=google_pubsub,topic=t}"] == 1
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        dict(sharding="invalid"),
+        dict(ordering_key="invalid"),
+        dict(clients=0),
+        dict(clients=2, ordering_key="source"),
+        dict(clients=2, sharding="provider", ordering_key="source"),
+    ],
+)
+def test_invalid_sharding_raises(kwargs):
+    with pytest.raises(ValueError):
+        GooglePubSub("project-test", "topic-test", **kwargs)
@@ -0,0 +1,194 @@
+import io
+import os
+import sys
+import logging
+import socket
+import threading
+
+import pytest
+
+from socket_listener import framing, logs, sinks
+from socket_listener.metrics import MetricsRegistry
+from socket_listener.packet import Packet
+from socket_listener.sinks import create_sink
+from socket_listener.sinks.local import PipeSink, UnixSocketSink, read_records
+
+PACKETS = [
+    Packet(f"!AIVDM,{i}\n".encode(), protocol="UDP", source_host="10.0.0.1", source_port=i)
+    for i in range(1, 101)
+]
+
+
+def test_read_records():
+    stream = io.BytesIO(b"\x00\x00\x00\x03abc\x00\x00\x00\x00\x00\x00")
+    assert list(read_records(stream)) == [b"abc", b""]
+
+
+def test_unix_stream_socket(tmp_path):
+    path = str(tmp_path / "sink.sock")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(1)
+
+    received = []
+
+    def consume():
+        connection, _ = server.accept()
+        with connection, connection.makefile("rb") as stream:
+            received.extend(read_records(stream))
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+
+    metrics = MetricsRegistry()
+    sink = create_sink("unix_socket", path=path, metrics=metrics)
+    assert sink.path == path
+
+    for packet in PACKETS:
+        sink.publish(packet)
+
+    assert sink.flush(timeout=5) == 0
+    consumer.join(timeout=5)
+    server.close()
+
+    assert [framing.decode(r)[1] for r in received] == [p.data for p in PACKETS]
+    assert metrics.snapshot()[f"local_sink_sent_total{{path={path},sink=unix_socket}}"] == 100
+
+
+def test_unix_datagram_socket(tmp_path):
+    path = str(tmp_path / "sink.sock")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    server.bind(path)
+    server.settimeout(5)
+
+    received = []
+
+    def consume():
+        while len(received) < len(PACKETS):
+            datagram = server.recv(65536)
+            assert len(datagram) <= 100
+            received.extend(read_records(io.BytesIO(datagram)))
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+
+    sink = UnixSocketSink(
+        path, socket_type="datagram", metadata=False, max_datagram_size=100,
+        metrics=MetricsRegistry()
+    )
+
+    for packet in PACKETS:
+        sink.publish(packet)
+
+    assert sink.flush(timeout=5) == 0
+    consumer.join(timeout=5)
+    server.close()
+
+    assert received == [p.data for p in PACKETS]
+
+
+def test_unix_socket_without_consumer(tmp_path):
+    metrics = MetricsRegistry()
+    sink = UnixSocketSink(str(tmp_path / "missing.sock"), metrics=metrics)
+    sink.publish(PACKETS[0])
+
+    assert sink.flush(timeout=5) == 0
+    [failed] = [v for k, v in metrics.snapshot().items() if k.startswith("local_sink_failed")]
+    assert failed == 1
+
+
+def test_max_buffer_bytes(tmp_path):
+    metrics = MetricsRegistry()
+    sink = UnixSocketSink(
+        str(tmp_path / "missing.sock"), max_buffer_bytes=0, metrics=metrics
+    )
+    sink.publish(PACKETS[0])
+    sink.flush(timeout=5)
+
+    [dropped] = [v for k, v in metrics.snapshot().items() if k.startswith("local_sink_dropped")]
+    assert dropped == 1
+
+
+def test_invalid_socket_type(tmp_path):
+    with pytest.raises(ValueError):
+        UnixSocketSink(str(tmp_path / "sink.sock"), socket_type="raw")
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="Requires named pipes.")
+def test_named_pipe(tmp_path):
+    path = str(tmp_path / "sink.fifo")
+    os.mkfifo(path)
+
+    received = []
+
+    def consume():
+        with open(path, "rb") as stream:
+            received.extend(read_records(stream))
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+
+    sink = create_sink("pipe", path=path, metrics=MetricsRegistry())
+    for packet in PACKETS:
+        sink.publish(packet)
+
+    assert sink.flush(timeout=5) == 0
+    consumer.join(timeout=5)
+
+    assert [framing.decode(r)[1] for r in received] == [p.data for p in PACKETS]
+
+
+def test_stdout(capfdbinary):
+    sink = PipeSink(metadata=False, metrics=MetricsRegistry())
+    assert sink.path == "stdout"
+
+    sink.publish(PACKETS[0])
+    assert sink.flush(timeout=5) == 0
+    assert list(read_records(io.BytesIO(capfdbinary.readouterr().out))) == [PACKETS[0].data]
+
+
+class RichLikeHandler(logging.Handler):
+    """Writes to the file of its console, like rich.logging.RichHandler."""
+    def __init__(self):
+        super().__init__()
+        self.console = type("Console", (), dict(file=sys.stdout))()
+
+    def emit(self, record):
+        self.console.file.write(self.format(record) + "\n")
+
+
+@pytest.mark.parametrize("async_logging", [False, True])
+def test_stdout_with_logging(capfdbinary, async_logging):
+    root = logging.getLogger()
+    handlers = [logging.StreamHandler(sys.stdout), RichLikeHandler()]
+    level = root.level
+    root.setLevel(logging.INFO)
+    for handler in handlers:
+        root.addHandler(handler)
+
+    async_handler = None
+    if async_logging:
+        async_handler = logs.install_async_logging(metrics=MetricsRegistry())
+
+    try:
+        sink = PipeSink(metadata=False, metrics=MetricsRegistry())
+        sink.publish(PACKETS[0])
+        logging.getLogger(__name__).info("Logged while packets are written to stdout.")
+        assert sink.flush(timeout=5) == 0
+    finally:
+        if async_handler is not None:
+            async_handler.stop()
+
+        for handler in handlers:
+            root.removeHandler(handler)
+
+        root.setLevel(level)
+
+    captured = capfdbinary.readouterr()
+    assert list(read_records(io.BytesIO(captured.out))) == [PACKETS[0].data]
+    assert captured.err.count(b"Logged while packets are written to stdout.") == 2
+
+
+def test_lazy_attributes():
+    assert sinks.UnixSocketSink is UnixSocketSink
+    assert sinks.get_sink_class("pipe") is PipeSink
@@ -0,0 +1,86 @@
+import os
+import signal
+
+import pytest
+
+from socket_listener import capture, framing, sinks
+from socket_listener.capture import CaptureReader
+from socket_listener.metrics import MetricsRegistry
+from socket_listener.packet import Packet
+from socket_listener.sinks import create_sink
+from socket_listener.sinks.process import ProcessSink, ProcessSinkError
+
+
+def create_process_sink(tmp_path, **kwargs):
+    return create_sink(
+        "process",
+        sinks_config={"capture": dict(directory=str(tmp_path))},
+        metrics=MetricsRegistry(),
+        **kwargs,
+    )
+
+
+def read_captures(path):
+    records = []
+    for segment in capture.list_segments(path):
+        with CaptureReader(segment) as reader:
+            records.extend((r.time_ns, r.host, r.port, bytes(r.data)) for r in reader)
+
+    return records
+
+
+def test_publish(tmp_path):
+    sink = create_process_sink(tmp_path, processes=2, ring_size=4096)
+    assert sink.path == "2 publisher process(es) (capture)"
+
+    packets = [
+        Packet(f"!AIVDM,{i}\n".encode(), protocol="UDP", source_host="10.0.0.1", source_port=i)
+        for i in range(1, 501)
+    ]
+
+    for packet in packets:
+        sink.publish(packet)
+
+    assert sink.flush(timeout=10) == 0
+    assert sink.dropped == 0
+
+    expected = [(framing.to_epoch_ns(p.time), "10.0.0.1", p.source_port, p.data) for p in packets]
+    assert sorted(read_captures(tmp_path), key=lambda r: r[2]) == expected
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGSTOP"), reason="Requires SIGSTOP.")
+def test_drop_when_ring_is_full(tmp_path):
+    sink = create_process_sink(tmp_path, ring_size=1024, max_wait=0)
+    [publisher] = sink._publishers
+    os.kill(publisher.process.pid, signal.SIGSTOP)
+    try:
+        for _ in range(100):
+            sink.publish(Packet(bytes(100), protocol="UDP"))
+    finally:
+        os.kill(publisher.process.pid, signal.SIGCONT)
+
+    assert sink.dropped > 0
+    assert sink.flush(timeout=10) == 0
+    assert len(read_captures(tmp_path)) == 100 - sink.dropped
+
+
+def test_dead_publisher(tmp_path):
+    sink = create_process_sink(tmp_path, ring_size=1024, max_wait=0)
+    [publisher] = sink._publishers
+    publisher.process.terminate()
+    publisher.process.join()
+
+    with pytest.raises(ProcessSinkError):
+        for _ in range(100):
+            sink.publish(Packet(bytes(100), protocol="UDP"))
+
+    assert sink.flush(timeout=1) > 0
+
+
+def test_invalid_processes():
+    with pytest.raises(ValueError):
+        ProcessSink({}, processes=0)
+
+
+def test_lazy_attributes():
+    assert sinks.ProcessSink is ProcessSink
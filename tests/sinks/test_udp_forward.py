@@ -0,0 +1,88 @@
+import socket
+
+import pytest
+
+from socket_listener import sinks
+from socket_listener.metrics import MetricsRegistry
+from socket_listener.packet import Packet
+from socket_listener.sinks import create_sink
+from socket_listener.sinks.udp import UdpForwardSink, parse_address
+
+
+def listener():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(5)
+    return sock
+
+
+def address(sock):
+    host, port = sock.getsockname()
+    return f"{host}:{port}"
+
+
+@pytest.mark.parametrize(
+    "address, expected",
+    [
+        pytest.param("127.0.0.1:10110", ("127.0.0.1", 10110), id="IPv4"),
+        pytest.param("[::1]:10110", ("::1", 10110), id="IPv6"),
+        pytest.param("localhost:5", ("localhost", 5), id="hostname"),
+    ]
+)
+def test_parse_address(address, expected):
+    assert parse_address(address) == expected
+
+
+@pytest.mark.parametrize("address", ["127.0.0.1", ":10110", "host:port"])
+def test_parse_invalid_address(address):
+    with pytest.raises(ValueError):
+        parse_address(address)
+
+
+def test_forward():
+    first, second = listener(), listener()
+    metrics = MetricsRegistry()
+    destinations = [address(first), address(second)]
+    sink = create_sink("udp_forward", destinations=destinations, metrics=metrics)
+    assert sink.path == f"{address(first)}, {address(second)}"
+
+    datagrams = [f"!AIVDM,{i}\n!AIVDM,{i}\n".encode() for i in range(50)]
+    for data in datagrams:
+        sink.publish(Packet(data))
+
+    assert sink.flush(timeout=5) == 0
+
+    for sock in (first, second):
+        assert [sock.recv(65536) for _ in datagrams] == datagrams
+        assert metrics.snapshot()[f"udp_forward_sent_total{{destination={address(sock)}}}"] == 50
+        sock.close()
+
+
+def test_failing_destination_is_isolated():
+    alive, dead = listener(), listener()
+    alive_address, dead_address = address(alive), address(dead)
+    dead.close()
+
+    metrics = MetricsRegistry()
+    sink = UdpForwardSink([dead_address, alive_address], linger=0, metrics=metrics)
+
+    for i in range(20):
+        sink.publish(Packet(b"packet %d" % i))
+        # Separate batches, so the refused datagrams are reported by the following sends.
+        assert alive.recv(65536) == b"packet %d" % i
+
+    sink.flush(timeout=5)
+    alive.close()
+
+    snapshot = metrics.snapshot()
+    assert snapshot[f"udp_forward_sent_total{{destination={alive_address}}}"] == 20
+    assert snapshot[f"udp_forward_failed_total{{destination={dead_address}}}"] > 0
+
+
+def test_without_destinations():
+    with pytest.raises(ValueError):
+        UdpForwardSink([])
+
+
+def test_lazy_attributes():
+    assert sinks.UdpForwardSink is UdpForwardSink
@@ -0,0 +1,121 @@
+import gzip
+import json
+
+import pytest
+
+from socket_listener import analysis
+from socket_listener.assets import get_sample_data_path
+
+NMEA_FILEPATH = get_sample_data_path("nmea.txt")
+TAGBLOCK_FILEPATH = get_sample_data_path("nmea-with-tagblock.txt")
+
+MULTIPART = [
+    "!AIVDM,2,1,3,B,55?MbV02;H;s<HtKR20EHE:0@T4@Dn2222222216L961O5Gf0NSQEp6ClRp8,0*1C",
+    "!AIVDM,2,2,3,B,88888888880,2*25",
+]
+
+
+def test_hyperloglog():
+    sketch = analysis.HyperLogLog()
+    for i in range(50000):
+        sketch.add(str(i % 20000).encode())
+
+    assert sketch.count() == pytest.approx(20000, rel=0.03)
+
+    other = analysis.HyperLogLog()
+    for i in range(10000, 40000):
+        other.add(str(i).encode())
+
+    sketch.merge(other)
+    assert sketch.count() == pytest.approx(40000, rel=0.03)
+
+
+def test_hyperloglog_invalid_precision():
+    with pytest.raises(ValueError):
+        analysis.HyperLogLog(precision=2)
+
+
+@pytest.mark.parametrize("path", [NMEA_FILEPATH, TAGBLOCK_FILEPATH])
+def test_sharding_does_not_change_report(path):
+    expected = analysis.analyze(path).report()
+    assert analysis.analyze(path, shard_size=5000).report() == expected
+
+
+def test_analyze_with_processes():
+    expected = analysis.analyze(TAGBLOCK_FILEPATH).report()
+    assert analysis.analyze(TAGBLOCK_FILEPATH, processes=2, shard_size=100000).report() == expected
+
+
+def test_analyze_gzip_files(tmp_path):
+    (tmp_path / "nmea.txt.gz").write_bytes(gzip.compress(NMEA_FILEPATH.read_bytes()))
+    (tmp_path / "nmea.txt").write_bytes(NMEA_FILEPATH.read_bytes())
+
+    report = analysis.analyze(tmp_path, shard_size=5000).report()
+    single = analysis.analyze(NMEA_FILEPATH).report()
+
+    assert report["lines"] == 2 * single["lines"]
+    assert report["multipart"]["complete"] == 2 * single["multipart"]["complete"]
+    assert report["duplicates"]["distinct_estimate"] == single["duplicates"]["distinct_estimate"]
+
+
+def test_report():
+    lines = [
+        "\\s:1,c:1700000000*00\\" + MULTIPART[0],
+        MULTIPART[1],
+        MULTIPART[1],  # Orphan part.
+        "\\c:1700000030000*00\\" + MULTIPART[0],  # Never completed.
+        "$GPGLL,4916.45,N,12311.12,W,225444,A*1D",
+        "$GPGLL,4916.45,N,12311.12,W,225444,A*1D",
+        "not nmea",
+        "",
+    ]
+
+    stats = analysis.Stats().update(f"{line}\n".encode() for line in lines).finish()
+    report = stats.report()
+
+    assert report["lines"] == 7
+    assert report["sentences"] == 6
+    assert report["invalid"] == 1
+    assert report["tagblocks"] == 2
+    assert report["duplicates"]["distinct_estimate"] == 3
+    assert report["duplicates"]["duplicates_estimate"] == 3
+    assert report["multipart"] == dict(complete=1, incomplete=2, completeness=0.3333)
+    assert report["prefixes"] == {"!": 4, "$": 2}
+    assert report["talkers"] == {"AI": 4, "GP": 2}
+    assert report["message_types"] == {5: 2}
+    assert report["rates"]["timestamped"] == 2
+    assert report["rates"]["peak_messages_per_minute"] == 2
+    assert report["rates"]["first_minute"] == "2023-11-14T22:13:00Z"
+
+
+def test_multipart_split_between_shards():
+    first = analysis.Stats().update([MULTIPART[0].encode()]).finish()
+    second = analysis.Stats().update([MULTIPART[1].encode()]).finish()
+
+    assert first.tail and second.head
+    assert analysis.Stats().merge(first).merge(second, consecutive=True).complete == 1
+
+    merged = analysis.Stats().merge(first).merge(second, consecutive=False)
+    assert merged.complete == 0
+    assert merged.report()["multipart"]["incomplete"] == 2
+
+
+def test_max_open_groups():
+    lines = [
+        MULTIPART[0].replace(",3,B,", ",1,B,"),
+        MULTIPART[0],
+        MULTIPART[1],
+        MULTIPART[1].replace(",3,B,", ",1,B,"),
+    ]
+
+    stats = analysis.Stats(max_open_groups=1).update(line.encode() for line in lines).finish()
+    assert stats.complete == 1
+    assert stats.incomplete == 1
+
+
+def test_run(tmp_path, capsys):
+    output = tmp_path / "report.json"
+    report = analysis.run(str(NMEA_FILEPATH), processes=1, output=str(output))
+
+    assert json.loads(capsys.readouterr().out) == json.loads(output.read_text())
+    assert report["lines"] == 5414
@@ -0,0 +1,73 @@
+import threading
+from unittest import mock
+
+import pytest
+
+from socket_listener.backpressure import AIMDController
+from socket_listener.metrics import MetricsRegistry
+
+
+def _controller(**kwargs):
+    return AIMDController(metrics=MetricsRegistry(), **kwargs)
+
+
+def test_drop_policy_sheds_when_limit_is_reached():
+    metrics = MetricsRegistry()
+    controller = AIMDController(max_limit=2, policy="drop", metrics=metrics)
+
+    assert controller.acquire()
+    assert controller.acquire()
+    assert not controller.acquire()
+    assert metrics.snapshot()["backpressure_shed_total"] == 1
+
+    controller.release(latency=0.01)
+    assert controller.acquire()
+
+
+def test_block_policy_waits_for_slot():
+    controller = _controller(max_limit=1, policy="block", max_wait=2)
+    assert controller.acquire()
+
+    timer = threading.Timer(0.05, controller.release, kwargs=dict(latency=0.01))
+    timer.start()
+    assert controller.acquire()
+    timer.join()
+
+
+def test_block_policy_sheds_after_max_wait():
+    controller = _controller(max_limit=1, policy="block", max_wait=0.01)
+    assert controller.acquire()
+    assert not controller.acquire()
+
+
+def test_aimd_adjustments():
+    sink = mock.Mock()
+    controller = _controller(
+        sinks=[sink], max_limit=8, target_latency=0.1, window=0,
+        min_batch_size=100, max_batch_size=400, min_linger=0.01, max_linger=0.04,
+    )
+
+    # Overloaded: multiplicative decrease of the limit, more batching.
+    controller.acquire()
+    controller.release(latency=1)
+    assert controller.limit == 4
+    assert (controller.batch_size, controller.linger) == (200, 0.02)
+    sink.tune.assert_called_with(batch_size=200, linger=0.02)
+
+    # Failures are also considered overload.
+    controller.acquire()
+    controller.release(latency=0, ok=False)
+    assert controller.limit == 2
+
+    # Recovered: additive increase of the limit, less batching.
+    for _ in range(20):
+        controller.acquire()
+        controller.release(latency=0)
+
+    assert controller.limit == 8
+    assert (controller.batch_size, controller.linger) == (100, 0.01)
+
+
+def test_invalid_policy():
+    with pytest.raises(ValueError):
+        _controller(policy="invalid")
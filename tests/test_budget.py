@@ -0,0 +1,110 @@
+import time
+import socket
+import threading
+
+import pytest
+
+from socket_listener import receivers
+from socket_listener.budget import MemoryBudget, Policy
+from socket_listener.capture import CaptureReader, list_segments
+from socket_listener.metrics import MetricsRegistry
+
+
+def create_budget(**kwargs):
+    kwargs.setdefault("amplification", 1)
+    kwargs.setdefault("overhead", 0)
+    return MemoryBudget(metrics=MetricsRegistry(), **kwargs)
+
+
+def test_drop_policy():
+    budget = create_budget(max_bytes=10, policy=Policy.DROP)
+
+    assert budget.acquire(b"x" * 6)
+    assert not budget.acquire(b"x" * 6)
+    assert budget.acquire(b"x" * 4)
+    assert budget.used == 10
+
+    budget.release(b"x" * 6)
+    assert budget.used == 4
+
+
+def test_always_admits_when_nothing_in_flight():
+    budget = create_budget(max_bytes=10, policy=Policy.DROP)
+    assert budget.acquire(b"x" * 100)
+    assert not budget.acquire(b"x")
+
+
+def test_cost():
+    budget = MemoryBudget(max_bytes=10, amplification=3, overhead=100, metrics=MetricsRegistry())
+    assert budget.cost(b"x" * 10) == 130
+
+
+def test_block_policy_waits_for_release():
+    budget = create_budget(max_bytes=10, policy=Policy.BLOCK, max_wait=5)
+    assert budget.acquire(b"x" * 10)
+
+    timer = threading.Timer(0.05, budget.release, args=(b"x" * 10,))
+    timer.start()
+    assert budget.acquire(b"x" * 10)
+    timer.join()
+
+
+def test_block_policy_drops_after_max_wait():
+    metrics = MetricsRegistry()
+    budget = MemoryBudget(max_bytes=10, max_wait=0.01, metrics=metrics)
+    assert budget.acquire(b"x")
+    assert not budget.acquire(b"x")
+
+    snapshot = metrics.snapshot()
+    assert snapshot["memory_budget_blocked_total"] == 1
+    assert snapshot["memory_budget_dropped_total"] == 1
+
+
+def test_spill_policy(tmp_path):
+    metrics = MetricsRegistry()
+    budget = MemoryBudget(
+        max_bytes=10, policy=Policy.SPILL, spill_dir=tmp_path, overhead=0, metrics=metrics
+    )
+
+    assert budget.acquire(b"first")
+    assert not budget.acquire(b"second", "10.0.0.1", 1234)
+    budget.close()
+
+    (segment,) = list_segments(tmp_path)
+    with CaptureReader(segment) as reader:
+        records = list(reader)
+
+    assert [(bytes(r.data), r.host, r.port) for r in records] == [(b"second", "10.0.0.1", 1234)]
+    assert metrics.snapshot()["memory_budget_spilled_total"] == 1
+
+
+def test_invalid_arguments(tmp_path):
+    with pytest.raises(ValueError):
+        create_budget(max_bytes=10, policy="wait")
+
+    with pytest.raises(ValueError):
+        create_budget(max_bytes=10, policy=Policy.SPILL)
+
+    with pytest.raises(ValueError):
+        create_budget(max_bytes=0)
+
+
+def test_receiver_releases_budget():
+    receiver, thread = receivers.run(
+        port=0, host="127.0.0.1", poll_interval=0.01, memory_budget=1, daemon_thread=True
+    )
+
+    budget = receiver.server.budget
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.sendto(b"packet", receiver.server.server_address)
+    sock.close()
+
+    deadline = time.monotonic() + 5
+    while receiver.server.stats.last_published is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    receiver.drain(timeout=2)
+    thread.join(timeout=5)
+
+    assert receiver.server.stats.last_published is not None
+    assert budget.used == 0
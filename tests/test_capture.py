@@ -0,0 +1,86 @@
+import pytest
+
+from socket_listener import capture
+from socket_listener.capture import CaptureWriter, CaptureReader, CaptureError
+
+
+def read_all(path, **kwargs):
+    with CaptureReader(path) as reader:
+        return [
+            (r.time_ns, r.host, r.port, bytes(r.data))
+            for r in reader.records(**kwargs)
+        ]
+
+
+@pytest.mark.parametrize("host", ["10.0.0.1", "2001:db8::1", None])
+def test_address_roundtrip(host):
+    assert capture.decode_address(capture.encode_address(host)) == host
+
+
+def test_write_and_read(tmp_path):
+    writer = CaptureWriter(tmp_path)
+    writer.write(b"msg1\nmsg2", time_ns=1, host="10.0.0.1", port=5000)
+    writer.write(b"", time_ns=2, host="2001:db8::1", port=5001)
+    writer.write(b"msg3", time_ns=3)
+    writer.close()
+
+    [segment] = capture.list_segments(tmp_path)
+    assert capture.is_capture(segment)
+    assert read_all(segment) == [
+        (1, "10.0.0.1", 5000, b"msg1\nmsg2"),
+        (2, "2001:db8::1", 5001, b""),
+        (3, None, 0, b"msg3"),
+    ]
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_rotation(tmp_path, compress):
+    writer = CaptureWriter(tmp_path, segment_size=100, compress=compress)
+    for i in range(10):
+        writer.write(b"x" * 40, time_ns=i)
+
+    writer.close()
+
+    segments = capture.list_segments(tmp_path)
+    assert len(segments) == 5
+    assert all(s.name.endswith(".gz") == compress for s in segments)
+
+    times = [r[0] for s in segments for r in read_all(s)]
+    assert times == list(range(10))
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_seek_with_index(tmp_path, compress):
+    writer = CaptureWriter(tmp_path, index_interval=10, compress=compress)
+    for i in range(100):
+        writer.write(str(i).encode(), time_ns=i * 1000)
+
+    writer.close()
+
+    [segment] = capture.list_segments(tmp_path)
+    with CaptureReader(segment) as reader:
+        assert len(reader.index()) == 10
+
+    records = read_all(segment, start_time_ns=55_000)
+    assert [r[3] for r in records] == [str(i).encode() for i in range(55, 100)]
+
+
+def test_truncated_record(tmp_path):
+    writer = CaptureWriter(tmp_path)
+    writer.write(b"complete", time_ns=1)
+    writer.write(b"truncated", time_ns=2)
+    writer.close()
+
+    [segment] = capture.list_segments(tmp_path)
+    segment.write_bytes(segment.read_bytes()[:-3])
+
+    assert [r[3] for r in read_all(segment)] == [b"complete"]
+
+
+def test_not_a_capture(tmp_path):
+    path = tmp_path / "file.txt"
+    path.write_bytes(b"not a capture file")
+
+    assert not capture.is_capture(path)
+    with pytest.raises(CaptureError):
+        CaptureReader(path).open()
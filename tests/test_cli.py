@@ -1,3 +1,6 @@
+import sys
+import subprocess
+
 import pytest
 
 from socket_listener import cli
@@ -29,6 +32,40 @@ def test_cli_with_config():
     )
 
 
+def test_cli_reload_config():
+    _run_cli_in_thread(
+        "receiver",
+        "-c",
+        "config/UDP-in-thread.yaml",
+        "--reload-config",
+        "--thread-monitor-delay", "0.01",
+    )
+
+
+def test_config_file_path():
+    assert cli.config_file_path(["receiver", "-c", "config.yaml", "--pubsub"]) == "config.yaml"
+    assert cli.config_file_path(["receiver", "--config-file=config.yaml"]) == "config.yaml"
+    assert cli.config_file_path(["receiver", "--pubsub"]) is None
+
+
 def test_cli_no_arguments():
     with pytest.raises(SystemExit):
         cli.cli([])
+
+
+def test_heavy_modules_are_imported_lazily():
+    code = (
+        "import sys\n"
+        "import socket_listener.cli, socket_listener.receivers, socket_listener.transmitters\n"
+        "print(' '.join(m for m in ('google.cloud.pubsub_v1', 'rich.progress') "
+        "if m in sys.modules))\n"
+    )
+
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+
+
+def test_load_command():
+    for name in cli.COMMANDS:
+        assert hasattr(cli.load_command(name), "run")
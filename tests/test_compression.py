@@ -0,0 +1,49 @@
+import pytest
+
+from socket_listener import compression
+from socket_listener.assets import get_sample_data_path
+
+PACKET = b"\n".join(get_sample_data_path("nmea.txt").read_bytes().splitlines()[:20])
+
+
+@pytest.mark.parametrize("name", compression.available_codecs())
+def test_roundtrip(name):
+    codec = compression.create_codec(name)
+
+    compressed = codec.compress(PACKET)
+
+    assert codec.name == name
+    assert len(compressed) < len(PACKET)
+    assert codec.decompress(compressed) == PACKET
+
+
+def test_zstd_dictionary_improves_ratio():
+    pytest.importorskip("zstandard")
+
+    plain = compression.create_codec("zstd").compress(PACKET)
+    with_dict = compression.create_codec("zstd-dict").compress(PACKET)
+
+    assert len(with_dict) < len(plain)
+
+
+def test_zstd_dictionary_is_deterministic():
+    pytest.importorskip("zstandard")
+
+    dictionary = compression.train_zstd_dictionary()
+    retrained = compression.train_zstd_dictionary.__wrapped__()
+
+    assert dictionary.as_bytes() == retrained.as_bytes()
+
+
+def test_invalid_codec():
+    with pytest.raises(ValueError, match="Invalid compression"):
+        compression.create_codec("brotli")
+
+
+def test_missing_optional_dependency(monkeypatch):
+    monkeypatch.setattr(compression, "lz4", None)
+
+    with pytest.raises(ValueError, match="requires the 'lz4' package"):
+        compression.create_codec("lz4")
+
+    assert "lz4" not in compression.available_codecs()
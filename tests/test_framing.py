@@ -0,0 +1,81 @@
+import pytest
+
+from socket_listener import framing
+from socket_listener.packet import Packet
+
+
+@pytest.mark.parametrize(
+    "protocol, source_host, source_name",
+    [
+        pytest.param("UDP", "10.33.44.50", "marinetraffic", id="ipv4"),
+        pytest.param("UDP", "2001:db8::1", "spire", id="ipv6"),
+        pytest.param("TCP", "localhost", "Unknown", id="text-host"),
+        pytest.param(None, None, "", id="no-metadata"),
+    ]
+)
+def test_roundtrip(protocol, source_host, source_name):
+    packet = Packet(
+        b"!AIVDM,1,1,,A,13m0Nj01C@WPIfR1>5d0phnd00SN,0*44",
+        protocol=protocol,
+        source_host=source_host,
+        source_name=source_name,
+    )
+
+    metadata, data = framing.decode(framing.encode(packet))
+
+    assert data == packet.data
+    assert metadata == packet.metadata
+
+
+def test_encode_message_of_packet():
+    packet = Packet(b"msg1\nmsg2", protocol="UDP", source_host="10.0.0.1")
+    payload = framing.encode(packet, b"msg2")
+
+    assert framing.is_compact(payload)
+    assert framing.decode(payload)[1] == b"msg2"
+
+
+def test_compact_is_smaller_than_attributes():
+    packet = Packet(b"", protocol="UDP", source_host="10.33.44.50", source_name="marinetraffic")
+    attributes_size = sum(len(k) + len(v) for k, v in packet.metadata.items())
+
+    assert len(framing.encode(packet)) < attributes_size / 2
+
+
+def test_epoch_ns_conversion():
+    packet = Packet(b"")
+    ns = framing.to_epoch_ns(packet.time)
+    assert framing.from_epoch_ns(ns) == packet.time
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        pytest.param(b"", id="empty"),
+        pytest.param(b"!AIVDM,1,1,,A,13m0Nj01C@WPIfR1>5d0phnd00SN,0*44", id="not-framed"),
+        pytest.param(bytes([0xA1, 1, 9, 0]) + bytes(9), id="unknown-protocol"),
+        pytest.param(bytes([0xA1, 1, 1, 7]) + bytes(9), id="unknown-host-kind"),
+        pytest.param(bytes([0xA1, 1, 1, 0]) + bytes(8), id="no-source-name"),
+        pytest.param(bytes([0xA1, 1, 1, 0]) + bytes(8) + b"\x05ab", id="truncated-source-name"),
+        pytest.param(bytes([0xA1, 1, 1, 1]) + bytes(9) + b"\x0a", id="truncated-ipv4"),
+        pytest.param(bytes([0xA1, 1, 1, 3]) + bytes(9) + b"\x04a", id="truncated-host"),
+        pytest.param(bytes([0xA1, 1, 1, 0]) + bytes(8) + b"\x01\xff", id="invalid-utf8"),
+    ]
+)
+def test_decode_invalid_payload(payload):
+    with pytest.raises(framing.FramingError):
+        framing.decode(payload)
+
+
+def test_encode_invalid_metadata():
+    with pytest.raises(framing.FramingError):
+        framing.encode(Packet(b"", protocol="SCTP"))
+
+    with pytest.raises(framing.FramingError):
+        framing.encode(Packet(b"", source_name="x" * 256))
+
+
+def test_check_text():
+    framing.check_text("x" * 255)
+    with pytest.raises(framing.FramingError):
+        framing.check_text("x" * 256)
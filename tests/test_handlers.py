@@ -7,6 +7,9 @@ from socket_listener.handlers import UDPRequestHandler
 from socket_listener.sinks import GooglePubSub
 from socket_listener.sinks.base import SinkError
 from socket_listener.packet import Packet
+from socket_listener.metrics import MetricsRegistry
+from socket_listener.validation import ChecksumValidator
+from socket_listener.routing import Route, Router
 
 
 @pytest.fixture
@@ -23,8 +26,7 @@ def test_udp_handler_publishes_packet(test_data, test_address, caplog):
     # Create a mock sink and spy on its publish method
     mock_sink = mock.Mock(spec=GooglePubSub)
     receiver = UDPSocketReceiver(sinks=[mock_sink], port=0)
-    receiver.server.provider_name = "TestSource"
-    receiver.server.delimiter = "\n"
+    receiver.server.update_config(provider_name="TestSource", delimiter="\n")
 
     # Patch logging level to DEBUG to test debug messages.
     caplog.set_level(logging.DEBUG)
@@ -55,7 +57,7 @@ def test_udp_handler_publishes_packet(test_data, test_address, caplog):
 def test_udp_handler_unknown_source(test_data, test_address):
     mock_sink = mock.Mock(spec=GooglePubSub)
     receiver = UDPSocketReceiver(sinks=[mock_sink], port=0)
-    receiver.server.delimiter = "\n"
+    receiver.server.update_config(delimiter="\n")
 
     handler = UDPRequestHandler((test_data, None), test_address, receiver.server)
     handler.handle()
@@ -71,8 +73,7 @@ def test_udp_handler_sinkerror_is_captured(test_data, test_address):
 
     failing_sink = FailingSink()
     receiver = UDPSocketReceiver(sinks=[failing_sink], port=0)
-    receiver.server.provider_name = "TestSource"
-    receiver.server.delimiter = "\n"
+    receiver.server.update_config(provider_name="TestSource", delimiter="\n")
 
     # Ensure exceptions dict is empty before
     assert not receiver.server.exceptions
@@ -85,3 +86,42 @@ def test_udp_handler_sinkerror_is_captured(test_data, test_address):
     exc = receiver.server.exceptions[SinkError]
     assert isinstance(exc, SinkError)
     assert "Sink failed" in str(exc)
+
+
+def test_udp_handler_validates_checksums(test_address):
+    mock_sink = mock.Mock(spec=GooglePubSub)
+    invalid_sink = mock.Mock(spec=GooglePubSub)
+    validator = ChecksumValidator(invalid_sinks=[invalid_sink], metrics=MetricsRegistry())
+    receiver = UDPSocketReceiver(sinks=[mock_sink], port=0, validator=validator)
+
+    valid = b"!AIVDM,1,1,,,369KwSP000<G`Kh0iukScOv00000,0*12"
+    UDPRequestHandler((valid + b"\ncorrupt*00", None), test_address, receiver.server)
+    assert mock_sink.publish.call_args[0][0].data == valid
+    assert invalid_sink.publish.call_args[0][0].data == b"corrupt*00"
+
+    # Packets without valid messages are not published.
+    UDPRequestHandler((b"corrupt*00", None), test_address, receiver.server)
+    assert mock_sink.publish.call_count == 1
+    assert invalid_sink.publish.call_count == 2
+
+    receiver.server.server_close()
+
+
+def test_udp_handler_routes_messages(test_address):
+    default_sink = mock.Mock(spec=GooglePubSub)
+    static_sink = mock.Mock(spec=GooglePubSub)
+    router = Router(
+        [Route("static", sinks=[static_sink], message_types=[5])],
+        default_sinks=[default_sink],
+        metrics=MetricsRegistry(),
+    )
+    receiver = UDPSocketReceiver(sinks=[default_sink], port=0, router=router)
+
+    position = b"!AIVDM,1,1,,A,13m0Nj01C@WPIfR1>5d0phnd00SN,0*44"
+    static = b"!AIVDM,1,1,,A,569@?q00000091Ho@00HDUPTtpOF2222,0*00"
+    UDPRequestHandler((position + b"\n" + static, None), test_address, receiver.server)
+
+    assert default_sink.publish.call_args[0][0].data == position
+    assert static_sink.publish.call_args[0][0].data == static
+
+    receiver.server.server_close()
@@ -0,0 +1,153 @@
+import json
+import urllib.error
+import urllib.request
+from unittest import mock
+
+import pytest
+
+from socket_listener.health import HealthCheck, HealthServer, IngestStats, prometheus
+from socket_listener.inflight import InFlight
+from socket_listener.metrics import MetricsRegistry
+from socket_listener.receivers import UDPSocketReceiver
+from socket_listener.supervisor import Supervisor
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def create_health(clock, **kwargs):
+    stats = IngestStats(clock=clock)
+    supervisor = Supervisor(shutdown_server=mock.Mock(), metrics=MetricsRegistry(), clock=clock)
+    health = HealthCheck(
+        stats=stats,
+        serving=lambda: True,
+        supervisor=supervisor,
+        in_flight=InFlight(),
+        clock=clock,
+        **kwargs,
+    )
+
+    return health, stats, supervisor
+
+
+def test_readiness(clock):
+    health, _, supervisor = create_health(clock)
+    assert health.readiness() == (True, dict(serving=True, sinks="healthy"))
+
+    supervisor.report(Exception())
+    assert health.readiness() == (False, dict(serving=True, sinks="failed"))
+
+
+def test_liveness_max_idle(clock):
+    health, stats, _ = create_health(clock, max_idle=10)
+    assert health.liveness()[0]
+
+    clock.now = 11
+    live, details = health.liveness()
+    assert not live
+    assert details["idle_seconds"] == 11
+
+    stats.received()
+    stats.published()
+    assert health.liveness()[0]
+
+
+def test_liveness_stalled_publishing(clock):
+    health, stats, _ = create_health(clock, max_publish_delay=10)
+
+    # Traffic with publications going on is live.
+    for clock.now in range(0, 30, 5):
+        stats.published()
+        clock.now += 1
+        stats.received()
+        assert health.liveness()[0]
+
+    # Packets keep arriving but nothing is published.
+    for clock.now in range(30, 50, 5):
+        stats.received()
+        live, details = health.liveness()
+
+    assert not live
+    assert details["stalled"]
+
+
+def test_liveness_saturated(clock):
+    in_flight = InFlight()
+    health = HealthCheck(
+        stats=IngestStats(clock=clock),
+        serving=lambda: True,
+        supervisor=Supervisor(shutdown_server=mock.Mock(), metrics=MetricsRegistry()),
+        in_flight=in_flight,
+        max_in_flight=lambda: 1,
+        max_publish_delay=10,
+        clock=clock,
+    )
+
+    in_flight.acquire()
+    assert health.liveness()[0]
+
+    clock.now = 11
+    live, details = health.liveness()
+    assert not live
+    assert details["saturated"]
+
+    in_flight.release()
+    assert health.liveness()[0]
+
+
+def test_prometheus():
+    assert prometheus({"a_total": 1, "b{sink=x,topic=y}": 2.5}) == (
+        'a_total 1\nb{sink="x",topic="y"} 2.5\n'
+    )
+
+
+def get(port, path):
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=5) as response:
+            return response.status, response.read().decode()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode()
+
+
+def test_health_server(clock):
+    health, _, supervisor = create_health(clock)
+    metrics = MetricsRegistry()
+    metrics.counter("packets_total").inc()
+
+    server = HealthServer(health, host="127.0.0.1", port=0, metrics=metrics)
+    server.start()
+    try:
+        status, body = get(server.port, "/healthz")
+        assert status == 200
+        assert json.loads(body)["ok"]
+
+        assert get(server.port, "/metrics") == (200, "packets_total 1\n")
+        assert get(server.port, "/nothing")[0] == 404
+
+        supervisor.report(Exception())
+        assert get(server.port, "/readyz")[0] == 503
+    finally:
+        server.stop()
+
+
+def test_receiver_health_endpoint():
+    receiver = UDPSocketReceiver(port=0, host="127.0.0.1", health_port=0)
+    port = receiver.health_server.port
+    receiver.health_server.start()
+
+    # The socket is bound but not served yet.
+    status, body = get(port, "/readyz")
+    assert status == 503
+    assert not json.loads(body)["serving"]
+
+    receiver.shutdown()
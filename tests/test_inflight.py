@@ -0,0 +1,37 @@
+import threading
+
+from socket_listener.inflight import InFlight
+
+
+def test_count():
+    in_flight = InFlight()
+    assert in_flight.count == 0
+
+    with in_flight:
+        with in_flight:
+            assert in_flight.count == 2
+
+    assert in_flight.count == 0
+
+
+def test_wait_returns_when_empty():
+    in_flight = InFlight()
+    assert in_flight.wait(timeout=0)
+
+    started = threading.Event()
+    release = threading.Event()
+
+    def work():
+        with in_flight:
+            started.set()
+            release.wait()
+
+    thread = threading.Thread(target=work)
+    thread.start()
+    started.wait(timeout=1)
+
+    assert not in_flight.wait(timeout=0.01)
+
+    release.set()
+    assert in_flight.wait(timeout=1)
+    thread.join()
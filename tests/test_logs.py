@@ -0,0 +1,99 @@
+import queue
+import logging
+import threading
+
+import pytest
+
+from socket_listener.logs import AsyncQueueHandler, RateLimitFilter, install_async_logging
+from socket_listener.metrics import MetricsRegistry
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+        self.threads = set()
+
+    def emit(self, record):
+        self.messages.append(self.format(record))
+        self.threads.add(threading.current_thread())
+
+
+def make_record(msg="Failed: %s", args=("error",), lineno=10, level=logging.ERROR):
+    return logging.LogRecord("test", level, "file.py", lineno, msg, args, None)
+
+
+def test_rate_limit_filter():
+    clock = Clock()
+    metrics = MetricsRegistry()
+    log_filter = RateLimitFilter(burst=2, window=10, metrics=metrics, clock=clock)
+
+    assert [log_filter.filter(make_record()) for _ in range(4)] == [True, True, False, False]
+    # Other call sites and levels below WARNING are not affected.
+    assert log_filter.filter(make_record(lineno=11))
+    assert all(log_filter.filter(make_record(level=logging.DEBUG)) for _ in range(4))
+    assert metrics.snapshot()["log_suppressed_total"] == 2
+
+    clock.now = 10
+    record = make_record()
+    assert log_filter.filter(record)
+    assert record.getMessage() == (
+        "Failed: error [2 similar message(s) suppressed in the previous 10 seconds]")
+
+
+def test_rate_limit_filter_pending():
+    log_filter = RateLimitFilter(burst=1, metrics=MetricsRegistry())
+    for _ in range(3):
+        log_filter.filter(make_record())
+
+    assert log_filter.pending() == [("file.py", 10, 2)]
+    assert log_filter.pending() == []
+
+
+def test_rate_limit_filter_invalid_burst():
+    with pytest.raises(ValueError):
+        RateLimitFilter(burst=0)
+
+
+def test_queue_handler_drops_when_full():
+    metrics = MetricsRegistry()
+    handler = AsyncQueueHandler(queue.Queue(1), metrics=metrics)
+
+    record = make_record()
+    handler.handle(record)
+    handler.handle(make_record())
+
+    # Records are not formatted when enqueued.
+    assert handler.queue.get_nowait() is record
+    assert record.msg == "Failed: %s"
+    assert metrics.snapshot()["log_dropped_total"] == 1
+
+
+def test_install_async_logging():
+    logger = logging.getLogger("test_install_async_logging")
+    logger.propagate = False
+    handler = ListHandler()
+    logger.addHandler(handler)
+
+    async_logging = install_async_logging(logger, rate_limit=2, metrics=MetricsRegistry())
+    assert install_async_logging(logger) is None
+    assert logger.handlers == [async_logging.handler]
+
+    for i in range(5):
+        logger.error("Failed to publish message: %s", i)
+
+    async_logging.stop()
+
+    assert logger.handlers == [handler]
+    assert handler.messages[:2] == ["Failed to publish message: 0", "Failed to publish message: 1"]
+    assert handler.messages[2].startswith("3 message(s) from ")
+    # Records are written by the writer thread.
+    assert threading.current_thread() not in handler.threads
@@ -0,0 +1,63 @@
+import threading
+
+import pytest
+
+from socket_listener.metrics import Counter, MetricsRegistry, MetricsMonitor
+
+
+def test_counter_concurrent_increments():
+    counter = Counter()
+
+    def work():
+        for _ in range(10000):
+            counter.inc()
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert counter.value == 40000
+
+
+def test_counter_increment_by_amount():
+    counter = Counter()
+    counter.inc(5)
+    counter.inc(0)
+    counter.inc()
+    assert counter.value == 6
+
+    # Large amounts are added at once, e.g., bytes.
+    counter.inc(10 ** 12)
+    assert counter.value == 10 ** 12 + 6
+
+
+def test_registry():
+    metrics = MetricsRegistry()
+    metrics.counter("packets_total", source="10.0.0.1").inc()
+    metrics.counter("packets_total", source="10.0.0.1").inc()
+    metrics.gauge("in_flight").add(3)
+    metrics.gauge("limit", lambda: 10)
+
+    assert metrics.snapshot() == {
+        "in_flight": 3,
+        "limit": 10,
+        "packets_total{source=10.0.0.1}": 2,
+    }
+
+    with pytest.raises(TypeError):
+        metrics.gauge("packets_total", source="10.0.0.1")
+
+    metrics.clear()
+    assert metrics.snapshot() == {}
+
+
+def test_metrics_monitor(caplog):
+    metrics = MetricsRegistry()
+    metrics.gauge("limit").set(5)
+
+    caplog.set_level("INFO")
+    MetricsMonitor(metrics=metrics).operation()
+
+    assert "'limit': 5" in caplog.text
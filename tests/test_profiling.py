@@ -0,0 +1,115 @@
+import os
+import json
+import signal
+import threading
+import urllib.request
+from collections import Counter
+from unittest import mock
+
+import pytest
+
+from socket_listener import receivers
+from socket_listener.health import HealthCheck, HealthServer, IngestStats
+from socket_listener.inflight import InFlight
+from socket_listener.metrics import MetricsRegistry
+from socket_listener.profiling import Profiler, collapsed, sample_stacks, summary
+from socket_listener.receivers import UDPSocketReceiver
+from socket_listener.supervisor import Supervisor
+
+
+def busy_function(stop):
+    while not stop.is_set():
+        sum(range(100))
+
+
+@pytest.fixture
+def busy_thread():
+    stop = threading.Event()
+    thread = threading.Thread(target=busy_function, args=(stop,))
+    thread.start()
+    yield thread
+    stop.set()
+    thread.join()
+
+
+def test_sample_stacks_includes_other_threads(busy_thread):
+    stacks = sample_stacks(duration=0.1, interval=0.001)
+    assert any(any(f.startswith("busy_function ") for f in stack) for stack in stacks)
+
+
+def test_collapsed_and_summary():
+    stacks = Counter({("main", "a", "b"): 3, ("main", "a"): 1})
+
+    assert collapsed(stacks) == "main;a;b 3\nmain;a 1\n"
+
+    text = summary(stacks)
+    assert text.startswith("4 samples.")
+    assert " 75.0%        3  b" in text
+    assert "100.0%        4  main" in text
+
+
+def test_profile_writes_files(tmp_path, busy_thread):
+    profiler = Profiler(tmp_path / "profiles", interval=0.001)
+    paths = profiler.profile(duration=0.1)
+
+    assert sorted(p.suffix for p in paths) == [".collapsed", ".txt", ".txt"]
+    assert all(p.parent == tmp_path / "profiles" for p in paths)
+    assert "busy_function" in paths[0].read_text()
+    assert paths[2].read_text().startswith("Allocations that grew the most")
+
+
+def test_trigger_runs_once_at_a_time(tmp_path):
+    profiler = Profiler(tmp_path, memory=False)
+
+    assert profiler.trigger(duration=0.2)
+    assert not profiler.trigger()
+
+    profiler._thread.join(timeout=5)
+    assert not profiler.running
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def post(port, path):
+    request = urllib.request.Request(f"http://127.0.0.1:{port}{path}", method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, response.read().decode()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode()
+
+
+def test_profile_endpoint(tmp_path):
+    health = HealthCheck(
+        stats=IngestStats(),
+        serving=lambda: True,
+        supervisor=Supervisor(shutdown_server=mock.Mock(), metrics=MetricsRegistry()),
+        in_flight=InFlight(),
+    )
+    profiler = Profiler(tmp_path, memory=False)
+    server = HealthServer(health, host="127.0.0.1", port=0, profiler=profiler)
+    server.start()
+    try:
+        assert post(server.port, "/profile?duration=abc")[0] == 400
+
+        status, body = post(server.port, "/profile?duration=0.1")
+        assert status == 202
+        assert json.loads(body) == dict(started=True)
+
+        profiler._thread.join(timeout=5)
+        assert len(list(tmp_path.iterdir())) == 2
+    finally:
+        server.stop()
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGUSR1"), reason="SIGUSR1 not available.")
+def test_install_profile_handler(tmp_path):
+    receiver = UDPSocketReceiver(port=0, profiler=Profiler(tmp_path, duration=0.1, memory=False))
+
+    previous = receivers.install_profile_handler(receiver)
+    try:
+        os.kill(os.getpid(), signal.SIGUSR1)
+        receiver.profiler._thread.join(timeout=5)
+        assert len(list(tmp_path.iterdir())) == 2
+    finally:
+        signal.signal(signal.SIGUSR1, previous)
+        receiver.server.server_close()
@@ -1,12 +1,14 @@
 import time
+import signal
 import socket
 import threading
 from unittest import mock
 
 import pytest
 
-from socket_listener import receivers
+from socket_listener import capture, receivers
 from socket_listener.sinks import GooglePubSub
+from socket_listener.sinks.base import Sink
 
 
 @pytest.mark.parametrize("protocol", ["UDP"])
@@ -52,3 +54,299 @@ def test_run_not_implemented_error():
     receivers.run(
         protocol="invalid",
     )
+
+
+def test_drain_waits_for_in_flight_packets():
+    published = []
+
+    class SlowSink(Sink):
+        name = "slow"
+        path = "memory"
+
+        def publish(self, packet):
+            time.sleep(0.2)
+            published.append(packet)
+
+    receiver = receivers.UDPSocketReceiver(
+        host="127.0.0.1",
+        port=0,
+        sinks=[SlowSink()],
+        poll_interval=0.01,
+        thread_monitor_delay=0.01
+    )
+
+    receiver_thread = threading.Thread(target=receiver.start)
+    receiver_thread.daemon = True
+    receiver_thread.start()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.sendto(b"This is an UDP packet.", receiver.server.server_address)
+    sock.close()
+
+    time.sleep(0.05)
+
+    report = receiver.drain(timeout=2)
+    receiver_thread.join()
+
+    assert len(published) == 1
+    assert report.completed == 1
+    assert report.abandoned == 0
+    assert report.sinks_abandoned == {"slow": 0}
+
+
+def test_drain_reports_abandoned_packets():
+    receiver = receivers.create(protocol="UDP", port=0, poll_interval=0.01)
+    receiver_thread = threading.Thread(target=receiver.start)
+    receiver_thread.daemon = True
+    receiver_thread.start()
+
+    with receiver.server.in_flight:
+        report = receiver.drain(timeout=0.05)
+
+    receiver_thread.join()
+    assert report.completed == 0
+    assert report.abandoned == 1
+
+
+def test_drain_does_not_block_when_not_serving():
+    receiver = receivers.create(protocol="UDP", port=0)
+    report = receiver.drain(timeout=0.1)
+    assert report.completed == 0
+    assert report.abandoned == 0
+
+    # A receiver that was stopped must not start serving.
+    receiver.start()
+
+
+def test_install_drain_handler(monkeypatch):
+    receiver = mock.Mock()
+    previous = receivers.install_drain_handler(receiver)
+    try:
+        handler = signal.getsignal(signal.SIGTERM)
+        handler(signal.SIGTERM, None)
+
+        # A second SIGTERM must terminate the process as usual.
+        assert signal.getsignal(signal.SIGTERM) is signal.SIG_DFL
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+
+    time.sleep(0.05)
+    receiver.drain.assert_called_once()
+
+
+def test_run_with_emulated_pubsub():
+    rec, thread = receivers.run(
+        daemon_thread=True,
+        port=0,
+        pubsub_emulated=True,
+        pubsub_project="project",
+        pubsub_topic="topic",
+        pubsub_emulated_latency=0,
+        thread_monitor_delay=0.01,
+    )
+
+    assert rec.sinks == ["emulated_pubsub"]
+    rec.shutdown()
+    thread.join()
+
+
+def test_receiver_with_backpressure():
+    received = threading.Event()
+
+    class BlockingSink(Sink):
+        name = "blocking"
+        path = "memory"
+
+        def publish(self, packet):
+            received.set()
+            time.sleep(0.2)
+
+    receiver = receivers.UDPSocketReceiver.build(
+        host="127.0.0.1",
+        port=0,
+        poll_interval=0.01,
+        backpressure_config=dict(max_limit=1, policy="drop"),
+    )
+    receiver.server.update_config(sinks=(BlockingSink(),))
+    controller = receiver.server.controller
+
+    receiver_thread = threading.Thread(target=receiver.start)
+    receiver_thread.daemon = True
+    receiver_thread.start()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.sendto(b"packet 1", receiver.server.server_address)
+    received.wait(timeout=1)
+    sock.sendto(b"packet 2", receiver.server.server_address)
+    sock.close()
+
+    report = receiver.drain(timeout=2)
+    receiver_thread.join()
+
+    assert report.completed == 1
+    assert controller.acquire()
+
+
+def test_run_with_capture(tmp_path):
+    receiver, thread = receivers.run(
+        port=0, capture_dir=str(tmp_path), capture_compress=True, daemon_thread=True
+    )
+
+    assert receiver.sinks == ["capture"]
+    receiver.drain(timeout=1)
+    thread.join(timeout=5)
+
+
+def test_run_with_local_sinks(tmp_path):
+    receiver, thread = receivers.run(
+        port=0,
+        unix_socket=str(tmp_path / "sink.sock"),
+        unix_socket_type="datagram",
+        pipe="-",
+        udp_forward="127.0.0.1:9,127.0.0.1:10",
+        daemon_thread=True,
+    )
+
+    assert receiver.sinks == ["unix_socket", "pipe", "udp_forward"]
+    report = receiver.drain(timeout=1)
+    thread.join(timeout=5)
+    assert report.sinks_abandoned == {"unix_socket": 0, "pipe": 0, "udp_forward": 0}
+
+
+def test_run_with_publisher_processes(tmp_path):
+    receiver, thread = receivers.run(
+        port=0,
+        poll_interval=0.01,
+        capture_dir=str(tmp_path),
+        publisher_processes=1,
+        publisher_ring_size=1,
+        daemon_thread=True,
+    )
+
+    assert receiver.sinks == ["process"]
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.sendto(b"!AIVDM,1,1,,A,13prmQ?P001EOA4OC3h@u?vl20SR,0*7F", receiver.server.server_address)
+    sock.close()
+
+    deadline = time.monotonic() + 5
+    while receiver.server.stats.last_published is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    report = receiver.drain(timeout=5)
+    thread.join(timeout=5)
+
+    assert report.sinks_abandoned == {"process": 0}
+    [segment] = capture.list_segments(tmp_path)
+    with capture.CaptureReader(segment) as reader:
+        assert len(list(reader)) == 1
+
+
+def test_run_with_checksum_validation():
+    receiver, thread = receivers.run(
+        port=0,
+        pubsub_emulated=True,
+        pubsub_emulated_latency=0,
+        validate_checksums=True,
+        invalid_pubsub_topic="invalid",
+        daemon_thread=True,
+    )
+
+    [invalid_sink] = receiver.config.validator.sinks
+    assert invalid_sink.path.endswith("/topics/invalid")
+
+    report = receiver.drain(timeout=1)
+    thread.join(timeout=5)
+    assert report.sinks_abandoned == {"emulated_pubsub": 0}
+
+
+def test_run_with_routes(tmp_path):
+    routes = tmp_path / "routes.yaml"
+    routes.write_text(
+        "- name: static\n"
+        "  message_types: [5]\n"
+        "  sinks:\n"
+        "    emulated_pubsub: {topic_id: static, batch_size: 10}\n"
+    )
+
+    receiver, thread = receivers.run(
+        port=0,
+        pubsub_emulated=True,
+        pubsub_emulated_latency=0,
+        pubsub_topic="positions",
+        routes=str(routes),
+        daemon_thread=True,
+    )
+
+    [route] = receiver.config.router.routes
+    [static_sink] = route.sinks
+    assert static_sink.path.endswith("/topics/static")
+    assert static_sink._publishers[0].batch_settings.max_messages == 10
+
+    report = receiver.drain(timeout=1)
+    thread.join(timeout=5)
+    assert report.sinks_abandoned == {"emulated_pubsub": 0}
+
+
+def receive(receiver, *datagrams):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    for datagram in datagrams:
+        sock.sendto(datagram, receiver.server.server_address)
+        receiver.server.handle_request()
+
+    sock.close()
+
+
+def test_truncated_datagrams(monkeypatch):
+    registry = receivers.metrics_registry.__class__()
+    monkeypatch.setattr(receivers, "metrics_registry", registry)
+
+    sink = mock.Mock(spec=Sink)
+    receiver = receivers.UDPSocketReceiver(
+        host="127.0.0.1", port=0, sinks=[sink], max_packet_size=16, thread_monitor_delay=None
+    )
+    receiver.server.block_on_close = True
+
+    receive(receiver, b"0123456789\nabcdefghij\n", b"0123456789abcdefghij", b"short\n")
+    receiver.server.server_close()
+
+    # The incomplete message is dropped, and nothing is left of the second datagram.
+    assert [c[0][0].data for c in sink.publish.call_args_list] == [b"0123456789\n", b"short\n"]
+    assert receiver.server.in_flight.count == 0
+
+    listener = "{}:{}".format(*receiver.server.server_address)
+    key = f"receiver_truncated_total{{listener={listener},source=127.0.0.1}}"
+    assert registry.snapshot()[key] == 2
+
+
+@pytest.mark.parametrize(
+    "limit, expected_size", [(65535, 4096 if receivers.RECV_FLAGS else 32), (24, 24)]
+)
+def test_adaptive_packet_size(limit, expected_size):
+    sink = mock.Mock(spec=Sink)
+    receiver = receivers.UDPSocketReceiver(
+        host="127.0.0.1",
+        port=0,
+        sinks=[sink],
+        max_packet_size=16,
+        adaptive_packet_size=True,
+        max_packet_size_limit=limit,
+        thread_monitor_delay=None,
+    )
+    receiver.server.block_on_close = True
+
+    receive(receiver, b"x" * 3000 + b"\n", b"x" * 3000 + b"\n")
+    receiver.server.server_close()
+
+    assert receiver.server.max_packet_size == expected_size
+
+
+def test_provider_name_too_long():
+    with pytest.raises(ValueError):
+        receivers.UDPSocketReceiver.build(host="127.0.0.1", port=0, provider_name="x" * 256)
+
+    receiver = receivers.UDPSocketReceiver.build(host="127.0.0.1", port=0)
+    with pytest.raises(ValueError):
+        receiver.reload(provider_name="x" * 256)
+
+    assert receiver.config.provider_name != "x" * 256
+    receiver.server.server_close()
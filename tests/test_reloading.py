@@ -0,0 +1,161 @@
+import time
+import socket
+import threading
+
+import yaml
+
+from socket_listener import receivers
+from socket_listener.capture import CaptureReader, list_segments
+from socket_listener.reloading import ConfigReloader
+from socket_listener.sinks.base import Sink
+
+
+class BlockingSink(Sink):
+    name = "blocking"
+    path = "memory"
+
+    def __init__(self):
+        self.received = threading.Event()
+        self.release = threading.Event()
+        self.flushed = threading.Event()
+
+    def publish(self, packet):
+        self.received.set()
+        self.release.wait(timeout=5)
+
+    def flush(self, timeout=None):
+        self.flushed.set()
+        return 0
+
+
+class FakeReceiver:
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+
+    def reload(self, configs=None, **changes):
+        if self.error is not None:
+            raise self.error
+
+        self.calls.append((configs, changes))
+
+
+def write_config(path, **options):
+    path.write_text(yaml.safe_dump(options))
+
+
+def test_reload_swaps_sinks_after_in_flight_packets(tmp_path):
+    receiver = receivers.UDPSocketReceiver.build(host="127.0.0.1", port=0, poll_interval=0.01)
+    previous_sink = BlockingSink()
+    receiver.server.update_config(sinks=(previous_sink,))
+
+    receiver_thread = threading.Thread(target=receiver.start, daemon=True)
+    receiver_thread.start()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.sendto(b"packet 1", receiver.server.server_address)
+    assert previous_sink.received.wait(timeout=5)
+
+    configs = receivers.sinks_configs(capture_dir=str(tmp_path))
+    reload_thread = threading.Thread(
+        target=receiver.reload, args=(configs,), kwargs=dict(provider_name="new")
+    )
+    reload_thread.start()
+
+    # The socket is not rebound and new packets use the new configuration.
+    deadline = time.monotonic() + 5
+    while receiver.config.provider_name != "new" and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    last_received = receiver.server.stats.last_received
+    sock.sendto(b"packet 2", receiver.server.server_address)
+    sock.close()
+
+    # The previous sinks are flushed once the packet in flight was published.
+    assert not previous_sink.flushed.wait(timeout=0.1)
+    previous_sink.release.set()
+    reload_thread.join(timeout=5)
+    assert previous_sink.flushed.is_set()
+
+    deadline = time.monotonic() + 5
+    while receiver.server.stats.last_received == last_received and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    receiver.drain(timeout=2)
+    receiver_thread.join(timeout=5)
+
+    (segment,) = list_segments(tmp_path)
+    with CaptureReader(segment) as reader:
+        assert [bytes(r.data) for r in reader] == [b"packet 2"]
+
+
+def test_reload_server_options_keeps_sinks():
+    receiver = receivers.UDPSocketReceiver.build(host="127.0.0.1", port=0)
+    sinks = receiver.config.sinks
+
+    receiver.reload(provider_name="new", delimiter="\r\n")
+
+    assert receiver.config.provider_name == "new"
+    assert receiver.config.delimiter == "\r\n"
+    assert receiver.config.sinks is sinks
+    receiver.server.server_close()
+
+
+def test_config_reloader(tmp_path):
+    path = tmp_path / "config.yaml"
+    write_config(path, port=10110, provider_name="old", pubsub=False)
+
+    receiver = FakeReceiver()
+    reloader = ConfigReloader(receiver, path, options=dict(port=10110, provider_name="old"))
+    assert not reloader.reload()
+
+    write_config(path, port=10111, provider_name="new", capture_dir=str(tmp_path))
+    assert reloader.reload()
+
+    ((configs, changes),) = receiver.calls
+    assert changes == dict(provider_name="new")
+    assert configs["sinks_config"]["capture"]["directory"] == str(tmp_path)
+
+    # Only changes to server options keep the sinks.
+    write_config(path, port=10111, provider_name="newer", capture_dir=str(tmp_path))
+    assert reloader.reload()
+    assert receiver.calls[-1] == (None, dict(provider_name="newer"))
+
+
+def test_config_reloader_keeps_config_on_error(tmp_path):
+    path = tmp_path / "config.yaml"
+    write_config(path, provider_name="old")
+
+    receiver = FakeReceiver(error=ValueError("invalid"))
+    reloader = ConfigReloader(receiver, path, options={})
+
+    path.write_text("provider_name: [")
+    assert not reloader.reload()
+
+    write_config(path, provider_name="new")
+    assert not reloader.reload()
+
+    # Failed changes are retried on the next reload.
+    receiver.error = None
+    assert reloader.reload()
+    assert receiver.calls == [(None, dict(provider_name="new"))]
+
+
+def test_config_reloader_watches_file(tmp_path):
+    path = tmp_path / "config.yaml"
+    write_config(path, provider_name="old")
+
+    receiver = FakeReceiver()
+    reloader = ConfigReloader(receiver, path, options={}, delay=0.01)
+    reloader.start()
+
+    write_config(path, provider_name="new", max_packet_size=8192)
+
+    deadline = time.monotonic() + 5
+    while not receiver.calls and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    reloader.stop()
+    reloader.join(timeout=5)
+
+    assert receiver.calls == [(None, dict(provider_name="new", max_packet_size=8192))]
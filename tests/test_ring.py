@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from socket_listener.ring import RingBuffer
+
+
+@pytest.fixture
+def ring():
+    ring = RingBuffer(1024)
+    yield ring
+    ring.close()
+
+
+def test_put_get(ring):
+    consumer = RingBuffer(name=ring.name)
+    assert consumer.get() is None
+
+    assert ring.put(b"first")
+    assert ring.put(b"")
+    assert ring.used == 4 + 5 + 4
+
+    assert consumer.get() == b"first"
+    assert consumer.get() == b""
+    assert consumer.get() is None
+    assert ring.empty
+    consumer.close()
+
+
+def test_records_wrap_around(ring):
+    rng = random.Random(0)
+    written, read = [], []
+    for _ in range(5000):
+        record = rng.randbytes(rng.randrange(300))
+        if ring.put(record):
+            written.append(record)
+
+        if rng.random() < 0.6 and (record := ring.get()) is not None:
+            read.append(record)
+
+    while (record := ring.get()) is not None:
+        read.append(record)
+
+    assert read == written
+    assert len(written) > 1000
+
+
+def test_full(ring):
+    record = bytes(200)
+    while ring.put(record):
+        pass
+
+    assert ring.used > ring.capacity - len(record) - 4
+    assert ring.get() == record
+    assert ring.put(record)
+
+
+def test_invalid_sizes(ring):
+    with pytest.raises(ValueError):
+        ring.put(bytes(ring.capacity // 2))
+
+    with pytest.raises(ValueError):
+        RingBuffer(10)
+
+
+def test_close():
+    ring = RingBuffer(1024)
+    ring.close()
+    assert ring.closed
+    assert ring.used == 0
@@ -0,0 +1,128 @@
+from unittest import mock
+
+import pytest
+
+from socket_listener import synthetic
+from socket_listener.metrics import MetricsRegistry
+from socket_listener.packet import Packet
+from socket_listener.routing import Route, Router, load_routes, message_type_char, parse_sentence
+from socket_listener.sinks.base import Sink
+
+POSITION = b"!AIVDM,1,1,,A,13m0Nj01C@WPIfR1>5d0phnd00SN,0*44"
+OWN_POSITION = b"!AIVDO,1,1,,A,13m0Nj01C@WPIfR1>5d0phnd00SN,0*46"
+STATIC_1 = b"!AIVDM,2,1,2,B,569@?q00000091Ho@00HDUPTtpOF222222222216>@DB45Vh0<0hCiQBA2@C,0*42"
+STATIC_2 = b"!AIVDM,2,2,2,B,88888888880,2*25"
+TAGBLOCK = b"\\s:rMT7892,c:1749945745*45\\"
+
+
+def sink(name):
+    return mock.Mock(spec=Sink, name=name)
+
+
+def published(s):
+    return [c[0][0].data for c in s.publish.call_args_list]
+
+
+@pytest.mark.parametrize(
+    "line, expected",
+    [
+        pytest.param(POSITION, (b"AIVDM", b"1", False), id="single-part"),
+        pytest.param(TAGBLOCK + POSITION, (b"AIVDM", b"1", False), id="tagblock"),
+        pytest.param(STATIC_1, (b"AIVDM", b"5", False), id="first-part"),
+        pytest.param(STATIC_2, (b"AIVDM", b"8", True), id="continuation"),
+        pytest.param(b"$GPGLL,4916.45,N,12311.12,W,225444,A*31", (b"GPGLL", b"", False), id="gps"),
+        pytest.param(b"garbage", (b"arbage", b"", False), id="garbage"),
+    ],
+)
+def test_parse_sentence(line, expected):
+    assert parse_sentence(line) == expected
+
+
+@pytest.mark.parametrize("message_type", [1, 5, 24, 27, 63])
+def test_message_type_char(message_type):
+    payload, _ = synthetic.armor(*synthetic.pack_bits([(message_type, 6)]))
+    assert message_type_char(message_type) == payload.encode()
+
+
+def test_message_type_char_invalid():
+    with pytest.raises(ValueError):
+        message_type_char(0)
+
+
+def test_route_by_content():
+    positions, static, default = sink("positions"), sink("static"), sink("default")
+    metrics = MetricsRegistry()
+    router = Router(
+        [
+            Route("positions", sinks=[positions], message_types=[1, 2, 3], talkers=["aivdm"]),
+            Route("static", sinks=[static], message_types=[5]),
+        ],
+        default_sinks=[default],
+        metrics=metrics,
+    )
+
+    data = b"\n".join([POSITION, STATIC_1, STATIC_2, OWN_POSITION, TAGBLOCK + POSITION, b""])
+    packet = Packet(data, source_host="10.0.0.1")
+    for s, routed in router.route(packet):
+        assert routed.time == packet.time
+        assert routed.source_host == packet.source_host
+        s.publish(routed)
+
+    assert published(positions) == [b"\n".join([POSITION, TAGBLOCK + POSITION])]
+    assert published(static) == [b"\n".join([STATIC_1, STATIC_2])]
+    assert published(default) == [OWN_POSITION]
+
+    assert metrics.snapshot() == {
+        "routing_packets_total{route=default}": 1,
+        "routing_packets_total{route=positions}": 1,
+        "routing_packets_total{route=static}": 1,
+    }
+
+
+def test_route_single_target_does_not_copy_packet():
+    positions = sink("positions")
+    router = Router([Route("positions", sinks=[positions], message_types=[1])])
+
+    packet = Packet(POSITION + b"\n" + POSITION)
+    assert router.route(packet) == [(positions, packet)]
+
+
+def test_route_by_packet_attributes():
+    spire, local, default = sink("spire"), sink("local"), sink("default")
+    router = Router(
+        [
+            Route("spire", sinks=[spire], providers=["spire"]),
+            Route("local", sinks=[local], sources=["127.0.0.1"]),
+        ],
+        default_sinks=[default],
+        metrics=MetricsRegistry(),
+    )
+
+    packet = Packet(POSITION, source_name="spire", source_host="127.0.0.1")
+    assert router.route(packet) == [(spire, packet), (local, packet)]
+
+    packet = Packet(POSITION, source_name="orbcomm", source_host="10.0.0.1")
+    assert router.route(packet) == [(default, packet)]
+
+
+def test_route_without_default_sinks_drops_messages():
+    router = Router([Route("static", sinks=[sink("static")], message_types=[5])])
+    assert router.route(Packet(POSITION)) == []
+
+
+def test_load_routes(tmp_path):
+    path = tmp_path / "routes.yaml"
+    path.write_text(
+        "- name: static\n"
+        "  message_types: [5]\n"
+        "  sinks:\n"
+        "    google_pubsub: {topic_id: static}\n"
+    )
+
+    assert load_routes(path) == [
+        dict(name="static", message_types=[5], sinks=dict(google_pubsub=dict(topic_id="static")))
+    ]
+
+    path.write_text("name: static")
+    with pytest.raises(ValueError):
+        load_routes(path)
@@ -0,0 +1,114 @@
+import threading
+from unittest import mock
+
+import pytest
+from google.api_core.exceptions import PermissionDenied
+
+from socket_listener.handlers import UDPRequestHandler
+from socket_listener.metrics import MetricsRegistry
+from socket_listener.receivers import UDPSocketReceiver
+from socket_listener.sinks.base import SinkError
+from socket_listener.supervisor import Health, Supervisor
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+def test_first_error_shuts_down_server_immediately():
+    shutdown = threading.Event()
+    supervisor = Supervisor(shutdown_server=shutdown.set, metrics=MetricsRegistry())
+    supervisor.start()
+
+    error = PermissionDenied("Permission denied for publishing")
+    supervisor.report(error)
+
+    assert shutdown.wait(timeout=1)
+    assert supervisor.failed
+    assert supervisor.health == Health.FAILED
+    assert supervisor.exceptions == {PermissionDenied: error}
+
+
+def test_error_budget_and_window():
+    clock = Clock()
+    metrics = MetricsRegistry()
+    shutdown = mock.Mock()
+    supervisor = Supervisor(
+        shutdown_server=shutdown, error_budget=2, error_window=10, metrics=metrics, clock=clock
+    )
+    assert supervisor.health == Health.HEALTHY
+
+    supervisor.report(SinkError())
+    supervisor.report(SinkError())
+    assert supervisor.health == Health.DEGRADED
+
+    # Errors out of the window are forgotten.
+    clock.now = 11
+    assert supervisor.health == Health.HEALTHY
+
+    supervisor.report(SinkError())
+    supervisor.report(SinkError())
+    assert not supervisor.failed
+
+    supervisor.report(SinkError())
+    assert supervisor.wait(timeout=0)
+    assert metrics.snapshot() == {"supervisor_errors_total": 5}
+
+
+def test_stop_does_not_shut_down_server():
+    shutdown = mock.Mock()
+    supervisor = Supervisor(shutdown_server=shutdown, metrics=MetricsRegistry())
+    supervisor.start()
+    supervisor.stop()
+    supervisor._thread.join(timeout=1)
+
+    assert not supervisor._thread.is_alive()
+    shutdown.assert_not_called()
+
+
+def test_invalid_error_budget():
+    with pytest.raises(ValueError):
+        Supervisor(shutdown_server=mock.Mock(), error_budget=-1)
+
+
+def test_handlers_stop_publishing_after_failure():
+    class FailingSink:
+        calls = 0
+
+        def publish(self, packet):
+            self.calls += 1
+            raise SinkError("Sink failed")
+
+    sink = FailingSink()
+    receiver = UDPSocketReceiver(sinks=[sink], port=0, error_budget=1)
+    address = ("127.0.0.1", 10110)
+
+    for _ in range(4):
+        UDPRequestHandler((b"data", None), address, receiver.server)
+
+    assert receiver.supervisor.failed
+    assert sink.calls == 2
+
+    receiver.server.server_close()
+
+
+def test_receiver_shuts_down_on_sink_error():
+    class FailingSink:
+        name = "failing"
+        path = "nowhere"
+
+        def publish(self, packet):
+            raise SinkError("Sink failed")
+
+    receiver = UDPSocketReceiver(sinks=[FailingSink()], port=0)
+    thread = threading.Thread(target=receiver.start, daemon=True)
+    thread.start()
+
+    UDPRequestHandler((b"data", None), ("127.0.0.1", 10110), receiver.server)
+
+    thread.join(timeout=5)
+    assert not thread.is_alive()
@@ -0,0 +1,88 @@
+import re
+from itertools import islice
+
+import pytest
+
+from socket_listener import synthetic
+from socket_listener.synthetic import SyntheticAIS
+from socket_listener.utils import chunked_nmea_it
+
+SENTENCE_REGEX = re.compile(
+    r"^(?:\\(?P<tagblock>[^*]*)\*(?P<tagblock_checksum>[0-9A-F]{2})\\)?"
+    r"!(?P<content>AIVDM,(?P<total>\d),(?P<part>\d),\d?,[AB],(?P<payload>[^,]*),(?P<fill>\d))"
+    r"\*(?P<checksum>[0-9A-F]{2})$"
+)
+
+
+def parse(sentence):
+    match = SENTENCE_REGEX.match(sentence)
+    assert match, sentence
+    assert synthetic.checksum(match["content"]) == match["checksum"]
+    if match["tagblock"] is not None:
+        assert synthetic.checksum(match["tagblock"]) == match["tagblock_checksum"]
+
+    return match
+
+
+def test_checksum_matches_real_sentence():
+    assert synthetic.checksum("AIVDM,1,1,,,369KwSP000<G`Kh0iukScOv00000,0") == "12"
+    assert synthetic.checksum("s:117,c:1668046497") == "0A"
+
+
+def test_armor_roundtrip():
+    bits, length = synthetic.pack_bits([(1, 6), (0, 2), (123456789, 30), (-5, 8)])
+    payload, fill = synthetic.armor(bits, length)
+
+    assert (len(payload), fill) == (8, 2)
+    assert synthetic.dearmor(payload, fill) == (bits, length)
+
+
+def test_messages_are_valid():
+    generator = SyntheticAIS(fleet_size=100, multipart_ratio=0.2, seed=0)
+    messages = list(islice(generator.messages(), 100))
+
+    multipart = [m for m in messages if len(m) > 1]
+    assert len(multipart) == 20
+
+    for message in messages:
+        parts = [parse(s) for s in message]
+        payload = "".join(p["payload"] for p in parts)
+        _, length = synthetic.dearmor(payload, int(parts[-1]["fill"]))
+
+        assert length == (424 if len(message) > 1 else 168)
+        assert all(int(p["total"]) == len(message) for p in parts)
+
+
+def test_messages_cycle_over_templates():
+    generator = SyntheticAIS(fleet_size=3, seed=0)
+    assert list(islice(generator.messages(), 6)) == generator.templates * 2
+
+
+def test_tagblocks():
+    generator = SyntheticAIS(fleet_size=10, multipart_ratio=1, tagblocks=True, clock=lambda: 1e9)
+    lines = list(islice(generator.lines(), 4))
+    tagblocks = [parse(line)["tagblock"] for line in lines]
+
+    assert tagblocks == [
+        "g:1-2-1,s:synthetic,c:1000000000",
+        "g:2-2-1",
+        "g:1-2-2,s:synthetic,c:1000000000",
+        "g:2-2-2",
+    ]
+
+    # Multipart messages are not split by the NMEA splitter.
+    packets = list(chunked_nmea_it(lines, max_lines_per_packet=3))
+    assert [len(p) for p in packets] == [2, 2]
+
+
+def test_lines_limit_does_not_cut_multipart_messages():
+    generator = SyntheticAIS(fleet_size=10, multipart_ratio=1)
+
+    assert len(list(generator.lines(limit=5))) == 4
+    assert len(list(generator.lines(limit=6))) == 6
+
+
+@pytest.mark.parametrize("kwargs", [dict(fleet_size=0), dict(multipart_ratio=1.5)])
+def test_invalid_arguments(kwargs):
+    with pytest.raises(ValueError):
+        SyntheticAIS(**kwargs)
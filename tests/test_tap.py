@@ -0,0 +1,198 @@
+import os
+import json
+import signal
+import socket
+import urllib.error
+import urllib.request
+from unittest import mock
+
+import pytest
+
+from socket_listener import receivers
+from socket_listener.handlers import UDPRequestHandler
+from socket_listener.health import HealthCheck, HealthServer, IngestStats
+from socket_listener.inflight import InFlight
+from socket_listener.metrics import MetricsRegistry
+from socket_listener.packet import Packet
+from socket_listener.receivers import UDPSocketReceiver
+from socket_listener.supervisor import Supervisor
+from socket_listener.tap import FileOutput, MemoryOutput, PacketTap, UdpOutput, create_output
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+def create_packet(data=b"!AIVDM,1\n!AIVDM,2\n", source_name="provider"):
+    return Packet(
+        data, protocol="UDP", source_host="1.2.3.4", source_port=5, source_name=source_name
+    )
+
+
+def test_sample_every():
+    metrics = MetricsRegistry()
+    output = MemoryOutput(capacity=10)
+    tap = PacketTap([output], every=3, metrics=metrics)
+
+    for i in range(7):
+        tap.offer(create_packet(data=str(i).encode()))
+
+    assert [p["messages"] for p in tap.recent()] == [["0"], ["3"], ["6"]]
+    assert metrics.snapshot()["tap_sampled_total"] == 3
+
+
+def test_sample_rate_per_provider():
+    clock = Clock()
+    tap = PacketTap([MemoryOutput()], rate=2, clock=clock, metrics=MetricsRegistry())
+
+    for _ in range(5):
+        tap.offer(create_packet(source_name="a"))
+        tap.offer(create_packet(source_name="b"))
+
+    assert len(tap.recent()) == 4
+
+    clock.now = 0.5
+    for _ in range(5):
+        tap.offer(create_packet(source_name="a"))
+
+    assert len(tap.recent()) == 5
+
+
+def test_sample_fractional_rate():
+    clock = Clock()
+    tap = PacketTap([MemoryOutput()], rate=0.5, clock=clock, metrics=MetricsRegistry())
+
+    for second in range(100):
+        clock.now = second
+        tap.offer(create_packet())
+
+    assert len(tap.recent()) == 50
+
+
+def test_disabled_tap_samples_nothing():
+    tap = PacketTap([MemoryOutput()], every=1, enabled=False, metrics=MetricsRegistry())
+    tap.offer(create_packet())
+    assert tap.recent() == []
+
+    tap.toggle()
+    tap.offer(create_packet())
+    assert len(tap.recent()) == 1
+
+
+def test_configure():
+    tap = PacketTap([], metrics=MetricsRegistry())
+    assert (tap.every, tap.rate) == (1000, None)
+
+    tap.configure(rate=10)
+    assert (tap.every, tap.rate) == (None, 10)
+
+    tap.configure(enabled=False)
+    assert (tap.enabled, tap.rate) == (False, 10)
+
+    with pytest.raises(ValueError):
+        tap.configure(every=1, rate=1)
+
+    with pytest.raises(ValueError):
+        tap.configure(every=0)
+
+
+def test_create_output(tmp_path):
+    assert isinstance(create_output("memory:5"), MemoryOutput)
+
+    output = create_output("udp:127.0.0.1:9")
+    assert isinstance(output, UdpOutput)
+    output.close()
+
+    output = create_output(str(tmp_path / "tap.log"))
+    assert isinstance(output, FileOutput)
+    output.close()
+
+
+def test_file_output(tmp_path):
+    path = tmp_path / "tap.log"
+    tap = PacketTap([create_output(f"file:{path}")], every=1, metrics=MetricsRegistry())
+    tap.offer(create_packet())
+    tap.close()
+
+    # Packets offered after closing are ignored.
+    tap.outputs[0].write(create_packet())
+
+    lines = path.read_text().splitlines()
+    assert len(lines) == 2
+    assert lines[0].endswith("provider 1.2.3.4:5 !AIVDM,1")
+
+
+def test_udp_output():
+    listener = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.settimeout(5)
+
+    output = UdpOutput(listener.getsockname())
+    output.write(create_packet())
+    output.close()
+
+    assert listener.recv(1024) == b"!AIVDM,1\n!AIVDM,2\n"
+    listener.close()
+
+
+def request(port, path, method="GET"):
+    request = urllib.request.Request(f"http://127.0.0.1:{port}{path}", method=method)
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, response.read().decode()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode()
+
+
+def test_tap_endpoint():
+    health = HealthCheck(
+        stats=IngestStats(),
+        serving=lambda: True,
+        supervisor=Supervisor(shutdown_server=mock.Mock(), metrics=MetricsRegistry()),
+        in_flight=InFlight(),
+    )
+    tap = PacketTap([MemoryOutput()], enabled=False, metrics=MetricsRegistry())
+    server = HealthServer(health, host="127.0.0.1", port=0, tap=tap)
+    server.start()
+    try:
+        assert request(server.port, "/tap?every=0", method="POST")[0] == 400
+
+        status, body = request(server.port, "/tap?enabled=true&every=1", method="POST")
+        assert status == 200
+        assert json.loads(body) == dict(enabled=True, every=1, rate=None, outputs=["memory"])
+
+        tap.offer(create_packet())
+        status, body = request(server.port, "/tap")
+        assert status == 200
+        assert json.loads(body)["packets"][0]["messages"] == ["!AIVDM,1", "!AIVDM,2"]
+    finally:
+        server.stop()
+
+
+def test_receiver_tap():
+    tap = PacketTap([MemoryOutput()], every=1, metrics=MetricsRegistry())
+    receiver = UDPSocketReceiver(port=0, host="127.0.0.1", tap=tap)
+
+    UDPRequestHandler((b"!AIVDM,1", None), ("1.2.3.4", 5), receiver.server)
+    receiver.shutdown()
+
+    assert tap.recent()[0]["messages"] == ["!AIVDM,1"]
+    assert not tap.enabled
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGUSR2"), reason="SIGUSR2 not available.")
+def test_install_tap_handler():
+    tap = PacketTap([MemoryOutput()], metrics=MetricsRegistry())
+    receiver = UDPSocketReceiver(port=0, tap=tap)
+
+    previous = receivers.install_tap_handler(receiver)
+    try:
+        os.kill(os.getpid(), signal.SIGUSR2)
+        assert not tap.enabled
+    finally:
+        signal.signal(signal.SIGUSR2, previous)
+        receiver.server.server_close()
@@ -6,6 +6,7 @@ import pytest
 
 from socket_listener import transmitters
 from socket_listener.assets import get_sample_data_path
+from socket_listener.utils import MULTIPART_REGEX
 from tests.conftest import UDPTestHandler
 
 NMEA_FILEPATH = get_sample_data_path("nmea.txt")
@@ -79,3 +80,270 @@ def test_run_not_implemented_error():
         protocol="invalid",
         path="asd"
     )
+
+
+@pytest.mark.parametrize("speed", [0, 10])
+def test_replay_capture(tmp_path, speed):
+    from socket_listener.capture import CaptureWriter
+
+    writer = CaptureWriter(tmp_path)
+    for i in range(5):
+        # 100 ms between datagrams.
+        writer.write(f"datagram {i}".encode(), time_ns=i * 100_000_000, host="10.0.0.1")
+
+    writer.close()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(5)
+    _, port = sock.getsockname()
+
+    transmitter = transmitters.create(host="127.0.0.1", port=port, capture=True, speed=speed)
+
+    start = time.perf_counter()
+    transmitter.start(tmp_path)
+    elapsed = time.perf_counter() - start
+
+    received = [sock.recv(1024) for _ in range(5)]
+    sock.close()
+
+    assert received == [f"datagram {i}".encode() for i in range(5)]
+    if speed:
+        # 400 ms of original timing, replayed 10 times faster.
+        assert 0.04 <= elapsed < 0.4
+
+
+def test_replay_first_n_across_segments(tmp_path):
+    from socket_listener.capture import CaptureWriter
+
+    writer = CaptureWriter(tmp_path, segment_size=1)
+    for i in range(5):
+        writer.write(f"datagram {i}".encode(), time_ns=i)
+
+    writer.close()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(0.2)
+    _, port = sock.getsockname()
+
+    transmitter = transmitters.create(
+        host="127.0.0.1", port=port, capture=True, speed=0, first_n=3
+    )
+    transmitter.start(tmp_path)
+
+    received = []
+    with pytest.raises(socket.timeout):
+        while True:
+            received.append(sock.recv(1024))
+
+    sock.close()
+
+    assert transmitter.sent == 3
+    assert received == [f"datagram {i}".encode() for i in range(3)]
+
+
+def test_first_n_across_files(tmp_path):
+    for name in ("a.txt", "b.txt"):
+        (tmp_path / name).write_text("\n".join(f"!AIVDM,{name},{i}" for i in range(5)))
+
+    transmitter = transmitters.create(
+        host="127.0.0.1", port=9, first_n=7, delay=0, chunk_size=2, progress=False
+    )
+    transmitter.start(tmp_path)
+
+    assert transmitter.sent == 7
+
+
+def test_replay_origin(tmp_path):
+    from socket_listener.capture import CaptureWriter
+
+    writer = CaptureWriter(tmp_path)
+    writer.write(b"datagram", time_ns=1_200_000_000)
+    writer.close()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    _, port = sock.getsockname()
+
+    # The record is sent 200 ms after the origin, as in the original timing.
+    transmitter = transmitters.create(
+        host="127.0.0.1", port=port, capture=True, replay_origin=(1_000_000_000, time.time())
+    )
+
+    start = time.perf_counter()
+    transmitter.start(tmp_path)
+    elapsed = time.perf_counter() - start
+    sock.close()
+
+    assert 0.15 <= elapsed < 1
+
+
+def test_multiprocess_capture_shares_replay_origin(tmp_path):
+    from socket_listener.capture import CaptureWriter, list_segments
+
+    writer = CaptureWriter(tmp_path, segment_size=1)
+    for i in range(4):
+        writer.write(f"datagram {i}".encode(), time_ns=(i + 1) * 100_000_000)
+
+    writer.close()
+    assert len(list_segments(tmp_path)) == 4
+
+    transmitter = transmitters.MultiProcessTransmitter(2, host="127.0.0.1", capture=True)
+    shards = transmitter._shards(tmp_path)
+
+    origins = {kwargs["replay_origin"] for _, kwargs in shards}
+    assert len(origins) == 1
+    ((first_ns, _),) = origins
+    assert first_ns == 100_000_000
+
+
+def test_invalid_speed():
+    with pytest.raises(ValueError):
+        transmitters.create(capture=True, speed=-1)
+
+
+@pytest.mark.parametrize("rate, splitter", [(None, "nmea"), (1000, "fixed")])
+def test_synthetic(rate, splitter):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(5)
+    _, port = sock.getsockname()
+
+    transmitter, thread = transmitters.run(
+        path=None,
+        host="127.0.0.1",
+        port=port,
+        synthetic=True,
+        synthetic_tagblocks=True,
+        splitter=splitter,
+        chunk_size=10,
+        first_n=100,
+        rate=rate,
+    )
+
+    start = time.perf_counter()
+    thread.join(timeout=5)
+    elapsed = time.perf_counter() - start
+
+    assert 99 <= transmitter.sent <= 100
+
+    lines = []
+    while len(lines) < transmitter.sent:
+        lines.extend(sock.recv(4096).decode().splitlines())
+
+    sock.close()
+
+    assert all("!AIVDM" in line for line in lines)
+    if rate:
+        assert elapsed >= 0.09
+
+
+def test_synthetic_nmea_bytes_splitter():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(5)
+    _, port = sock.getsockname()
+
+    transmitter, thread = transmitters.run(
+        path=None,
+        host="127.0.0.1",
+        port=port,
+        synthetic=True,
+        synthetic_multipart_ratio=0.5,
+        splitter="nmea-bytes",
+        datagram_size=300,
+        chunk_size=100,
+        first_n=100,
+    )
+    thread.join(timeout=5)
+
+    datagrams = []
+    received = 0
+    while received < transmitter.sent:
+        datagrams.append(sock.recv(4096))
+        received += len(datagrams[-1].splitlines())
+
+    sock.close()
+
+    for datagram in datagrams:
+        last = MULTIPART_REGEX.match(datagram.decode().splitlines()[-1])
+        # Multipart messages are not split across datagrams.
+        assert last.group("part") == last.group("total")
+        assert len(datagram) <= 300 or int(last.group("total")) > 1
+
+
+def test_invalid_datagram_size():
+    with pytest.raises(ValueError):
+        transmitters.create(splitter="bytes", datagram_size=0)
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 7, 1000])
+def test_byte_ranges_yield_every_line_once(n):
+    ranges = transmitters.split_byte_ranges(NMEA_FILEPATH, n)
+    lines = [line for r in ranges for line in transmitters.read_byte_range(NMEA_FILEPATH, *r)]
+
+    assert lines == NMEA_FILEPATH.read_bytes().splitlines(keepends=True)
+
+
+def receive_lines(sock, count):
+    lines = []
+    while len(lines) < count:
+        lines.extend(sock.recv(65536).decode().splitlines())
+
+    return lines
+
+
+@pytest.mark.parametrize("synthetic", [True, False])
+def test_multiprocess(synthetic):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(10)
+    _, port = sock.getsockname()
+
+    transmitter, thread = transmitters.run(
+        path=NMEA_FILEPATH,
+        host="127.0.0.1",
+        port=port,
+        synthetic=synthetic,
+        processes=3,
+        chunk_size=10,
+        first_n=100,
+        rate=10000,
+    )
+
+    assert isinstance(transmitter, transmitters.MultiProcessTransmitter)
+    thread.join(timeout=30)
+
+    # Synthetic multipart messages are not cut, so each process may send one line less.
+    assert 97 <= transmitter.sent <= 100
+
+    lines = receive_lines(sock, transmitter.sent)
+    sock.close()
+
+    assert len(lines) == transmitter.sent
+    if not synthetic:
+        # Each process sends the first lines of its byte range.
+        assert set(lines) <= set(NMEA_FILEPATH.read_text().splitlines())
+
+
+def test_multiprocess_shutdown():
+    transmitter = transmitters.MultiProcessTransmitter(
+        2, host="127.0.0.1", port=9, synthetic_config={}, rate=100
+    )
+
+    thread = threading.Thread(target=transmitter.start, args=[None])
+    thread.start()
+    time.sleep(0.5)
+    transmitter.shutdown()
+    thread.join(timeout=30)
+
+    assert not thread.is_alive()
+
+
+def test_multiprocess_invalid_arguments():
+    with pytest.raises(ValueError):
+        transmitters.MultiProcessTransmitter(0)
+
+    with pytest.raises(NotImplementedError):
+        transmitters.MultiProcessTransmitter(2, protocol="invalid")
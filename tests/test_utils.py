@@ -1,6 +1,11 @@
 import pytest
 
-from socket_listener.utils import chunked_nmea_it
+from socket_listener.utils import (
+    chunked_bytes_it,
+    chunked_nmea_bytes_it,
+    chunked_nmea_it,
+    nmea_checksum,
+)
 
 
 def test_single_part_sentences_split_correctly():
@@ -88,3 +93,40 @@ def test_chunked_nmea_it_preserves_lines():
 
     # Assert all original lines are present and in the same order
     assert output_lines == input_lines
+
+
+def test_nmea_checksum():
+    assert nmea_checksum(b"AIVDM,1,1,,,369KwSP000<G`Kh0iukScOv00000,0") == 0x12
+    assert nmea_checksum(b"") == 0
+
+
+def test_chunked_bytes_it_fills_up_to_max_bytes():
+    lines = ["x" * 9] * 10
+    packets = list(chunked_bytes_it(lines, max_bytes=30))
+
+    # 3 lines of 9 bytes and 2 delimiters fill 29 bytes.
+    assert [len(p) for p in packets] == [3, 3, 3, 1]
+    assert all(len("\n".join(p).encode()) <= 30 for p in packets)
+
+
+def test_chunked_bytes_it_limits_lines():
+    packets = list(chunked_bytes_it(["x"] * 10, max_lines_per_packet=4, max_bytes=1472))
+    assert [len(p) for p in packets] == [4, 4, 2]
+
+
+def test_chunked_bytes_it_sends_large_lines_alone():
+    lines = ["small", "x" * 100, "small"]
+    packets = list(chunked_bytes_it(lines, max_bytes=50))
+    assert packets == [["small"], ["x" * 100], ["small"]]
+
+
+def test_chunked_nmea_bytes_it_does_not_split_multipart():
+    lines = [
+        "!AIVDM,1,1,,A,single1,0",
+        "!AIVDM,2,1,abc,A,part1,0",
+        "!AIVDM,2,2,abc,A,part2,0",
+        "!AIVDM,1,1,,A,single2,0",
+    ]
+    packets = list(chunked_nmea_bytes_it(lines, max_bytes=60))
+
+    assert packets == [lines[:1], lines[1:3], lines[3:]]
@@ -0,0 +1,61 @@
+from unittest import mock
+
+import pytest
+
+from socket_listener.metrics import MetricsRegistry
+from socket_listener.packet import Packet
+from socket_listener.sinks.base import Sink
+from socket_listener.validation import ChecksumValidator, verify_checksum
+
+VALID = b"!AIVDM,1,1,,,369KwSP000<G`Kh0iukScOv00000,0*12"
+VALID_TAGBLOCK = b"\\s:117,c:1668046497*0A\\" + VALID
+
+
+@pytest.mark.parametrize(
+    "line, expected",
+    [
+        pytest.param(VALID, True, id="valid"),
+        pytest.param(VALID_TAGBLOCK, True, id="valid-tagblock"),
+        pytest.param(b"$GPGLL,4916.45,N,12311.12,W,225444,A*31", True, id="valid-dollar"),
+        pytest.param(VALID.replace(b"369", b"368"), False, id="corrupt-payload"),
+        pytest.param(VALID[:-2] + b"13", False, id="wrong-checksum"),
+        pytest.param(VALID[:-2] + b"ZZ", False, id="non-hex-checksum"),
+        pytest.param(VALID[:-3], False, id="no-checksum"),
+        pytest.param(b"\\s:117,c:1668046497*0B\\" + VALID, False, id="corrupt-tagblock"),
+        pytest.param(b"\\s:117,c:1668046497*0A" + VALID, False, id="unterminated-tagblock"),
+        pytest.param(b"garbage" + VALID, False, id="garbage-prefix"),
+        pytest.param(b"", False, id="empty"),
+    ],
+)
+def test_verify_checksum(line, expected):
+    assert verify_checksum(line) is expected
+
+
+def test_filter():
+    invalid_sink = mock.Mock(spec=Sink)
+    metrics = MetricsRegistry()
+    validator = ChecksumValidator(invalid_sinks=[invalid_sink], metrics=metrics)
+
+    corrupt = VALID.replace(b"369", b"368")
+    packet = Packet(b"\n".join([VALID, corrupt, VALID_TAGBLOCK, b""]), source_host="10.0.0.1")
+
+    filtered = validator.filter(packet)
+    assert filtered.data == b"\n".join([VALID, VALID_TAGBLOCK])
+    assert filtered.time == packet.time
+    assert filtered.source_host == "10.0.0.1"
+
+    invalid_packet = invalid_sink.publish.call_args[0][0]
+    assert invalid_packet.data == corrupt
+    assert invalid_packet.time == packet.time
+
+    assert metrics.snapshot() == {"validation_invalid_total": 1, "validation_valid_total": 2}
+
+
+def test_filter_all_valid_returns_same_packet():
+    packet = Packet(VALID + b"\n" + VALID)
+    assert ChecksumValidator(metrics=MetricsRegistry()).filter(packet) is packet
+
+
+def test_filter_all_invalid_drops_packet():
+    packet = Packet(b"not nmea")
+    assert ChecksumValidator(metrics=MetricsRegistry()).filter(packet) is None